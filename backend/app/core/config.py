@@ -1,84 +1,208 @@
-from pydantic_settings import BaseSettings
-from typing import List
-import os
-
-class Settings(BaseSettings):
-    """Application settings."""
-    
-    # API configuration
-    API_VERSION: str = "1.0.0"
-    API_TITLE: str = "Agent World API"
-    API_DESCRIPTION: str = "API for Agent World simulation"
-    
-    # CORS settings
-    CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
-    
-    # World settings
-    WORLD_SIZE: int = 500  # size of the world in pixels
-    NUM_AGENTS: int = 3    # reduced from 10 to 3 for better performance with Ollama
-    MAX_MEMORY: int = 10   # max number of memories each agent can have
-    MAX_CONVERSATIONS: int = 10  # max number of conversations to keep
-    
-    # Agent control parameters
-    INTERACTION_RADIUS: int = 30  # radius for agent interactions
-    THINK_CHANCE: float = 0.005   # chance of thinking each move (reduced for better performance)
-    THINK_COOL_DOWN: int = 20     # number of moves before thinking again (increased cooldown)
-    
-    # Animation settings
-    MOVE_INTERVAL: int = 100  # milliseconds between moves (much faster for better UX)
-    
-    # Agent colors (comma-separated list)
-    AGENT_COLORS: str = "blue,red,green,orange,purple,cyan,magenta,yellow,teal,pink"
-    
-    # AI Model settings - using fastest, lightest models
-    MODEL: str = "llama3.2:1b"  # Light model for fast responses (1.3GB, optimal balance)
-    FALLBACK_MODEL: str = "llama3.2:1b"  # Same model for consistency
-    
-    # Multi-LLM service configuration for parallel processing
-    OLLAMA_SERVICES: dict = {
-        "agent_0": {"base_url": "http://ollama:11434/v1", "model": "llama3.2:1b"},
-        "agent_1": {"base_url": "http://ollama2:11435/v1", "model": "llama3.2:1b"}, 
-        "agent_2": {"base_url": "http://ollama3:11436/v1", "model": "llama3.2:1b"}
-    }
-    
-    OPENAI_BASE_URL: str = "http://ollama:11434/v1"  # Default fallback
-    OPENAI_API_KEY: str = "ollama"
-
-    # Terrain features (for visualization)
-    TERRAIN_FEATURES: dict = {
-        'lake': {
-            'x': [120, 180, 200, 140, 100, 120],
-            'y': [120, 130, 180, 190, 160, 120],
-            'color': 'rgba(0, 100, 220, 0.3)',
-            'border': 'rgba(0, 100, 220, 0.5)',
-            'name': 'Lake'
-        },
-        'mountains': {
-            'x': [320, 350, 380],
-            'y': [240, 280, 250],
-            'color': 'rgba(120, 120, 120, 0.5)',
-            'border': 'rgba(80, 80, 80, 0.8)',
-            'name': 'Mountains'
-        }
-    }
-    
-    # Forest positions (clustered around center)
-    FOREST_POSITIONS: dict = {
-        'x': [240, 260, 280, 250, 270, 290, 310, 330, 340, 360, 220, 300, 320, 280, 260],
-        'y': [180, 200, 170, 220, 240, 190, 210, 180, 200, 170, 160, 150, 140, 130, 160],
-    }
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
-
-# Create settings instance
-settings = Settings()
-
-# Override settings from environment variables if needed
-if os.getenv("OPENAI_API_KEY"):
-    settings.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-if os.getenv("OPENAI_BASE_URL"):
+from pydantic_settings import BaseSettings
+from typing import List
+import os
+
+class Settings(BaseSettings):
+    """Application settings."""
+    
+    # API configuration
+    API_VERSION: str = "1.0.0"
+    API_TITLE: str = "Agent World API"
+    API_DESCRIPTION: str = "API for Agent World simulation"
+    
+    # CORS settings
+    CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
+    
+    # World settings
+    WORLD_SIZE: int = 500  # size of the world in pixels
+    NUM_AGENTS: int = 3    # reduced from 10 to 3 for better performance with Ollama
+    MAX_MEMORY: int = 10   # max number of memories each agent can have
+    MAX_CONVERSATIONS: int = 10  # max number of conversations to keep
+    
+    # Agent control parameters
+    INTERACTION_RADIUS: int = 30  # radius for agent interactions
+    CONVERSATION_COOL_DOWN: int = 10  # ticks before an agent asks for another conversation
+    PAIR_COOLDOWN_TICKS: int = 100  # ticks before the same pair of agents can talk again
+    CONVERSATION_REQUEST_TTL: int = 20  # ticks a conversation request waits for LLM capacity before it is dropped
+    CONVERSATION_BUSY_TIMEOUT: int = 600  # ticks after which an unfinished conversation releases its agents
+    THINK_CHANCE: float = 0.005   # chance of thinking each move (reduced for better performance)
+    THINK_COOL_DOWN: int = 20     # number of ticks before thinking again (increased cooldown)
+    
+    # Animation settings
+    MOVE_INTERVAL: int = 100  # milliseconds between moves (much faster for better UX)
+    MOVEMENT_MODE: str = "interpolated"  # "interpolated" broadcasts eased positions every tick, "segments" broadcasts movement segments for client-side interpolation
+    SEGMENT_TICKS: int = 5  # ticks a movement segment takes (segment mode)
+    SEGMENT_SNAPSHOT_TICKS: int = 20  # ticks between full agent updates (segment mode)
+    
+    # Level of detail settings
+    TICK_BUDGET_MS: int = 40  # time budget for agent updates per tick
+    AGENT_UPDATE_TIMEOUT: float = 5.0  # seconds to wait for the parallel agent updates of one tick
+    LOD_REDUCED_INTERVAL: int = 5  # ticks between updates of agents nobody is watching
+    LOD_VIEW_MARGIN: int = 50  # margin around viewports within which agents count as observed
+    
+    # Agent colors (comma-separated list)
+    AGENT_COLORS: str = "blue,red,green,orange,purple,cyan,magenta,yellow,teal,pink"
+    
+    # AI Model settings - using fastest, lightest models
+    MODEL: str = "llama3.2:1b"  # Light model for fast responses (1.3GB, optimal balance)
+    FALLBACK_MODEL: str = "llama3.2:1b"  # Same model for consistency
+    
+    # Multi-LLM service configuration for parallel processing
+    OLLAMA_SERVICES: dict = {
+        "agent_0": {"base_url": "http://ollama:11434/v1", "model": "llama3.2:1b"},
+        "agent_1": {"base_url": "http://ollama2:11435/v1", "model": "llama3.2:1b"}, 
+        "agent_2": {"base_url": "http://ollama3:11436/v1", "model": "llama3.2:1b"}
+    }
+    
+    OPENAI_BASE_URL: str = "http://ollama:11434/v1"  # Default fallback
+    OPENAI_API_KEY: str = "ollama"
+    
+    # Adaptive LLM concurrency (per replica, shared by thinking and conversations)
+    LLM_INITIAL_CONCURRENCY: int = 2  # in-flight requests per replica at startup
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TARGET_LATENCY: float = 3.0  # seconds, slower responses shrink the limit
+    LLM_BACKOFF_FACTOR: float = 0.5  # multiplicative decrease on errors and slow responses
+    LLM_REQUEST_TIMEOUT: float = 5.0  # default client timeout in seconds
+    LLM_WARMUP_TIMEOUT: float = 120.0  # seconds a replica may take to load its model
+    LLM_KEEP_ALIVE: str = "30m"  # how long Ollama keeps a model loaded after a warm-up or ping
+    LLM_KEEP_ALIVE_INTERVAL: float = 240.0  # seconds between keep-alive pings to idle replicas
+    
+    # LLM deadlines and hedging
+    CONVERSATION_DEADLINE: float = 8.0  # seconds from queueing until a conversation must be ready
+    THINKING_DEADLINE: float = 5.0  # seconds from queueing until a thought must be ready
+    LLM_HEDGING_ENABLED: bool = True  # send a duplicate to another replica when the primary is slower than its p95
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # latency samples a replica needs before requests to it are hedged
+    LLM_LATENCY_WINDOW: int = 100  # recent latencies kept per replica
+    LLM_JSON_MODE: bool = True  # ask replicas for JSON output when a request expects structured data
+    THINKING_MAX_TOKENS: int = 32  # a thinking decision is a small JSON object
+    
+    # Long-term agent memory
+    MEMORY_STORE_CAPACITY: int = 2000  # events kept per agent before the oldest are evicted
+    MEMORY_POSTING_SCAN: int = 64  # most recent events scanned per index term in a query
+    MEMORY_POSTING_MAX_DEAD: float = 0.5  # fraction of removed events' ids after which a posting list is compacted
+    MEMORY_RECENCY_HALF_LIFE: float = 600.0  # seconds until an event's recency score halves
+    MEMORY_PROMPT_TOP_K: int = 3  # memories considered for a prompt
+    MEMORY_PROMPT_TOKENS: int = 60  # prompt token budget for memories
+    MEMORY_LOCATION_RADIUS: int = 40  # pixels around a point of interest that count as being there
+    
+    # Background memory compaction into reflections
+    MEMORY_COMPACTION_INTERVAL: float = 10.0  # seconds between compaction rounds
+    MEMORY_COMPACTION_MAX_UTILIZATION: float = 0.5  # only compact while less of the LLM capacity is in use
+    MEMORY_COMPACTION_AGENTS_PER_ROUND: int = 4
+    MEMORY_COMPACTION_BATCH: int = 50  # raw events folded into one reflection
+    MEMORY_COMPACTION_KEEP_RECENT: int = 100  # newest raw events never compacted
+    MEMORY_COMPACTION_PROMPT_EVENTS: int = 20  # events quoted in a reflection prompt
+    MEMORY_COMPACTION_DEADLINE: float = 20.0  # seconds a reflection request may take
+    MEMORY_REFLECTION_MAX_TOKENS: int = 60
+    MEMORY_REFLECTION_ENTITIES: int = 8  # agents a reflection is indexed under
+    
+    # Tiered thinking: local utility planner first, LLM for novel situations
+    THINK_ESCALATION_RULES: list = ['first_meeting', 'goal_changed', 'long_idle']  # add 'always' for LLM-only, [] for local-only
+    THINK_ESCALATION_IDLE: float = 120.0  # seconds without an LLM decision before an agent escalates again
+    PLANNER_LOOKAHEAD: int = 12  # pixels ahead the planner checks terrain for compass moves
+    PLANNER_NOISE: float = 0.3  # random utility added to each option for variety
+    
+    # Speculative thinking prefetch
+    THINK_PREFETCH_TICKS: int = 10  # start decisions this many ticks before an agent is expected to think
+    THINK_PREFETCH_TTL: float = 15.0  # seconds a prefetched decision stays usable
+    THINK_PREFETCH_MAX_DRIFT: int = 30  # pixels an agent may move before its prefetched decision is stale
+    THINK_PREFETCH_RESERVE: int = 1  # LLM slots kept free for on-demand thinking and conversations
+    
+    # LLM budgets (token buckets), requests over budget use the template fallbacks
+    LLM_GLOBAL_RPS: float = 10.0  # requests per second across all agents
+    LLM_GLOBAL_TPM: int = 60000  # prompt + completion tokens per minute across all agents
+    LLM_AGENT_RPS: float = 0.5  # requests per second for a single agent
+    LLM_AGENT_TPM: int = 3000  # tokens per minute for a single agent
+
+    # Terrain features (for visualization)
+    TERRAIN_FEATURES: dict = {
+        'lake': {
+            'x': [120, 180, 200, 140, 100, 120],
+            'y': [120, 130, 180, 190, 160, 120],
+            'color': 'rgba(0, 100, 220, 0.3)',
+            'border': 'rgba(0, 100, 220, 0.5)',
+            'name': 'Lake'
+        },
+        'mountains': {
+            'x': [320, 350, 380],
+            'y': [240, 280, 250],
+            'color': 'rgba(120, 120, 120, 0.5)',
+            'border': 'rgba(80, 80, 80, 0.8)',
+            'name': 'Mountains'
+        }
+    }
+    
+    # Forest positions (clustered around center)
+    FOREST_POSITIONS: dict = {
+        'x': [240, 260, 280, 250, 270, 290, 310, 330, 340, 360, 220, 300, 320, 280, 260],
+        'y': [180, 200, 170, 220, 240, 190, 210, 180, 200, 170, 160, 150, 140, 130, 160],
+    }
+    
+    # Logging: records are queued and written by a background thread
+    LOG_LEVEL: str = "INFO"  # root log level
+    LOG_LEVELS: dict = {}  # per-logger levels, e.g. {"app.services.agent_service": "DEBUG"}
+    LOG_FORMAT: str = "text"  # "text" or "json" (one object per line)
+    LOG_RATE_LIMIT: int = 20  # records per call site and window before sampling starts (0 = no limit)
+    LOG_RATE_WINDOW: float = 10.0  # seconds
+    LOG_SAMPLE_EVERY: int = 100  # over the limit, keep every n-th record of a call site (0 = drop all)
+    LOG_QUEUE_SIZE: int = 10000  # records waiting for the writer thread before new ones are dropped
+    
+    # Worlds (/api/worlds), independent simulations sharing the LLM replicas
+    DEFAULT_WORLD: str = "default"  # world created at startup and served at /api/agents and /ws
+    MAX_WORLDS: int = 16
+    WORLD_WEIGHT: float = 1.0  # LLM share of a world relative to the others' when replicas are contended
+    
+    # Conversation archive (/api/agents/conversations/archive)
+    CONVERSATION_ARCHIVE_PATH: str = "data/conversations.db"  # SQLite database; empty to keep only MAX_CONVERSATIONS in memory
+    CONVERSATION_ARCHIVE_BATCH: int = 200  # conversations written per transaction at most
+    CONVERSATION_ARCHIVE_FLUSH_INTERVAL: float = 1.0  # seconds a conversation may wait for others to share its transaction
+    CONVERSATION_ARCHIVE_QUEUE_SIZE: int = 10000  # conversations waiting for the writer before new ones are dropped
+    
+    # Memory accounting (/api/admin/memory)
+    MEMORY_ACCOUNTING_INTERVAL: float = 60.0  # seconds between budget checks
+    MEMORY_BUDGETS: dict = {}  # structure -> approximate bytes before a warning, e.g. {"conversations.history": 1000000}
+    MEMORY_ACCOUNTING_SAMPLE: int = 100  # items measured per large container, the rest is extrapolated
+    MEMORY_TRACE_FRAMES: int = 10  # stack depth tracemalloc records once a snapshot was requested
+    MEMORY_MAX_SNAPSHOTS: int = 5  # allocation snapshots kept for diffs
+    
+    # On-demand sampling profiler (/api/admin/profile)
+    PROFILER_INTERVAL: float = 0.005  # default seconds between samples
+    PROFILER_MAX_SECONDS: float = 60.0  # longest profile that can be requested
+    PROFILER_MAX_DEPTH: int = 64  # frames kept per stack
+    
+    # Process layout: "embedded" runs the simulation inside the API process, "external" serves
+    # clients from the state bus published by a separate `python -m app.simulation_process`
+    SIMULATION_MODE: str = "embedded"
+    STATE_BUS_NAME: str = "agent_world_state"  # shared memory segment the simulation publishes ticks to
+    STATE_BUS_SLOT_SIZE: int = 4 * 1024 * 1024  # bytes per buffer (there are two), must fit one tick's state
+    STATE_BUS_POLL_INTERVAL: float = 0.02  # seconds between API worker checks for a newly published tick
+    SIMULATION_COMMAND_PORT: int = 8765  # localhost port of the simulation process's command channel
+    SIMULATION_COMMAND_AUTHKEY: str = ""  # shared secret of the command channel, required in external mode
+    SIMULATION_COMMAND_TIMEOUT: float = 5.0  # seconds to wait for a command reply
+    
+    # Agent queries
+    SPATIAL_CELL_SIZE: int = 50  # cell size of the grid index used for bbox queries
+    MAX_PAGE_SIZE: int = 1000  # max agents per page of /api/agents
+    
+    # Navigation grid settings
+    NAV_CELL_SIZE: int = 5  # size of a navigation grid cell in pixels
+    WALKABLE_BOUNDS: dict = {'min_x': 150, 'max_x': 350, 'min_y': 150, 'max_y': 300}  # terrain area agents stay in
+    TERRAIN_COSTS: dict = {'lake': None, 'mountains': 4.0, 'forest': 2.0}  # movement cost per feature (None = impassable)
+    FOREST_RADIUS: int = 10  # radius around each tree that counts as forest
+    MAX_FLOW_FIELDS: int = 32  # max number of cached flow fields
+    
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        case_sensitive = True
+
+# Create settings instance
+settings = Settings()
+
+# Override settings from environment variables if needed
+if os.getenv("OPENAI_API_KEY"):
+    settings.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+if os.getenv("OPENAI_BASE_URL"):
     settings.OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
\ No newline at end of file
@@ -1,28 +1,159 @@
-import logging
-from logging.handlers import SocketHandler
-
-def setup_logging():
-    """Configure and set up logging for the application."""
-    # Configure basic logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s - %(filename)s - %(funcName)s'
-    )
-    
-    # Create a logger
-    logger = logging.getLogger('agent_world')
-    logger.setLevel(logging.INFO)
-    
-    # Add a console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    logger.addHandler(console_handler)
-    
-    # Suppress logs from other modules
-    logging.getLogger('werkzeug').setLevel(logging.ERROR)
-    logging.getLogger('dash').setLevel(logging.ERROR)
-    logging.getLogger('flask').setLevel(logging.ERROR)
-    
-    logger.info('Logging initialized')
-    
-    return logger
\ No newline at end of file
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s - %(filename)s - %(funcName)s'
+
+# Attributes every LogRecord has; anything else was passed in `extra` and goes into JSON output
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional['DroppingQueueHandler'] = None
+_rate_filter: Optional['RateLimitFilter'] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through the first LOG_RATE_LIMIT records per call site and window, then only every
+    LOG_SAMPLE_EVERY-th one; warnings and errors always pass.
+
+    Call sites are told apart by file and line, as messages are usually pre-formatted
+    f-strings. A record that passes after others were suppressed carries their count in
+    its `suppressed` attribute.
+    """
+
+    def __init__(self, limit: int, window: float, sample_every: int):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.sample_every = sample_every
+        self._sites: Dict[Tuple[str, int], list] = {}  # (pathname, lineno) -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.limit <= 0:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window:
+                site = self._sites[key] = [now, 0, site[2] if site else 0]
+            site[1] += 1
+            over = site[1] - self.limit
+            if over > 0 and (self.sample_every <= 0 or over % self.sample_every):
+                site[2] += 1
+                self.suppressed += 1
+                return False
+            if site[2]:
+                record.suppressed = site[2]
+                site[2] = 0
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hand records to the listener thread without ever blocking; drop them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with `extra` attributes as fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging():
+    """Configure and set up logging for the application.
+
+    Records are filtered and queued on the calling thread; formatting and console
+    writes happen on a background listener thread, so logging never blocks the
+    simulation loop.
+    """
+    global _listener, _queue_handler, _rate_filter
+    logger = logging.getLogger('agent_world')
+    if _listener is not None:
+        return logger
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    _rate_filter = RateLimitFilter(settings.LOG_RATE_LIMIT, settings.LOG_RATE_WINDOW, settings.LOG_SAMPLE_EVERY)
+    _queue_handler = DroppingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(_rate_filter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(_queue_handler.queue, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    # Suppress logs from other modules
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    logging.getLogger('dash').setLevel(logging.ERROR)
+    logging.getLogger('flask').setLevel(logging.ERROR)
+
+    logger.info('Logging initialized')
+
+    return logger
+
+
+def set_level(name: str, level: str) -> None:
+    """Change a logger's level at runtime ('' or 'root' for the root logger)."""
+    level = level.upper()
+    if level not in logging.getLevelNamesMapping():
+        raise ValueError(f"Unknown log level: {level}")
+    logging.getLogger(None if name in ('', 'root') else name).setLevel(level)
+
+
+def logging_status() -> Dict[str, Any]:
+    """Get the configured logger levels and how many records were sampled away or dropped."""
+    loggers = {
+        name: logging.getLevelName(logger.level)
+        for name, logger in sorted(logging.root.manager.loggerDict.items())
+        if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET
+    }
+    return {
+        'root': logging.getLevelName(logging.getLogger().level),
+        'loggers': loggers,
+        'suppressed': _rate_filter.suppressed if _rate_filter else 0,
+        'dropped': _queue_handler.dropped if _queue_handler else 0,
+        'queued': _queue_handler.queue.qsize() if _queue_handler else 0
+    }
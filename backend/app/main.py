@@ -1,299 +1,490 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
-import asyncio
-import uvicorn
-import logging
-import json
-import os
-from typing import List, Dict, Any
-
-from app.routers import agents
-from app.core.config import settings
-from app.core.logger import setup_logging
-from app.services.agent_service import AgentService
-from app.services.conversation_service import ConversationService
-from app.services.thinking_service import ThinkingService
-
-# Setup logging
-logger = setup_logging()
-
-# Setup detailed logging for WebSockets
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-# Set more detailed logging for specific modules
-logging.getLogger("app.routers.websockets").setLevel(logging.DEBUG)
-logging.getLogger("app.services.conversation_service").setLevel(logging.DEBUG)
-logging.getLogger("app.services.agent_service").setLevel(logging.DEBUG)
-
-
-# Shared state for WebSocket clients
-connected_clients: List[WebSocket] = []
-
-# Initialize services at startup
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Initialize services
-    logger.info("Initializing services...")
-    agent_service = AgentService()
-    conversation_service = ConversationService()
-    thinking_service = ThinkingService()
-    
-    # Store services in app state
-    app.state.agent_service = agent_service
-    app.state.conversation_service = conversation_service
-    app.state.thinking_service = thinking_service
-    
-    # Start background tasks
-    simulation_task = asyncio.create_task(run_simulation(app))
-    
-    # Provide app to caller
-    yield
-    
-    # Cleanup
-    logger.info("Shutting down services...")
-    simulation_task.cancel()
-    try:
-        await simulation_task
-    except asyncio.CancelledError:
-        logger.info("Simulation task cancelled")
-
-# Create FastAPI app
-app = FastAPI(
-    title="Agent World API",
-    description="Backend API for Agent World simulation",
-    version="1.0.0",
-    lifespan=lifespan
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",  # Local development
-        f"https://{os.getenv('CODESPACE_NAME', 'localhost')}-3000.app.github.dev",  # GitHub Codespaces frontend
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(agents.router, prefix="/api")
-
-# WebSocket endpoint for real-time updates
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    connected_clients.append(websocket)
-    logger.info(f"WebSocket client connected. Total clients: {len(connected_clients)}")
-    
-    try:
-        # Send initial data to the client
-        agents_data = app.state.agent_service.get_agents_data()
-        await websocket.send_json({
-            "type": "agent_update",
-            "data": agents_data
-        })
-        
-        conversations = app.state.conversation_service.get_conversations()
-        await websocket.send_json({
-            "type": "conversation_update",
-            "data": conversations
-        })
-        
-        # Keep connection alive and handle client messages
-        while True:
-            data = await websocket.receive_text()
-            logger.debug(f"Received WebSocket message: {data}")
-            await process_client_message(websocket, data, app)
-    except WebSocketDisconnect:
-        logger.info("WebSocket client disconnected")
-    except Exception as e:
-        logger.error(f"WebSocket error: {e}")
-    finally:
-        if websocket in connected_clients:
-            connected_clients.remove(websocket)
-        logger.info(f"WebSocket client removed. Total clients: {len(connected_clients)}")
-
-async def process_client_message(websocket: WebSocket, data: str, app: FastAPI):
-    """Process messages from WebSocket clients."""
-    try:
-        # Parse message and handle commands
-        message = json.loads(data)
-        command = message.get("command")
-        logger.debug(f"Processing client command: {command}")
-        
-        if command == "ping":
-            await websocket.send_json({"type": "pong", "time": message.get("time", 0)})
-            return
-            
-        if command == "start_simulation":
-            app.state.simulation_running = True
-            await websocket.send_json({"status": "simulation_started"})
-            
-        elif command == "stop_simulation":
-            app.state.simulation_running = False
-            await websocket.send_json({"status": "simulation_stopped"})
-            
-        elif command == "reset_simulation":
-            app.state.agent_service.reset_agents(message.get("num_agents", settings.NUM_AGENTS))
-            await broadcast_agent_update(app)
-            await websocket.send_json({"status": "simulation_reset"})
-            
-        elif command == "update_speed":
-            app.state.simulation_speed = message.get("speed", settings.MOVE_INTERVAL)
-            await websocket.send_json({"status": "speed_updated"})
-            
-        elif command == "get_agents":
-            agents_data = app.state.agent_service.get_agents_data()
-            await websocket.send_json({
-                "type": "agent_update", 
-                "data": agents_data
-            })
-            
-        elif command == "get_conversations":
-            conversations = app.state.conversation_service.get_conversations()
-            logger.debug(f"Sending conversations: {len(conversations)} items")
-            await websocket.send_json({
-                "type": "conversation_update", 
-                "data": conversations
-            })
-            
-        else:
-            logger.warning(f"Unknown command: {command}")
-            await websocket.send_json({"error": f"Unknown command: {command}"})
-            
-    except json.JSONDecodeError:
-        logger.error(f"Invalid JSON received: {data}")
-        await websocket.send_json({"error": "Invalid JSON format"})
-    except Exception as e:
-        logger.error(f"Error processing client message: {e}")
-        await websocket.send_json({"status": "error", "message": str(e)})
-
-async def broadcast_agent_update(app: FastAPI):
-    """Broadcast agent updates to all connected clients."""
-    if not connected_clients:
-        return
-    
-    # Get agent data
-    agents_data = app.state.agent_service.get_agents_data()
-    
-    # Send updates to all clients
-    message = {
-        "type": "agent_update",
-        "data": agents_data
-    }
-    
-    disconnected_clients = []
-    for client in connected_clients:
-        try:
-            await client.send_json(message)
-        except Exception as e:
-            logger.error(f"Error sending to WebSocket client: {e}")
-            disconnected_clients.append(client)
-    
-    # Remove disconnected clients
-    for client in disconnected_clients:
-        if client in connected_clients:
-            connected_clients.remove(client)
-
-# In backend/app/main.py, replace the broadcast_conversation_update function with this enhanced version:
-
-async def broadcast_conversation_update(app: FastAPI):
-    """Broadcast conversation updates to all connected clients."""
-    if not connected_clients:
-        logger.debug("No connected clients to broadcast conversations to")
-        return
-    
-    # Get conversation data
-    conversations = app.state.conversation_service.get_conversations()
-    
-    # Only broadcast if there are conversations to send
-    if not conversations:
-        logger.debug("No conversations to broadcast")
-        return
-        
-    logger.info(f"Broadcasting {len(conversations)} conversations to {len(connected_clients)} client(s)")
-    
-    # Send updates to all clients
-    message = {
-        "type": "conversation_update",
-        "data": conversations
-    }
-    
-    disconnected_clients = []
-    for client in connected_clients:
-        try:
-            await client.send_json(message)
-            logger.debug(f"Sent conversation update to client")
-        except Exception as e:
-            logger.error(f"Error sending to WebSocket client: {e}")
-            disconnected_clients.append(client)
-    
-    # Remove disconnected clients
-    for client in disconnected_clients:
-        if client in connected_clients:
-            connected_clients.remove(client)
-            logger.info(f"Removed disconnected client. Remaining clients: {len(connected_clients)}")
-
-
-
-async def run_simulation(app: FastAPI):
-    """Run the simulation loop in the background."""
-    app.state.simulation_running = False
-    app.state.simulation_speed = settings.MOVE_INTERVAL
-    
-    while True:
-        try:
-            if app.state.simulation_running:
-                logger.info("Simulation running - updating agents")
-                # Update agent positions using parallel threads
-                try:
-                    app.state.agent_service.update_agents_parallel()
-                    logger.info("Parallel agent update completed successfully")
-                except Exception as e:
-                    logger.error(f"Error in parallel agent update: {e}")
-                    # Fallback to synchronous update
-                    app.state.agent_service.update_agents()
-                    logger.info("Fallback to synchronous agent update completed")
-                
-                # Process agent conversations
-                conversations = app.state.agent_service.get_conversation_queue()
-                if conversations:
-                    logger.info(f"Processing {len(conversations)} conversations")
-                    app.state.conversation_service.add_pending_conversations(conversations)
-                    # Process conversations using available method (async or sync)
-                    try:
-                        await app.state.conversation_service.process_conversation_batch_async()
-                    except Exception as e:
-                        logger.error(f"Error in async conversation processing: {e}")
-                        app.state.conversation_service.process_conversation_batch()
-                    
-                    # Explicitly broadcast conversations after processing
-                    await broadcast_conversation_update(app)
-                
-                # Generate thoughts for agents that need them
-                thinking_agents = app.state.agent_service.get_agent_for_thinking()
-                if thinking_agents:
-                    app.state.thinking_service.add_pending_agents(thinking_agents)
-                    # Process thinking using available method (async or sync)
-                    try:
-                        await app.state.thinking_service.process_thinking_batch_async()
-                    except Exception as e:
-                        logger.error(f"Error in async thinking: {e}")
-                        app.state.thinking_service.process_thinking_batch()
-                
-                # Broadcast agent updates
-                await broadcast_agent_update(app)
-            
-            # Use a faster base simulation speed for smoother movement
-            base_speed = max(50, app.state.simulation_speed // 4)  # At least 50ms, or 1/4 of set speed
-            await asyncio.sleep(base_speed / 1000)  # Convert ms to seconds
-        except Exception as e:
-            logger.error(f"Error in simulation loop: {e}")
-            await asyncio.sleep(1)  # Sleep on error to prevent CPU spinning
-
-if __name__ == "__main__":
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import asyncio
+import uvicorn
+import logging
+import json
+import os
+import time
+from typing import Dict, Any, List
+
+from app.routers import admin, agents, llm, worlds
+from app.core.config import settings
+from app.core.logger import setup_logging
+from app.services.conversation_archive import ConversationArchive
+from app.services.llm_pool import llm_pool
+from app.services.memory_accounting import memory_accountant
+from app.services.profiler import tick_phase
+from app.services.simulation_control import RemoteSimulationControl
+from app.services.state_bus import StateBusReader, SnapshotAgentView, SnapshotConversationView
+from app.services.world_manager import World, WorldManager
+
+# Setup logging (per-module levels come from LOG_LEVELS and can be changed at /api/admin/logging)
+logger = setup_logging()
+
+
+def init_services(app: FastAPI) -> None:
+    """Create the world manager with the default world and store it in app state."""
+    logger.info("Initializing services...")
+    app.state.world_manager = WorldManager(llm_pool, start_world_tasks, stop_background_tasks)
+    default_world = app.state.world_manager.create(settings.DEFAULT_WORLD)
+    # Process-wide commands (logging, profiles, memory, LLM readiness) go through the default world
+    app.state.simulation_control = default_world.simulation_control
+    register_memory_structures(app)
+
+def register_memory_structures(app: FastAPI) -> None:
+    """Register the long-lived structures whose footprint is reported at /api/admin/memory, over all worlds."""
+    worlds = app.state.world_manager.worlds.values
+
+    def agents():
+        return [agent for world in worlds() for agent in world.agent_service.agents]
+
+    def per_world(name, getter):
+        memory_accountant.register(name, lambda: [getter(world) for world in worlds()])
+
+    memory_accountant.register("agents.memory", lambda: [agent.memory for agent in agents()])
+    memory_accountant.register("agents.long_term_memory", lambda: [agent.long_term_memory for agent in agents()])
+    memory_accountant.register("agents.conversations", lambda: [agent.conversations for agent in agents()])
+    per_world("conversations.history", lambda world: world.conversation_service.conversation_history)
+    per_world("conversations.scheduler", lambda world: world.agent_service.conversation_scheduler)
+    per_world("thinking.prefetched", lambda world: world.thinking_service._prefetched)
+    per_world("viewers", lambda world: world.agent_service.lod._viewports)
+    per_world("websockets.connected", lambda world: world.clients)
+    memory_accountant.register("prompts", lambda: [world.thinking_service.prompt_builder for world in worlds()])
+    memory_accountant.register("llm.budget", lambda: llm_pool.budget)
+
+def start_background_tasks(app: FastAPI) -> Dict[str, asyncio.Task]:
+    """Start the LLM housekeeping tasks shared by all worlds."""
+    return {
+        # Load models concurrently right away and keep them resident (readiness at /api/llm/ready)
+        "LLM keep-alive": asyncio.create_task(llm_pool.run_keep_alive()),
+        # Warn when a structure outgrows its MEMORY_BUDGETS entry
+        "Memory accounting": asyncio.create_task(memory_accountant.run())
+    }
+
+def start_world_tasks(world: World) -> Dict[str, asyncio.Task]:
+    """Start a world's simulation loop and memory compaction."""
+    return {
+        f"Simulation {world.id}": asyncio.create_task(run_simulation(world)),
+        # Fold old memories into reflections while the LLM replicas are idle
+        f"Memory compaction {world.id}": asyncio.create_task(world.memory_compactor.run(world.agent_service))
+    }
+
+async def stop_background_tasks(tasks: Dict[str, asyncio.Task]) -> None:
+    """Cancel background tasks and wait for them to finish."""
+    for task in tasks.values():
+        task.cancel()
+    for name, task in tasks.items():
+        try:
+            await task
+        except asyncio.CancelledError:
+            logger.info(f"{name} task cancelled")
+
+# Initialize services at startup
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.SIMULATION_MODE == "external":
+        # The simulation runs in app.simulation_process; this worker serves clients from the
+        # state it publishes and forwards commands to it, so any number of workers can run
+        logger.info("Serving the simulation published on the state bus...")
+        # Only the default world is published, so it is the only one served in this mode
+        reader = StateBusReader(settings.STATE_BUS_NAME, settings.STATE_BUS_SLOT_SIZE)
+        world = World(
+            settings.DEFAULT_WORLD,
+            SnapshotAgentView(reader),
+            SnapshotConversationView(reader),
+            # The simulation process writes the archive, workers only query it
+            conversation_archive=(
+                ConversationArchive(settings.CONVERSATION_ARCHIVE_PATH) if settings.CONVERSATION_ARCHIVE_PATH else None
+            ),
+            simulation_control=RemoteSimulationControl()
+        )
+        app.state.world_manager = WorldManager(llm_pool)
+        app.state.world_manager.add(world)
+        app.state.simulation_control = world.simulation_control
+        memory_accountant.register("websockets.connected", lambda: world.clients)
+        tasks = {"State bus relay": asyncio.create_task(relay_state_bus(world))}
+    else:
+        init_services(app)
+        tasks = start_background_tasks(app)
+    
+    # Provide app to caller
+    yield
+    
+    # Cleanup
+    logger.info("Shutting down services...")
+    await stop_background_tasks(tasks)
+    await app.state.world_manager.close()
+
+# Create FastAPI app
+app = FastAPI(
+    title="Agent World API",
+    description="Backend API for Agent World simulation",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[
+        "http://localhost:3000",  # Local development
+        f"https://{os.getenv('CODESPACE_NAME', 'localhost')}-3000.app.github.dev",  # GitHub Codespaces frontend
+    ],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
+)
+
+# Include routers
+app.include_router(agents.router, prefix="/api")  # the default world
+app.include_router(agents.router, prefix="/api/worlds/{world_id}")
+app.include_router(worlds.router, prefix="/api")
+app.include_router(llm.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+
+# WebSocket endpoint for real-time updates
+@app.websocket("/ws")
+@app.websocket("/ws/{world_id}")
+async def websocket_endpoint(websocket: WebSocket, world_id: str = settings.DEFAULT_WORLD):
+    try:
+        world = app.state.world_manager.get(world_id)
+    except KeyError:
+        # Closing before accepting rejects the handshake
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    world.clients.append(websocket)
+    memory_accountant.track_websocket(websocket)
+    logger.info(f"WebSocket client connected. Total clients: {len(world.clients)}")
+    
+    try:
+        # New viewers see the whole world until they report a viewport
+        await world.simulation_control.set_viewport(id(websocket), None)
+        
+        # Send initial data to the client
+        await websocket.send_text(agent_update_message(world))
+        
+        conversations = world.conversation_service.get_conversations()
+        await websocket.send_json({
+            "type": "conversation_update",
+            "data": conversations
+        })
+        
+        # Keep connection alive and handle client messages
+        while True:
+            data = await websocket.receive_text()
+            logger.debug(f"Received WebSocket message: {data}")
+            await process_client_message(websocket, data, world)
+    except WebSocketDisconnect:
+        logger.info("WebSocket client disconnected")
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+    finally:
+        if websocket in world.clients:
+            world.clients.remove(websocket)
+        try:
+            await world.simulation_control.remove_viewer(id(websocket))
+        except Exception as e:
+            logger.error(f"Error removing viewer: {e}")
+        logger.info(f"WebSocket client removed. Total clients: {len(world.clients)}")
+
+async def process_client_message(websocket: WebSocket, data: str, world: World):
+    """Process messages from WebSocket clients."""
+    try:
+        # Parse message and handle commands
+        message = json.loads(data)
+        command = message.get("command")
+        logger.debug(f"Processing client command: {command}")
+        
+        if command == "ping":
+            await websocket.send_json({"type": "pong", "time": message.get("time", 0)})
+            return
+            
+        control = world.simulation_control
+        if command == "start_simulation":
+            await control.start()
+            await websocket.send_json({"status": "simulation_started"})
+            
+        elif command == "stop_simulation":
+            await control.stop()
+            await websocket.send_json({"status": "simulation_stopped"})
+            
+        elif command == "reset_simulation":
+            await control.reset(message.get("num_agents", settings.NUM_AGENTS))
+            await broadcast_agent_update(world)
+            await websocket.send_json({"status": "simulation_reset"})
+            
+        elif command == "update_speed":
+            await control.set_speed(message.get("speed", settings.MOVE_INTERVAL))
+            await websocket.send_json({"status": "speed_updated"})
+            
+        elif command == "set_viewport":
+            # Visible area as [min_x, min_y, max_x, max_y], or null for the whole world
+            bbox = message.get("bbox")
+            viewport = tuple(float(value) for value in bbox) if bbox else None
+            if viewport is not None and len(viewport) != 4:
+                await websocket.send_json({"error": "bbox must be [min_x, min_y, max_x, max_y]"})
+                return
+            await control.set_viewport(id(websocket), viewport)
+            await websocket.send_json({"status": "viewport_updated"})
+            
+        elif command == "get_agents":
+            await websocket.send_text(agent_update_message(world))
+            
+        elif command == "get_conversations":
+            conversations = world.conversation_service.get_conversations()
+            logger.debug(f"Sending conversations: {len(conversations)} items")
+            await websocket.send_json({
+                "type": "conversation_update", 
+                "data": conversations
+            })
+            
+        else:
+            logger.warning(f"Unknown command: {command}")
+            await websocket.send_json({"error": f"Unknown command: {command}"})
+            
+    except json.JSONDecodeError:
+        logger.error(f"Invalid JSON received: {data}")
+        await websocket.send_json({"error": "Invalid JSON format"})
+    except Exception as e:
+        logger.error(f"Error processing client message: {e}")
+        await websocket.send_json({"status": "error", "message": str(e)})
+
+def agent_update_message(world: World) -> str:
+    """Build the agent_update message from the agents' cached JSON fragments.
+    
+    `tick_time` is the wall-clock start of the tick, so clients can measure update latency.
+    """
+    agent_service = world.agent_service
+    return (
+        f'{{"type":"agent_update","tick":{agent_service.tick},"tick_time":{agent_service.tick_started_at},"data":'
+        + agent_service.get_agents_json() + '}'
+    )
+
+async def broadcast_agent_update(world: World):
+    """Broadcast agent updates to all connected clients."""
+    if not world.clients:
+        return
+    
+    # Encode once and send the same text to every client
+    message = agent_update_message(world)
+    
+    disconnected_clients = []
+    for client in world.clients:
+        try:
+            await client.send_text(message)
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket client: {e}")
+            disconnected_clients.append(client)
+    
+    # Remove disconnected clients
+    for client in disconnected_clients:
+        if client in world.clients:
+            world.clients.remove(client)
+
+async def broadcast_movement_segments(world: World, segments: List[Dict[str, Any]]):
+    """Broadcast newly started movement segments so clients can interpolate locally."""
+    if not world.clients or not segments:
+        return
+    
+    message = {
+        "type": "movement_segments",
+        "tick": world.agent_service.tick,
+        "tick_time": world.agent_service.tick_started_at,
+        "data": segments
+    }
+    
+    disconnected_clients = []
+    for client in world.clients:
+        try:
+            await client.send_json(message)
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket client: {e}")
+            disconnected_clients.append(client)
+    
+    # Remove disconnected clients
+    for client in disconnected_clients:
+        if client in world.clients:
+            world.clients.remove(client)
+
+# In backend/app/main.py, replace the broadcast_conversation_update function with this enhanced version:
+
+async def broadcast_conversation_update(world: World):
+    """Broadcast conversation updates to all connected clients."""
+    if not world.clients:
+        logger.debug("No connected clients to broadcast conversations to")
+        return
+    
+    # Get conversation data
+    conversations = world.conversation_service.get_conversations()
+    
+    # Only broadcast if there are conversations to send
+    if not conversations:
+        logger.debug("No conversations to broadcast")
+        return
+        
+    logger.info(f"Broadcasting {len(conversations)} conversations to {len(world.clients)} client(s)")
+    
+    # Send updates to all clients
+    message = {
+        "type": "conversation_update",
+        "data": conversations
+    }
+    
+    disconnected_clients = []
+    for client in world.clients:
+        try:
+            await client.send_json(message)
+            logger.debug(f"Sent conversation update to client")
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket client: {e}")
+            disconnected_clients.append(client)
+    
+    # Remove disconnected clients
+    for client in disconnected_clients:
+        if client in world.clients:
+            world.clients.remove(client)
+            logger.info(f"Removed disconnected client. Remaining clients: {len(world.clients)}")
+
+
+
+def publish_state(world: World, segments: List[Dict[str, Any]]) -> None:
+    """Publish the current tick and the movement segments started in it to the state bus for the API workers."""
+    agent_service = world.agent_service
+    try:
+        world.state_bus.publish(
+            agent_service.tick,
+            agent_service.get_agents_json(),
+            world.conversation_service.get_conversations(),
+            {
+                "etag": agent_service.etag(),
+                "tick_started_at": agent_service.tick_started_at,
+                "world_version": agent_service.world_version(),
+                "running": world.simulation_running,
+                "speed": world.simulation_speed,
+                "segments": segments
+            }
+        )
+    except ValueError as e:
+        logger.error(f"Could not publish tick: {e}")
+
+async def relay_state_bus(world: World):
+    """Broadcast ticks published by the simulation process to this worker's clients."""
+    etag = None
+    tick = None
+    conversations = None
+    while True:
+        try:
+            snapshot = world.agent_service.reader.read()
+            if snapshot is not None:
+                world.simulation_running = snapshot.status["running"]
+                world.simulation_speed = snapshot.status["speed"]
+                # Every client gets the same text, decoded once per tick for the whole worker
+                if settings.MOVEMENT_MODE == "segments":
+                    # As in-process: segments as they start, full snapshots only occasionally, and
+                    # whenever ticks (and so their segments) were missed between two reads
+                    if snapshot.tick != tick:
+                        consecutive = tick is not None and snapshot.tick == tick + 1
+                        if consecutive:
+                            await broadcast_movement_segments(world, snapshot.status["segments"])
+                        if not consecutive or snapshot.tick % settings.SEGMENT_SNAPSHOT_TICKS == 0:
+                            await broadcast_agent_update(world)
+                        tick = snapshot.tick
+                elif snapshot.status["etag"] != etag:
+                    etag = snapshot.status["etag"]
+                    await broadcast_agent_update(world)
+                if snapshot.conversations_json != conversations:
+                    conversations = snapshot.conversations_json
+                    await broadcast_conversation_update(world)
+        except Exception as e:
+            logger.error(f"Error relaying the state bus: {e}")
+        await asyncio.sleep(settings.STATE_BUS_POLL_INTERVAL)
+
+async def run_simulation(world: World):
+    """Run a world's simulation loop in the background."""
+    while True:
+        try:
+            tick_start = time.perf_counter()
+            segments = []
+            if world.simulation_running:
+                logger.debug("Simulation running - updating agents")
+                tick_phase.name = "move"
+                # Agents given a new decision since the last tick act on it in this one
+                decided = world.thinking_service.pop_decided_agents()
+                if decided:
+                    world.agent_service.wake_agents(decided)
+                
+                # Update agent positions using parallel threads
+                try:
+                    world.agent_service.update_agents_parallel()
+                    logger.debug("Parallel agent update completed successfully")
+                except Exception as e:
+                    logger.error(f"Error in parallel agent update: {e}")
+                    # Fallback to synchronous update
+                    world.agent_service.update_agents()
+                    logger.info("Fallback to synchronous agent update completed")
+                
+                # Process agent conversations (only as many as there is LLM capacity for)
+                tick_phase.name = "conversation"
+                conversations = world.agent_service.get_conversation_queue(
+                    world.conversation_service.available_capacity()
+                )
+                if conversations:
+                    logger.info(f"Processing {len(conversations)} conversations")
+                    world.conversation_service.add_pending_conversations(conversations)
+                    # Generated in the background, like thoughts; the tick only queues them
+                    world.conversation_service.start_conversation_batch()
+                
+                # Release agents whose conversations are done, and show what they said
+                finished = world.conversation_service.pop_completed_conversations()
+                if finished:
+                    world.agent_service.finish_conversations(finished)
+                    await broadcast_conversation_update(world)
+                
+                # Generate thoughts for agents that need them, in the background (only queueing them waits here)
+                tick_phase.name = "thinking"
+                thinking_agents = world.agent_service.get_agent_for_thinking()
+                if thinking_agents:
+                    world.thinking_service.add_pending_agents(thinking_agents)
+                    world.thinking_service.start_thinking_batch()
+                
+                # Use idle LLM capacity to think ahead for agents coming off cooldown
+                world.thinking_service.prefetch(
+                    world.agent_service.get_agents_to_prefetch(settings.THINK_PREFETCH_TICKS)
+                )
+                
+                # Broadcast agent updates
+                tick_phase.name = "broadcast"
+                if settings.MOVEMENT_MODE == "segments":
+                    # Segments are sent when they start, full snapshots only occasionally
+                    segments = world.agent_service.get_movement_segments()
+                    await broadcast_movement_segments(world, segments)
+                    if world.agent_service.tick % settings.SEGMENT_SNAPSHOT_TICKS == 0:
+                        await broadcast_agent_update(world)
+                else:
+                    await broadcast_agent_update(world)
+            
+            # In the simulation process, hand the tick over to the API workers
+            if world.state_bus is not None:
+                tick_phase.name = "broadcast"
+                publish_state(world, segments)
+            tick_phase.name = "idle"
+            
+            # Use a faster base simulation speed for smoother movement
+            base_speed = max(50, world.simulation_speed // 4)  # At least 50ms, or 1/4 of set speed
+            world.agent_service.tick_interval = base_speed / 1000
+            
+            # Sleep only for what is left of the tick so the frame rate stays stable
+            tick_elapsed = time.perf_counter() - tick_start
+            if tick_elapsed > base_speed / 1000:
+                logger.debug(f"Tick overran its interval: {tick_elapsed * 1000:.1f}ms > {base_speed}ms")
+            await asyncio.sleep(max(0.0, base_speed / 1000 - tick_elapsed))  # Convert ms to seconds
+        except Exception as e:
+            logger.error(f"Error in simulation loop: {e}")
+            await asyncio.sleep(1)  # Sleep on error to prevent CPU spinning
+
+if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
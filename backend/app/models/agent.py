@@ -1,287 +1,414 @@
-import random
-import numpy as np
-import time
-from typing import List, Dict, Any, Optional, Tuple
-import logging
-
-from app.core.config import settings
-
-logger = logging.getLogger(__name__)
-
-class Agent:
-    """Agent class representing an autonomous entity in the simulated world."""
-    
-    def __init__(self, agent_id: int, name: str, x: int, y: int, color: str):
-        self.id = agent_id
-        self.name = name
-        self.x = x
-        self.y = y
-        # Target coordinates for smooth movement
-        self.target_x = x
-        self.target_y = y
-        self.color = color
-        self.memory: List[str] = []
-        self.personality = self._generate_personality()
-        self.goal = self._generate_goal()
-        self.last_thought = ""
-        self.conversations: List[str] = []
-        self.conversation_cooldown = 0  # Cooldown to prevent conversation spam
-        self.move_enabled = True  # Add this flag
-
-        
-        # Improved smooth movement parameters
-        self.move_progress = 1.0  # 1.0 means movement is complete
-        self.last_x = x
-        self.last_y = y
-        
-        # Movement queue for continuous animations
-        self.movement_queue: List[Tuple[int, int]] = []
-        self.thinking_cooldown = 0  # Limit thinking frequency
-        
-        # The next thought to be processed
-        self.next_thought: Optional[str] = None
-    
-    def _generate_personality(self) -> str:
-        """Generate a random personality for the agent."""
-        personalities = [
-            "Curious and explorative", 
-            "Analytical and cautious",
-            "Social and friendly",
-            "Independent and resourceful",
-            "Creative and imaginative"
-        ]
-        return random.choice(personalities)
-    
-    def _generate_goal(self) -> str:
-        """Generate a random goal for the agent."""
-        goals = [
-            "Explore the entire world",
-            "Interact with every other agent",
-            "Collect knowledge about the environment",
-            "Find an optimal location to settle",
-            "Create alliances with other agents"
-        ]
-        return random.choice(goals)
-    
-    def move(self, agents: List['Agent'], world_size: int, conversation_queue: List[Tuple['Agent', 'Agent']]) -> None:
-        """Move the agent in the world."""
-        
-        if not self.move_enabled:
-            return
-
-        # If the agent is currently conversing, do not move
-        if any(task[0].id == self.id or task[1].id == self.id for task in conversation_queue):
-            return
-        
-        # Update position with smooth interpolation
-        if self.move_progress < 1.0:
-            # Use a cubic easing function for smoother motion (ease-in-out)
-            t = self.move_progress
-            # Cubic easing: t³ * (t * (t * 6 - 15) + 10)
-            smooth_t = t**3 * (t * (t * 6 - 15) + 10)
-            
-            # Linear interpolation between current position and target with easing
-            self.x = int(self.last_x + (self.target_x - self.last_x) * smooth_t)
-            self.y = int(self.last_y + (self.target_y - self.last_y) * smooth_t)
-            
-            # Faster progress for quicker but smooth animation
-            progress_step = 0.2  # Adjust this value for speed (higher = faster)
-            self.move_progress = min(self.move_progress + progress_step, 1.0)
-            
-            # If we have items in the movement queue and we're almost done with current movement
-            # prepare for the next movement to avoid stopping
-            if len(self.movement_queue) > 0 and self.move_progress >= 0.9:
-                next_target = self.movement_queue.pop(0)
-                # Set up next movement when current is almost complete
-                self.prepare_next_movement(next_target, world_size)
-        else:
-            # Movement is complete, decide on next move if we don't have queued movements
-            if len(self.movement_queue) == 0:
-                # Decrease thinking cooldown
-                if self.thinking_cooldown > 0:
-                    self.thinking_cooldown -= 1
-                else:
-                    # Register for thinking if needed
-                    if random.random() < settings.THINK_CHANCE:
-                        # This will now be handled by the ThinkingService
-                        self.thinking_cooldown = settings.THINK_COOL_DOWN
-                
-                # If we already have a next_thought, use it
-                if self.next_thought:
-                    self.last_thought = self.next_thought
-                    self.next_thought = None
-                    thought = self.last_thought
-                else:
-                    # Use the last thought or a simple default
-                    thought = self.last_thought if self.last_thought else "I'll move randomly."
-                
-                # Extract direction from thought or choose randomly
-                direction = self._extract_direction_from_thought(thought)
-                
-                # Calculate new target position based on direction
-                new_target = self._calculate_target_position(direction, world_size)
-                
-                # Add movement to queue instead of immediately changing target
-                self.movement_queue.append(new_target)
-                
-                # If we have something in the queue, prepare for movement
-                if self.movement_queue:
-                    next_target = self.movement_queue.pop(0)
-                    self.prepare_next_movement(next_target, world_size)
-            
-            self.conversation_cooldown -= 1  # Decrease cooldown each move
-        
-        # Check for nearby agents to interact with
-        if random.random() < 0.7:  # 70% chance to check for interactions
-            self._check_for_interactions(agents, conversation_queue)
-    
-    def prepare_next_movement(self, target_position: Tuple[int, int], world_size: int) -> None:
-        """Prepare the agent for the next movement."""
-        # Store current position as last position
-        self.last_x = self.x
-        self.last_y = self.y
-        
-        # Set new target
-        target_x, target_y = target_position
-        
-        # Ensure targets are within terrain bounds
-        self.target_x = max(150, min(target_x, 350))
-        self.target_y = max(150, min(target_y, 300))
-        
-        # Record memory if actually moving
-        if self.target_x != self.x or self.target_y != self.y:
-            # Determine direction for memory
-            direction = "unknown"
-            if abs(self.target_x - self.x) > abs(self.target_y - self.y):
-                direction = "east" if self.target_x > self.x else "west"
-            else:
-                direction = "south" if self.target_y > self.y else "north"
-                
-            event = f"{self.name} moved {direction} to ({self.target_x}, {self.target_y})"
-            self._add_memory(event)
-            
-            # Reset progress to start new movement
-            self.move_progress = 0.0
-    
-    def _extract_direction_from_thought(self, thought: str) -> str:
-        """Extract movement direction from thought text or choose randomly."""
-        thought_lower = thought.lower()
-        
-        if 'north' in thought_lower:
-            return 'north'
-        elif 'south' in thought_lower:
-            return 'south'
-        elif 'east' in thought_lower:
-            return 'east'
-        elif 'west' in thought_lower:
-            return 'west'
-        elif 'stay' in thought_lower:
-            return 'stay'
-        else:
-            return random.choice(['north', 'south', 'east', 'west', 'stay'])
-    
-    def _calculate_target_position(self, direction: str, world_size: int) -> Tuple[int, int]:
-        """Calculate new target position based on direction."""
-        # Current position
-        curr_x, curr_y = self.x, self.y
-        
-        # Define terrain boundaries (agents stay within terrain area)
-        min_x, max_x = 150, 350
-        min_y, max_y = 150, 300
-        
-        # Calculate random step size (for more natural movement)
-        step_size = random.randint(5, 15)
-        
-        # Try the preferred direction first
-        if direction == 'north' and curr_y > min_y:
-            return (curr_x, max(curr_y - step_size, min_y))
-        elif direction == 'south' and curr_y < max_y:
-            return (curr_x, min(curr_y + step_size, max_y))
-        elif direction == 'east' and curr_x < max_x:
-            return (min(curr_x + step_size, max_x), curr_y)
-        elif direction == 'west' and curr_x > min_x:
-            return (max(curr_x - step_size, min_x), curr_y)
-        else:
-            # If preferred direction is blocked, find alternative movement
-            # List all possible directions and their validity
-            possible_moves = []
-            
-            # Check north
-            if curr_y > min_y + step_size:
-                possible_moves.append(('north', curr_x, curr_y - step_size))
-            
-            # Check south  
-            if curr_y < max_y - step_size:
-                possible_moves.append(('south', curr_x, curr_y + step_size))
-            
-            # Check east
-            if curr_x < max_x - step_size:
-                possible_moves.append(('east', curr_x + step_size, curr_y))
-            
-            # Check west
-            if curr_x > min_x + step_size:
-                possible_moves.append(('west', curr_x - step_size, curr_y))
-            
-            # If we have possible moves, choose one randomly
-            if possible_moves:
-                _, new_x, new_y = random.choice(possible_moves)
-                return (new_x, new_y)
-            else:
-                # If really stuck (rare case), move to center area
-                center_x = (min_x + max_x) // 2
-                center_y = (min_y + max_y) // 2
-                
-                # Move towards center with some randomness
-                target_x = curr_x + (random.randint(-10, 10) if abs(curr_x - center_x) < 20 else (10 if center_x > curr_x else -10))
-                target_y = curr_y + (random.randint(-10, 10) if abs(curr_y - center_y) < 20 else (10 if center_y > curr_y else -10))
-                
-                # Ensure within bounds
-                target_x = max(min_x, min(target_x, max_x))
-                target_y = max(min_y, min(target_y, max_y))
-                
-                return (target_x, target_y)
-    
-    def _check_for_interactions(self, agents: List['Agent'], conversation_queue: List[Tuple['Agent', 'Agent']]) -> None:
-        """Check for and initiate interactions with nearby agents."""
-        # Only check when agent is not actively moving or about to move
-        if self.move_progress >= 0.8:
-            for agent in agents:
-                if agent.id != self.id:
-                    distance = np.sqrt((self.x - agent.x)**2 + (self.y - agent.y)**2)
-                    if distance < settings.INTERACTION_RADIUS:  # Interaction radius
-                        # Generate conversation between agents
-                        if random.random() < 0.6 and self.conversation_cooldown <= 0:  # 60% chance when nearby
-                            # This will add to conversation_queue
-                            conversation_queue.append((self, agent))
-                            self.conversation_cooldown = 2  # Set cooldown
-                            agent.conversation_cooldown = 2  # Set cooldown for other agent too
-                        
-                        interaction = f"{self.name} met {agent.name} at ({self.x}, {self.y})"
-                        self._add_memory(interaction)
-    
-    def _add_memory(self, event: str) -> None:
-        """Add a memory to the agent's memory list."""
-        timestamp = time.strftime("%H:%M:%S")
-        memory_item = f"[{timestamp}] {event}"
-        self.memory.append(memory_item)
-        
-        # Keep memory size limited
-        if len(self.memory) > settings.MAX_MEMORY:
-            self.memory.pop(0)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert agent to dictionary for API responses."""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'x': self.x,
-            'y': self.y,
-            'target_x': self.target_x,
-            'target_y': self.target_y,
-            'color': self.color,
-            'memory': self.memory,
-            'personality': self.personality,
-            'goal': self.goal,
-            'last_thought': self.last_thought,
-            'move_progress': self.move_progress
+import json
+import random
+import numpy as np
+import time
+from typing import Callable, List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+import logging
+
+from app.core.config import settings
+from app.models.terrain import terrain
+from app.models.pydantic_models import ThinkingDecision
+from app.models.memory import MemoryStore
+
+if TYPE_CHECKING:
+    from app.services.conversation_scheduler import ConversationScheduler
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class Agent:
+    """Agent class representing an autonomous entity in the simulated world."""
+    
+    # Attributes included in to_dict(), assigning a new value to one invalidates the cached JSON
+    _SERIALIZED_FIELDS = frozenset({
+        'id', 'name', 'x', 'y', 'target_x', 'target_y', 'color', 'memory',
+        'personality', 'goal', 'last_thought', 'move_progress'
+    })
+    
+    def __init__(self, agent_id: int, name: str, x: int, y: int, color: str):
+        # Cached JSON encoding of to_dict(), rebuilt only when a serialized field changed
+        self._json: Optional[str] = None
+        self._dirty = True
+        # Set on every change of a serialized field, until AgentService counts it into its world version
+        self._changed = True
+        
+        self.id = agent_id
+        self.name = name
+        self.x = x
+        self.y = y
+        # Target coordinates for smooth movement
+        self.target_x = x
+        self.target_y = y
+        self.color = color
+        self.memory: List[str] = []  # most recent events, for display
+        self.long_term_memory = MemoryStore()  # everything else, indexed for prompts
+        self.personality = self._generate_personality()
+        self.goal = self._generate_goal()
+        self.last_thought = ""
+        self.conversations: List[str] = []
+        self.conversation_cooldown_until = 0  # Tick the conversation cooldown ends, to prevent conversation spam
+        self.move_enabled = True  # Add this flag
+
+        
+        # Improved smooth movement parameters
+        self.move_progress = 1.0  # 1.0 means movement is complete
+        self.last_x = x
+        self.last_y = y
+        
+        # Tick the current movement segment started at (segment mode)
+        self.segment_start_tick = 0
+        # Tick of the last update, used to catch up agents simulated at a lower level of detail
+        self.last_update_tick = 0
+        
+        # Movement queue for continuous animations
+        self.movement_queue: List[Tuple[int, int]] = []
+        self.thinking_cooldown_until = 0  # Tick the thinking cooldown ends, to limit thinking frequency
+        
+        # The next decision to be processed, and the one currently followed
+        self.next_decision: Optional[ThinkingDecision] = None
+        self.decision: Optional[ThinkingDecision] = None
+    
+    def _generate_personality(self) -> str:
+        """Generate a random personality for the agent."""
+        personalities = [
+            "Curious and explorative", 
+            "Analytical and cautious",
+            "Social and friendly",
+            "Independent and resourceful",
+            "Creative and imaginative"
+        ]
+        return random.choice(personalities)
+    
+    def _generate_goal(self) -> str:
+        """Generate a random goal for the agent."""
+        goals = [
+            "Explore the entire world",
+            "Interact with every other agent",
+            "Collect knowledge about the environment",
+            "Find an optimal location to settle",
+            "Create alliances with other agents"
+        ]
+        return random.choice(goals)
+    
+    def move(self, agents: List['Agent'], world_size: int, conversation_scheduler: 'ConversationScheduler',
+             tick: int = 0) -> Optional[int]:
+        """Move the agent in the world.
+        
+        Returns the number of ticks until the agent next needs an update,
+        or None if it can sleep until it is explicitly woken.
+        """
+        
+        if not self.move_enabled:
+            return None
+
+        # If the agent is currently conversing, do not move (it is woken when the conversation ends)
+        if conversation_scheduler.is_busy(self.id):
+            return None
+        
+        # In segment mode positions are derived analytically from the tick instead of stepped
+        segment_mode = settings.MOVEMENT_MODE == "segments"
+        if segment_mode:
+            self.sync_position(tick)
+        
+        # Ticks since the last update (more than one for agents updated at a lower rate)
+        elapsed_ticks = max(1, tick - self.last_update_tick)
+        self.last_update_tick = tick
+        
+        # Update position with smooth interpolation
+        if self.move_progress < 1.0 and not segment_mode:
+            # Faster progress for quicker but smooth animation
+            progress_step = 0.2  # Adjust this value for speed (higher = faster)
+            
+            # Catch up analytically on the ticks skipped since the last update
+            self.move_progress = min(self.move_progress + progress_step * (elapsed_ticks - 1), 1.0)
+            self._interpolate(self.move_progress)
+            
+            self.move_progress = min(self.move_progress + progress_step, 1.0)
+            
+            # If we have items in the movement queue and we're almost done with current movement
+            # prepare for the next movement to avoid stopping
+            if len(self.movement_queue) > 0 and self.move_progress >= 0.9:
+                next_target = self.movement_queue.pop(0)
+                # Set up next movement when current is almost complete
+                self.prepare_next_movement(next_target, world_size, tick)
+        elif self.move_progress >= 1.0:
+            # Movement is complete, decide on next move if we don't have queued movements
+            if len(self.movement_queue) == 0:
+                # Register for thinking if needed
+                if tick >= self.thinking_cooldown_until and random.random() < settings.THINK_CHANCE:
+                    # This will now be handled by the ThinkingService
+                    self.thinking_cooldown_until = tick + settings.THINK_COOL_DOWN
+                
+                # A new decision from the thinking service replaces the current one
+                if self.next_decision:
+                    self.decision = self.next_decision
+                    self.next_decision = None
+                    self.last_thought = self.decision.say or f"Heading {self.decision.direction}."
+                
+                if self.decision:
+                    direction = self._direction_from_decision(self.decision, agents, tick)
+                else:
+                    # No decision yet: pick a direction randomly
+                    direction = self._extract_direction_from_thought(self.last_thought or "I'll move randomly.")
+                
+                # Calculate new target position based on direction
+                new_target = self._calculate_target_position(direction, world_size)
+                
+                # Add movement to queue instead of immediately changing target
+                self.movement_queue.append(new_target)
+                
+                # If we have something in the queue, prepare for movement
+                if self.movement_queue:
+                    next_target = self.movement_queue.pop(0)
+                    self.prepare_next_movement(next_target, world_size, tick)
+        
+        # Check for nearby agents to interact with
+        if random.random() < 0.7:  # 70% chance to check for interactions
+            self._check_for_interactions(agents, conversation_scheduler, tick)
+        
+        # Segments only need another update once they complete
+        if segment_mode and self.move_progress < 1.0:
+            return max(1, self.segment_start_tick + settings.SEGMENT_TICKS - tick)
+        
+        # Moving agents are interpolated every tick
+        if self.move_progress < 1.0 or self.movement_queue:
+            return 1
+        
+        # Idle agents sleep until their thinking cooldown expires (or a new thought wakes them);
+        # cooldowns end at a fixed tick, so waking up early does not shorten them
+        return max(1, self.thinking_cooldown_until - tick)
+    
+    def _position_along(self, t: float) -> Tuple[int, int]:
+        """Get the position at progress t of the current movement."""
+        # Use a cubic easing function for smoother motion (ease-in-out)
+        # Cubic easing: t³ * (t * (t * 6 - 15) + 10)
+        smooth_t = t**3 * (t * (t * 6 - 15) + 10)
+        
+        # Linear interpolation between current position and target with easing
+        last_x, last_y, target_x, target_y = self.last_x, self.last_y, self.target_x, self.target_y
+        return int(last_x + (target_x - last_x) * smooth_t), int(last_y + (target_y - last_y) * smooth_t)
+    
+    def _interpolate(self, t: float) -> None:
+        """Place the agent at progress t of its current movement."""
+        self.x, self.y = self._position_along(t)
+    
+    def _segment_progress(self, tick: int) -> float:
+        return min(max((tick - self.segment_start_tick) / settings.SEGMENT_TICKS, 0.0), 1.0)
+    
+    def sync_position(self, tick: int) -> None:
+        """Compute the exact position along the current movement segment (segment mode).
+        
+        Only for the agent's own update or outside of the worker threads: another
+        agent's worker may be moving it at the same time.
+        """
+        if self.move_progress >= 1.0:
+            return
+        
+        self.move_progress = self._segment_progress(tick)
+        self._interpolate(self.move_progress)
+    
+    def position_at(self, tick: int) -> Tuple[int, int]:
+        """Get the position along the current movement segment at `tick` without changing the agent (segment mode)."""
+        if self.move_progress >= 1.0:
+            return self.x, self.y
+        return self._position_along(self._segment_progress(tick))
+    
+    def prepare_next_movement(self, target_position: Tuple[int, int], world_size: int, tick: int = 0) -> None:
+        """Prepare the agent for the next movement."""
+        # Store current position as last position
+        self.last_x = self.x
+        self.last_y = self.y
+        
+        # Set new target
+        target_x, target_y = target_position
+        
+        # Ensure targets are on walkable terrain
+        self.target_x, self.target_y = terrain.snap(target_x, target_y)
+        
+        # Record memory if actually moving
+        if self.target_x != self.x or self.target_y != self.y:
+            # Determine direction for memory
+            direction = "unknown"
+            if abs(self.target_x - self.x) > abs(self.target_y - self.y):
+                direction = "east" if self.target_x > self.x else "west"
+            else:
+                direction = "south" if self.target_y > self.y else "north"
+                
+            event = f"{self.name} moved {direction} to ({self.target_x}, {self.target_y})"
+            # Plain moves are only worth remembering long-term at a landmark
+            self._add_memory(event, kind='moved', importance=0.2, long_term=self.current_location() is not None)
+            
+            # Reset progress to start new movement
+            self.move_progress = 0.0
+            self.segment_start_tick = tick
+    
+    def _direction_from_decision(self, decision: ThinkingDecision, agents: List['Agent'], tick: int = 0) -> str:
+        """Turn a decision into a movement direction, walking towards its target agent if it is still around."""
+        if decision.target:
+            for agent in agents:
+                if agent.name == decision.target and agent.id != self.id:
+                    # Other agents are only read, their own workers update them
+                    x, y = agent.position_at(tick) if settings.MOVEMENT_MODE == "segments" else (agent.x, agent.y)
+                    dx, dy = x - self.x, y - self.y
+                    if dx * dx + dy * dy < settings.INTERACTION_RADIUS ** 2:
+                        return 'stay'
+                    if abs(dx) >= abs(dy):
+                        return 'east' if dx > 0 else 'west'
+                    return 'south' if dy > 0 else 'north'
+        return decision.direction
+    
+    def _extract_direction_from_thought(self, thought: str) -> str:
+        """Extract movement direction (or a point of interest to head for) from thought text or choose randomly."""
+        thought_lower = thought.lower()
+        
+        # Heading for a named point of interest takes precedence over compass directions
+        for point_name in terrain.points_of_interest:
+            if point_name in thought_lower:
+                return point_name
+        
+        if 'north' in thought_lower:
+            return 'north'
+        elif 'south' in thought_lower:
+            return 'south'
+        elif 'east' in thought_lower:
+            return 'east'
+        elif 'west' in thought_lower:
+            return 'west'
+        elif 'stay' in thought_lower:
+            return 'stay'
+        else:
+            return random.choice(['north', 'south', 'east', 'west', 'stay'])
+    
+    def _calculate_target_position(self, direction: str, world_size: int) -> Tuple[int, int]:
+        """Calculate new target position based on direction."""
+        # Current position
+        curr_x, curr_y = self.x, self.y
+        
+        # Resting, or already close enough to the agent it wanted to greet
+        if direction == 'stay':
+            return curr_x, curr_y
+        
+        # Calculate random step size (for more natural movement)
+        step_size = random.randint(5, 15)
+        
+        # Heading for a point of interest follows the shared flow field towards it
+        if direction in terrain.points_of_interest:
+            return terrain.step_towards(curr_x, curr_y, terrain.points_of_interest[direction], step_size)
+        
+        # Candidate steps for each compass direction
+        steps = {
+            'north': (curr_x, curr_y - step_size),
+            'south': (curr_x, curr_y + step_size),
+            'east': (curr_x + step_size, curr_y),
+            'west': (curr_x - step_size, curr_y)
+        }
+        
+        # Try the preferred direction first
+        if direction in steps and terrain.is_walkable(*steps[direction]):
+            return steps[direction]
+        
+        # If preferred direction is blocked, find alternative movement
+        # List all walkable directions, preferring cheaper terrain
+        possible_moves = [step for step in steps.values() if terrain.is_walkable(*step)]
+        
+        # If we have possible moves, choose one randomly
+        if possible_moves:
+            weights = [1.0 / terrain.cost_at(*step) for step in possible_moves]
+            return random.choices(possible_moves, weights=weights)[0]
+        
+        # If really stuck (rare case), move towards the center area
+        return terrain.step_towards(curr_x, curr_y, terrain.points_of_interest['center'], step_size)
+    
+    def _check_for_interactions(self, agents: List['Agent'], conversation_scheduler: 'ConversationScheduler',
+                                tick: int = 0) -> None:
+        """Check for and initiate interactions with nearby agents."""
+        # Only check when agent is not actively moving or about to move
+        # (in segment mode agents are only updated between segments)
+        segment_mode = settings.MOVEMENT_MODE == "segments"
+        if self.move_progress >= 0.8 or segment_mode:
+            for agent in agents:
+                if agent.id != self.id:
+                    # Other agents' positions are only computed when an interaction query needs them,
+                    # without writing them: their own workers may be moving them right now
+                    x, y = agent.position_at(tick) if segment_mode else (agent.x, agent.y)
+                    distance = np.sqrt((self.x - x)**2 + (self.y - y)**2)
+                    if distance < settings.INTERACTION_RADIUS:  # Interaction radius
+                        # Generate conversation between agents
+                        if random.random() < 0.6 and tick >= self.conversation_cooldown_until:  # 60% chance when nearby
+                            # Duplicate requests and pairs still cooling down are dropped by the scheduler
+                            conversation_scheduler.request(self, agent, tick)
+                            self.conversation_cooldown_until = tick + settings.CONVERSATION_COOL_DOWN  # Set cooldown
+                            agent.conversation_cooldown_until = tick + settings.CONVERSATION_COOL_DOWN  # Set cooldown for other agent too
+                        
+                        interaction = f"{self.name} met {agent.name} at ({self.x}, {self.y})"
+                        self._add_memory(interaction, kind='met', entities=(agent.name,), importance=0.4)
+    
+    def current_location(self) -> Optional[str]:
+        """Get the name of the point of interest the agent is at, if any."""
+        radius = settings.MEMORY_LOCATION_RADIUS
+        for name, (x, y) in terrain.points_of_interest.items():
+            if (self.x - x) ** 2 + (self.y - y) ** 2 <= radius * radius:
+                return name
+        return None
+    
+    def _add_memory(self, event: str, kind: str = 'event', entities: Tuple[str, ...] = (),
+                    importance: float = 1.0, long_term: bool = True) -> None:
+        """Add a memory to the agent's memory list and its long-term memory."""
+        timestamp = time.strftime("%H:%M:%S")
+        memory_item = f"[{timestamp}] {event}"
+        self.memory.append(memory_item)
+        
+        # Keep memory size limited
+        if len(self.memory) > settings.MAX_MEMORY:
+            self.memory.pop(0)
+        # The list was changed in place, which __setattr__ does not see
+        self._dirty = True
+        self._changed = True
+        
+        if long_term:
+            self.long_term_memory.add(event, kind, entities, self.current_location(), importance)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in Agent._SERIALIZED_FIELDS and self.__dict__.get(name, _MISSING) != value:
+            # Plain flag writes, so agents moved from worker threads can't lose a change
+            self.__dict__['_dirty'] = True
+            self.__dict__['_changed'] = True
+        self.__dict__[name] = value
+    
+    def pop_changed(self) -> bool:
+        """Whether a serialized field changed since the last call."""
+        changed = self._changed
+        self._changed = False
+        return changed
+    
+    def to_json(self, segment: Optional[Callable[['Agent'], Dict[str, Any]]] = None) -> str:
+        """Get the agent as a JSON object, re-encoded only if a serialized field changed since the last call.
+        
+        `segment` describes the agent's active movement segment (segment mode), it is
+        added for agents that are moving.
+        """
+        if self._dirty or self._json is None:
+            data = self.to_dict()
+            if segment is not None and self.move_progress < 1.0:
+                data['segment'] = segment(self)
+            self._json = json.dumps(data, separators=(',', ':'))
+            self._dirty = False
+        return self._json
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert agent to dictionary for API responses."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'x': self.x,
+            'y': self.y,
+            'target_x': self.target_x,
+            'target_y': self.target_y,
+            'color': self.color,
+            'memory': self.memory,
+            'personality': self.personality,
+            'goal': self.goal,
+            'last_thought': self.last_thought,
+            'move_progress': self.move_progress
         }
\ No newline at end of file
@@ -0,0 +1,150 @@
+import heapq
+import itertools
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+
+class MemoryEvent:
+    """One remembered event with the terms it is indexed under."""
+
+    __slots__ = ('id', 'created_at', 'text', 'kind', 'entities', 'location', 'importance')
+
+    def __init__(self, event_id: int, text: str, kind: str, entities: Iterable[str],
+                 location: Optional[str], importance: float, created_at: Optional[float] = None):
+        self.id = event_id
+        self.created_at = time.monotonic() if created_at is None else created_at
+        self.text = text
+        self.kind = kind
+        self.entities = tuple(entities)
+        self.location = location
+        self.importance = importance
+
+    def terms(self) -> List[str]:
+        """Index terms: the event type, the agents involved and where it happened."""
+        terms = [f"kind:{self.kind}"]
+        terms.extend(f"entity:{entity}" for entity in self.entities)
+        if self.location:
+            terms.append(f"location:{self.location}")
+        return terms
+
+
+class MemoryStore:
+    """Long-term memory of one agent, with an inverted index for top-k relevance queries.
+
+    Posting lists hold event ids in insertion order, so a query only scans the most
+    recent MEMORY_POSTING_SCAN entries per term; older events could not outscore
+    them on recency anyway. This keeps queries well under a millisecond however
+    many events are stored. Ids of removed events are dropped from the old end of a
+    posting list right away; a list is compacted once more than MEMORY_POSTING_MAX_DEAD
+    of it are ids of removed events stuck behind live ones.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity or settings.MEMORY_STORE_CAPACITY
+        self._events: "OrderedDict[int, MemoryEvent]" = OrderedDict()
+        self._index: Dict[str, Deque[int]] = {}
+        self._dead: Dict[str, int] = {}  # term -> ids of removed events still in its posting list
+        self._ids = itertools.count()
+        self._kind_counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, text: str, kind: str = 'event', entities: Iterable[str] = (),
+            location: Optional[str] = None, importance: float = 1.0,
+            created_at: Optional[float] = None) -> MemoryEvent:
+        """Store an event, evicting the oldest one when the store is full."""
+        event = MemoryEvent(next(self._ids), text, kind, entities, location, importance, created_at)
+        self._events[event.id] = event
+        self._kind_counts[kind] = self._kind_counts.get(kind, 0) + 1
+        for term in event.terms():
+            self._index.setdefault(term, deque()).append(event.id)
+
+        while len(self._events) > self.capacity:
+            _, oldest = self._events.popitem(last=False)
+            self._kind_counts[oldest.kind] -= 1
+            self._prune(oldest.terms())
+        return event
+
+    def remove(self, event_ids: Iterable[int]) -> None:
+        """Drop events (e.g. once they are summarized) and prune their postings."""
+        for event_id in event_ids:
+            event = self._events.pop(event_id, None)
+            if event is not None:
+                self._kind_counts[event.kind] -= 1
+                self._prune(event.terms())
+
+    def _prune(self, terms: List[str]) -> None:
+        """Drop postings of a removed event from the given terms' lists."""
+        for term in terms:
+            posting = self._index.get(term)
+            if posting is None:
+                continue
+            dead = self._dead.get(term, 0) + 1
+            while posting and posting[0] not in self._events:
+                posting.popleft()
+                dead -= 1
+            if dead > len(posting) * settings.MEMORY_POSTING_MAX_DEAD:
+                # Removed events behind live ones (e.g. compacted behind a reflection) are never at the old end
+                posting = deque(event_id for event_id in posting if event_id in self._events)
+                self._index[term] = posting
+                dead = 0
+            if not posting:
+                self._index.pop(term, None)
+                self._dead.pop(term, None)
+            else:
+                self._dead[term] = dead
+
+    def count(self, kind: str) -> int:
+        """Number of stored events of a kind."""
+        return self._kind_counts.get(kind, 0)
+
+    def oldest(self, count: int, exclude_kind: Optional[str] = None) -> List[MemoryEvent]:
+        """Get up to `count` of the oldest stored events, optionally skipping one kind."""
+        events = (event for event in self._events.values() if event.kind != exclude_kind)
+        return list(itertools.islice(events, count))
+
+    def query(self, entities: Iterable[str] = (), location: Optional[str] = None,
+              kinds: Iterable[str] = (), k: Optional[int] = None) -> List[MemoryEvent]:
+        """Get the k most relevant events, scored by recency x importance x match."""
+        terms = [f"entity:{entity}" for entity in entities] + [f"kind:{kind}" for kind in kinds]
+        if location:
+            terms.append(f"location:{location}")
+        if not terms:
+            return []
+
+        matches: Dict[int, int] = {}
+        for term in terms:
+            posting = self._index.get(term)
+            if not posting:
+                continue
+            for event_id in itertools.islice(reversed(posting), settings.MEMORY_POSTING_SCAN):
+                if event_id in self._events:
+                    matches[event_id] = matches.get(event_id, 0) + 1
+
+        now = time.monotonic()
+        half_life = settings.MEMORY_RECENCY_HALF_LIFE
+
+        def score(event_id: int) -> float:
+            event = self._events[event_id]
+            recency = 0.5 ** ((now - event.created_at) / half_life)
+            return recency * event.importance * matches[event_id] / len(terms)
+
+        best = heapq.nlargest(k or settings.MEMORY_PROMPT_TOP_K, matches, key=score)
+        return [self._events[event_id] for event_id in best]
+
+    def relevant_text(self, entities: Iterable[str] = (), location: Optional[str] = None,
+                      token_budget: Optional[int] = None) -> List[str]:
+        """Get the texts of the most relevant events that fit into a prompt token budget."""
+        budget = settings.MEMORY_PROMPT_TOKENS if token_budget is None else token_budget
+        texts = []
+        for event in self.query(entities, location):
+            tokens = len(event.text) // 4 + 1
+            if tokens > budget:
+                break
+            budget -= tokens
+            texts.append(event.text)
+        return texts
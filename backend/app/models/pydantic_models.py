@@ -1,56 +1,92 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
-
-class AgentBase(BaseModel):
-    """Base model for agent data."""
-    name: str
-    color: str
-    personality: Optional[str] = None
-    goal: Optional[str] = None
-
-class AgentCreate(AgentBase):
-    """Model for creating a new agent."""
-    x: int = Field(..., ge=0)
-    y: int = Field(..., ge=0)
-
-class AgentResponse(AgentBase):
-    """Model for agent response data."""
-    id: int
-    x: int
-    y: int
-    target_x: int
-    target_y: int
-    memory: List[str] = []
-    last_thought: str = ""
-    move_progress: float = 1.0
-    
-    class Config:
-        orm_mode = True
-
-class AgentUpdate(BaseModel):
-    """Model for updating agent data."""
-    x: Optional[int] = None
-    y: Optional[int] = None
-    last_thought: Optional[str] = None
-
-class ConversationResponse(BaseModel):
-    """Model for conversation data."""
-    timestamp: str
-    content: str
-
-class SimulationStatus(BaseModel):
-    """Model for simulation status."""
-    status: str
-    running: bool
-    num_agents: Optional[int] = None
-    speed: Optional[int] = None
-
-class WebSocketMessage(BaseModel):
-    """Model for WebSocket messages."""
-    type: str
-    data: Dict[str, Any]
-
-class AgentThoughtRequest(BaseModel):
-    """Model for requesting an agent thought."""
-    agent_id: int
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Dict, Any, Optional
+
+class AgentBase(BaseModel):
+    """Base model for agent data."""
+    name: str
+    color: str
+    personality: Optional[str] = None
+    goal: Optional[str] = None
+
+class AgentCreate(AgentBase):
+    """Model for creating a new agent."""
+    x: int = Field(..., ge=0)
+    y: int = Field(..., ge=0)
+
+class AgentResponse(AgentBase):
+    """Model for agent response data."""
+    id: int
+    x: int
+    y: int
+    target_x: int
+    target_y: int
+    memory: List[str] = []
+    last_thought: str = ""
+    move_progress: float = 1.0
+    
+    class Config:
+        orm_mode = True
+
+class AgentUpdate(BaseModel):
+    """Model for updating agent data."""
+    x: Optional[int] = None
+    y: Optional[int] = None
+    last_thought: Optional[str] = None
+
+class ConversationResponse(BaseModel):
+    """Model for conversation data."""
+    timestamp: str
+    content: str
+
+class ArchivedConversation(BaseModel):
+    """Model for a conversation from the archive."""
+    id: int
+    epoch: int
+    created_at: float
+    agent1_id: int
+    agent1_name: str
+    agent2_id: int
+    agent2_name: str
+    location: Optional[str] = None
+    source: str
+    content: str
+    snippet: Optional[str] = None
+
+class WorldCreate(BaseModel):
+    """Model for creating a world."""
+    id: str
+    weight: float = 1.0
+    num_agents: Optional[int] = None
+
+class SimulationStatus(BaseModel):
+    """Model for simulation status."""
+    status: str
+    running: bool
+    num_agents: Optional[int] = None
+    speed: Optional[int] = None
+
+class WebSocketMessage(BaseModel):
+    """Model for WebSocket messages."""
+    type: str
+    data: Dict[str, Any]
+
+class ThinkingDecision(BaseModel):
+    """Compact decision returned by the LLM when an agent thinks."""
+    direction: str  # north, south, east, west, stay or a point of interest
+    target: Optional[str] = None  # name of a nearby agent to walk towards
+    say: str = ""  # short utterance, only used for display
+    
+    @field_validator('direction', mode='before')
+    @classmethod
+    def normalize_direction(cls, value: Any) -> str:
+        return str(value).strip().lower()
+    
+    @field_validator('say', mode='before')
+    @classmethod
+    def truncate_say(cls, value: Any) -> str:
+        return str(value or "").strip()[:80]
+
+class AgentThoughtRequest(BaseModel):
+    """Model for requesting an agent thought."""
+    agent_id: int
     nearby_agent_ids: List[int] = []
\ No newline at end of file
@@ -0,0 +1,267 @@
+import heapq
+import math
+import random
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 8-connected neighbourhood offsets with their step length in cells
+_NEIGHBOURS = [
+    (1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+    (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2))
+]
+
+
+class FlowField:
+    """Shared distance and next-step field towards a single goal cell."""
+
+    def __init__(self, goal: Tuple[int, int], distance: np.ndarray, next_cell: np.ndarray):
+        self.goal = goal
+        self.distance = distance    # travel cost from each cell to the goal (inf = unreachable)
+        self.next_cell = next_cell  # flat index of the next cell on the way to the goal (-1 = none)
+
+
+class Terrain:
+    """Navigation grid rasterized once from the configured terrain features."""
+
+    def __init__(self, world_size: int, cell_size: int, bounds: Dict[str, int],
+                 features: Dict[str, Dict], forest_positions: Dict[str, List[int]]):
+        self.world_size = world_size
+        self.cell_size = cell_size
+        self.bounds = bounds
+        self.width = int(math.ceil(world_size / cell_size))
+        self.height = int(math.ceil(world_size / cell_size))
+
+        # Cell centers in world coordinates
+        centers = (np.arange(self.width) + 0.5) * cell_size
+        self._cx, self._cy = np.meshgrid(centers, centers)
+
+        # Movement cost per cell (inf means not walkable)
+        self.cost = self._rasterize(features, forest_positions)
+        self.walkable = np.isfinite(self.cost)
+        self._walkable_cells = np.flatnonzero(self.walkable)
+
+        # Nearest walkable cell for every cell, used to snap targets onto the grid
+        self._nearest_walkable = self._compute_nearest_walkable()
+
+        # Points of interest agents can head towards
+        self.points_of_interest = self._compute_points_of_interest(features, forest_positions)
+
+        # Flow fields are shared by all agents heading for the same goal, from all AgentWorker threads
+        self._flow_fields: "OrderedDict[Tuple[int, int], FlowField]" = OrderedDict()
+        self._flow_fields_lock = threading.Lock()
+
+        logger.info(
+            f"Rasterized terrain into {self.width}x{self.height} grid "
+            f"({len(self._walkable_cells)} walkable cells, {len(self.points_of_interest)} points of interest)"
+        )
+
+    def _rasterize(self, features: Dict[str, Dict], forest_positions: Dict[str, List[int]]) -> np.ndarray:
+        """Rasterize bounds, terrain polygons and forest into a cost grid."""
+        cost = np.full((self.height, self.width), np.inf)
+
+        # Agents stay within the terrain area
+        inside = (
+            (self._cx >= self.bounds['min_x']) & (self._cx <= self.bounds['max_x']) &
+            (self._cy >= self.bounds['min_y']) & (self._cy <= self.bounds['max_y'])
+        )
+        cost[inside] = 1.0
+
+        # Forest slows agents down around each tree
+        forest_cost = settings.TERRAIN_COSTS.get('forest')
+        if forest_cost is not None:
+            radius = settings.FOREST_RADIUS
+            for fx, fy in zip(forest_positions.get('x', []), forest_positions.get('y', [])):
+                near = ((self._cx - fx) ** 2 + (self._cy - fy) ** 2 <= radius ** 2) & inside
+                cost[near] = np.maximum(cost[near], forest_cost)
+
+        # Polygonal features either block movement or make it more expensive
+        for key, feature in features.items():
+            mask = self._polygon_mask(feature['x'], feature['y'])
+            feature_cost = settings.TERRAIN_COSTS.get(key)
+            if feature_cost is None:
+                cost[mask] = np.inf
+            else:
+                cost[mask & inside] = np.maximum(cost[mask & inside], feature_cost)
+
+        return cost
+
+    def _polygon_mask(self, xs: List[int], ys: List[int]) -> np.ndarray:
+        """Return a mask of the cells whose center lies inside the polygon (ray casting)."""
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        n = len(xs)
+        for i in range(n):
+            x1, y1 = xs[i], ys[i]
+            x2, y2 = xs[(i + 1) % n], ys[(i + 1) % n]
+            if y1 == y2:
+                continue
+            crosses = (y1 > self._cy) != (y2 > self._cy)
+            x_at_y = x1 + (self._cy - y1) * (x2 - x1) / (y2 - y1)
+            mask ^= crosses & (self._cx < x_at_y)
+        return mask
+
+    def _compute_nearest_walkable(self) -> np.ndarray:
+        """Multi-source search from all walkable cells, giving each cell its nearest walkable cell."""
+        nearest = np.full(self.width * self.height, -1, dtype=np.int64)
+        distance = np.full(self.width * self.height, np.inf)
+        heap = []
+        for index in self._walkable_cells:
+            nearest[index] = index
+            distance[index] = 0.0
+            heap.append((0.0, int(index)))
+        heapq.heapify(heap)
+
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if dist > distance[index]:
+                continue
+            gy, gx = divmod(index, self.width)
+            for dx, dy, step in _NEIGHBOURS:
+                nx, ny = gx + dx, gy + dy
+                if 0 <= nx < self.width and 0 <= ny < self.height:
+                    neighbour = ny * self.width + nx
+                    if dist + step < distance[neighbour]:
+                        distance[neighbour] = dist + step
+                        nearest[neighbour] = nearest[index]
+                        heapq.heappush(heap, (dist + step, neighbour))
+        return nearest
+
+    def _compute_points_of_interest(self, features: Dict[str, Dict],
+                                    forest_positions: Dict[str, List[int]]) -> Dict[str, Tuple[int, int]]:
+        """Place a reachable point of interest next to each terrain feature."""
+        points = {}
+        for key, feature in features.items():
+            points[key] = self.snap(int(np.mean(feature['x'])), int(np.mean(feature['y'])))
+        if forest_positions.get('x'):
+            points['forest'] = self.snap(int(np.mean(forest_positions['x'])), int(np.mean(forest_positions['y'])))
+        points['center'] = self.snap(
+            (self.bounds['min_x'] + self.bounds['max_x']) // 2,
+            (self.bounds['min_y'] + self.bounds['max_y']) // 2
+        )
+        return points
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        """Get the grid cell containing a world position."""
+        gx = min(max(int(x // self.cell_size), 0), self.width - 1)
+        gy = min(max(int(y // self.cell_size), 0), self.height - 1)
+        return gx, gy
+
+    def cell_center(self, index: int) -> Tuple[int, int]:
+        """Get the world position of a cell center from its flat index."""
+        gy, gx = divmod(int(index), self.width)
+        return int((gx + 0.5) * self.cell_size), int((gy + 0.5) * self.cell_size)
+
+    def is_walkable(self, x: float, y: float) -> bool:
+        """Check whether a world position can be walked on."""
+        if not (0 <= x < self.world_size and 0 <= y < self.world_size):
+            return False
+        gx, gy = self.cell_of(x, y)
+        return bool(self.walkable[gy, gx])
+
+    def cost_at(self, x: float, y: float) -> float:
+        """Get the movement cost at a world position."""
+        gx, gy = self.cell_of(x, y)
+        return float(self.cost[gy, gx])
+
+    def snap(self, x: float, y: float) -> Tuple[int, int]:
+        """Return the position itself if walkable, otherwise the center of the nearest walkable cell."""
+        if self.is_walkable(x, y):
+            return int(x), int(y)
+        gx, gy = self.cell_of(x, y)
+        nearest = self._nearest_walkable[gy * self.width + gx]
+        if nearest < 0:
+            return int(x), int(y)
+        return self.cell_center(nearest)
+
+    def random_walkable_position(self) -> Tuple[int, int]:
+        """Pick a random walkable position, e.g. for spawning agents."""
+        index = random.choice(self._walkable_cells)
+        gy, gx = divmod(int(index), self.width)
+        x = random.randint(gx * self.cell_size, (gx + 1) * self.cell_size - 1)
+        y = random.randint(gy * self.cell_size, (gy + 1) * self.cell_size - 1)
+        return self.snap(x, y)
+
+    def flow_field(self, goal: Tuple[int, int]) -> FlowField:
+        """Get (or compute once) the shared flow field towards a goal position."""
+        goal_cell = self.cell_of(*self.snap(*goal))
+        with self._flow_fields_lock:
+            field = self._flow_fields.get(goal_cell)
+            if field is not None:
+                self._flow_fields.move_to_end(goal_cell)
+                return field
+
+        # Computed outside the lock so other agents' lookups don't wait for it
+        field = self._compute_flow_field(goal_cell)
+        with self._flow_fields_lock:
+            # Another thread may have computed the same field meanwhile, keep the first one
+            field = self._flow_fields.setdefault(goal_cell, field)
+            self._flow_fields.move_to_end(goal_cell)
+            while len(self._flow_fields) > settings.MAX_FLOW_FIELDS:
+                self._flow_fields.popitem(last=False)
+        return field
+
+    def _compute_flow_field(self, goal_cell: Tuple[int, int]) -> FlowField:
+        """Run Dijkstra outwards from the goal over the cost grid."""
+        size = self.width * self.height
+        distance = np.full(size, np.inf)
+        next_cell = np.full(size, -1, dtype=np.int64)
+        cost = self.cost.ravel()
+
+        goal_index = goal_cell[1] * self.width + goal_cell[0]
+        distance[goal_index] = 0.0
+        heap = [(0.0, goal_index)]
+
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if dist > distance[index]:
+                continue
+            gy, gx = divmod(index, self.width)
+            for dx, dy, step in _NEIGHBOURS:
+                nx, ny = gx + dx, gy + dy
+                if 0 <= nx < self.width and 0 <= ny < self.height:
+                    neighbour = ny * self.width + nx
+                    if not np.isfinite(cost[neighbour]):
+                        continue
+                    # Cost of walking from the neighbour into this cell
+                    new_dist = dist + step * cost[index]
+                    if new_dist < distance[neighbour]:
+                        distance[neighbour] = new_dist
+                        next_cell[neighbour] = index
+                        heapq.heappush(heap, (new_dist, neighbour))
+
+        return FlowField(goal_cell, distance, next_cell)
+
+    def step_towards(self, x: float, y: float, goal: Tuple[int, int], max_distance: int) -> Tuple[int, int]:
+        """Follow the shared flow field from a position for up to max_distance pixels."""
+        field = self.flow_field(goal)
+        gx, gy = self.cell_of(*self.snap(x, y))
+        index = gy * self.width + gx
+        cells = max(1, max_distance // self.cell_size)
+
+        for _ in range(cells):
+            following = field.next_cell[index]
+            if following < 0:
+                break
+            index = following
+
+        if index == gy * self.width + gx:
+            # Already at the goal (or it is unreachable)
+            return self.snap(x, y)
+        return self.cell_center(index)
+
+
+# Create terrain instance
+terrain = Terrain(
+    world_size=settings.WORLD_SIZE,
+    cell_size=settings.NAV_CELL_SIZE,
+    bounds=settings.WALKABLE_BOUNDS,
+    features=settings.TERRAIN_FEATURES,
+    forest_positions=settings.FOREST_POSITIONS
+)
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Dict, Any, Optional
+import json
+import logging
+
+from app.core.config import settings
+from app.services.profiler import ProfilerBusy
+from app.services.state_bus import SimulationUnavailable
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+logger = logging.getLogger(__name__)
+
+@router.get("/logging")
+async def get_logging(request: Request) -> Dict[str, Any]:
+    """Get the log levels of the simulation and how many records were sampled away or dropped."""
+    try:
+        return await request.app.state.simulation_control.log_status()
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.put("/logging")
+async def set_log_level(
+    request: Request,
+    level: str = Query(..., description="DEBUG, INFO, WARNING, ERROR or CRITICAL"),
+    name: str = Query("root", description="Logger name, e.g. app.services.agent_service")
+) -> Dict[str, Any]:
+    """Change a logger's level without restarting."""
+    try:
+        status = await request.app.state.simulation_control.set_log_level(name, level)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    logger.info(f"Log level of {name} set to {level.upper()}")
+    return status
+
+@router.post("/profile")
+async def profile_simulation(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval: float = Query(settings.PROFILER_INTERVAL, ge=0.001, le=1.0, description="Seconds between samples"),
+    all_threads: bool = Query(False, description="Sample every thread, not just the event loop and AgentWorkers"),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$")
+) -> Response:
+    """Sample the running simulation's stacks for a while.
+    
+    The default output is collapsed stacks (`phase:<tick phase>;<thread>;<frames> <count>`),
+    ready for flamegraph.pl or speedscope; `format=json` adds sample counts per phase and
+    the measured sampling overhead.
+    """
+    try:
+        result = await request.app.state.simulation_control.profile(seconds, interval, all_threads)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    if format == "json":
+        return Response(content=json.dumps(result), media_type="application/json")
+    return Response(
+        content=result['collapsed'] + "\n",
+        media_type="text/plain",
+        headers={"X-Profile-Samples": str(result['samples']), "X-Profile-Overhead": str(result['overhead'])}
+    )
+
+
+@router.get("/memory")
+async def memory_report(request: Request) -> Dict[str, Any]:
+    """Approximate footprint of the long-lived structures (agent memories, conversation
+    history, caches, viewers, connections), process RSS, live WebSocket objects and
+    budget alarms. Large containers are sampled, so sizes are estimates.
+    """
+    try:
+        return await request.app.state.simulation_control.memory_report()
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot(request: Request, label: str = Query("")) -> Dict[str, Any]:
+    """Record the current allocations for a later diff.
+    
+    The first snapshot starts tracemalloc, which slows allocations down until it is
+    stopped with DELETE /admin/memory/snapshots.
+    """
+    try:
+        return await request.app.state.simulation_control.memory_snapshot(label)
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/memory/snapshots/{snapshot_id}/diff")
+async def diff_memory_snapshots(
+    request: Request,
+    snapshot_id: int,
+    to: Optional[int] = Query(None, description="Snapshot to compare with; a new one is taken if omitted"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=500)
+) -> Dict[str, Any]:
+    """Largest allocation growth between two snapshots, by source line, file or traceback."""
+    try:
+        return await request.app.state.simulation_control.memory_diff(snapshot_id, to, group_by, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.delete("/memory/snapshots")
+async def stop_memory_tracing(request: Request) -> Dict[str, Any]:
+    """Drop the snapshots and stop tracing allocations."""
+    try:
+        return await request.app.state.simulation_control.memory_stop_tracing()
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
@@ -1,76 +1,187 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from typing import List, Dict, Any, Optional
-import logging
-
-from app.models.pydantic_models import AgentResponse, AgentCreate, SimulationStatus
-from app.core.config import settings
-
-router = APIRouter(prefix="/agents", tags=["agents"])
-logger = logging.getLogger(__name__)
-
-@router.get("/", response_model=List[AgentResponse])
-async def get_all_agents(request: Request) -> List[Dict[str, Any]]:
-    """Get all agents in the simulation."""
-    agent_service = request.app.state.agent_service
-    return agent_service.get_agents_data()
-
-@router.get("/{agent_id}", response_model=AgentResponse)
-async def get_agent(agent_id: int, request: Request) -> Dict[str, Any]:
-    """Get a specific agent by ID."""
-    agent_service = request.app.state.agent_service
-    agent = agent_service.get_agent(agent_id)
-    
-    if not agent:
-        raise HTTPException(status_code=404, detail=f"Agent with ID {agent_id} not found")
-    
-    return agent.to_dict()
-
-@router.post("/reset", response_model=SimulationStatus)
-async def reset_simulation(request: Request, num_agents: int = settings.NUM_AGENTS) -> Dict[str, Any]:
-    """Reset the simulation with a new set of agents."""
-    agent_service = request.app.state.agent_service
-    
-    # Validate input
-    if num_agents < 1 or num_agents > 100:
-        raise HTTPException(status_code=400, detail="Number of agents must be between 1 and 100")
-    
-    # Reset agents
-    agent_service.reset_agents(num_agents)
-    
-    # Stop simulation
-    request.app.state.simulation_running = False
-    
-    return {"status": "reset", "num_agents": num_agents, "running": False}
-
-@router.post("/start", response_model=SimulationStatus)
-async def start_simulation(request: Request) -> Dict[str, Any]:
-    """Start the simulation."""
-    request.app.state.simulation_running = True
-    return {"status": "started", "running": True}
-
-@router.post("/stop", response_model=SimulationStatus)
-async def stop_simulation(request: Request) -> Dict[str, Any]:
-    """Stop the simulation."""
-    request.app.state.simulation_running = False
-    return {"status": "stopped", "running": False}
-
-@router.post("/speed", response_model=SimulationStatus)
-async def set_simulation_speed(speed: int, request: Request) -> Dict[str, Any]:
-    """Set the simulation speed (in milliseconds per update)."""
-    # Validate input
-    if speed < 100 or speed > 5000:
-        raise HTTPException(status_code=400, detail="Speed must be between 100 and 5000 milliseconds")
-    
-    request.app.state.simulation_speed = speed
-    
-    return {
-        "status": "speed_updated", 
-        "speed": speed, 
-        "running": request.app.state.simulation_running
-    }
-
-@router.get("/conversations", response_model=List[str])
-async def get_conversations(request: Request) -> List[str]:
-    """Get all conversations between agents."""
-    conversation_service = request.app.state.conversation_service
-    return conversation_service.get_conversations()
\ No newline at end of file
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import logging
+import math
+
+from app.models.agent import Agent
+from app.models.pydantic_models import AgentResponse, AgentCreate, ArchivedConversation, SimulationStatus
+from app.core.config import settings
+from app.routers.worlds import get_world
+from app.services.state_bus import SimulationUnavailable
+from app.services.world_manager import World
+
+router = APIRouter(prefix="/agents", tags=["agents"])
+logger = logging.getLogger(__name__)
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated field list, rejecting unknown fields."""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in Agent._SERIALIZED_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def _parse_bbox(bbox: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """Parse a min_x,min_y,max_x,max_y bounding box, rejecting it with a 422 like any other invalid query parameter."""
+    if not bbox:
+        return None
+    try:
+        min_x, min_y, max_x, max_y = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="bbox must be min_x,min_y,max_x,max_y")
+    # NaN and infinities parse as floats, but no agent position compares sensibly against them
+    if not all(math.isfinite(value) for value in (min_x, min_y, max_x, max_y)):
+        raise HTTPException(status_code=422, detail="bbox values must be finite numbers")
+    if min_x > max_x or min_y > max_y:
+        raise HTTPException(status_code=422, detail="bbox minimum must not exceed its maximum")
+    return min_x, min_y, max_x, max_y
+
+async def _control(world: World, command: str, **args: Any) -> Dict[str, Any]:
+    """Run a simulation command, in this process or in the simulation process."""
+    try:
+        return await getattr(world.simulation_control, command)(**args)
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client already has the current version."""
+    return etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+
+@router.get("/", response_model=List[AgentResponse])
+async def get_all_agents(
+    request: Request,
+    world: World = Depends(get_world),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    bbox: Optional[str] = Query(None, description="Only agents inside min_x,min_y,max_x,max_y"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor of the previous page")
+) -> Response:
+    """Get agents in the simulation, optionally projected, filtered and paginated."""
+    agent_service = world.agent_service
+    
+    # The world version changes whenever any agent does, so unchanged polls cost nothing
+    etag = agent_service.etag()
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    agents, next_cursor = agent_service.query_agents(_parse_bbox(bbox), cursor, limit)
+    headers = {"ETag": etag}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+    
+    # Pre-encoded fragments are returned as-is, response_model only documents the shape
+    return Response(
+        content=agent_service.agents_json(agents, _parse_fields(fields)),
+        media_type="application/json",
+        headers=headers
+    )
+
+@router.get("/{agent_id}", response_model=AgentResponse)
+async def get_agent(
+    agent_id: int,
+    request: Request,
+    world: World = Depends(get_world),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+) -> Response:
+    """Get a specific agent by ID."""
+    agent_service = world.agent_service
+    agent = agent_service.get_agent(agent_id)
+    
+    if not agent:
+        raise HTTPException(status_code=404, detail=f"Agent with ID {agent_id} not found")
+    
+    etag = agent_service.etag()
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return Response(
+        content=agent_service.get_agent_json(agent_id, _parse_fields(fields)),
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
+
+@router.post("/reset", response_model=SimulationStatus)
+async def reset_simulation(num_agents: int = settings.NUM_AGENTS, world: World = Depends(get_world)) -> Dict[str, Any]:
+    """Reset the simulation with a new set of agents."""
+    # Validate input
+    if num_agents < 1 or num_agents > 100:
+        raise HTTPException(status_code=400, detail="Number of agents must be between 1 and 100")
+    
+    # Reset agents and stop the simulation
+    return await _control(world, "reset", num_agents=num_agents)
+
+@router.post("/start", response_model=SimulationStatus)
+async def start_simulation(world: World = Depends(get_world)) -> Dict[str, Any]:
+    """Start the simulation."""
+    return await _control(world, "start")
+
+@router.post("/stop", response_model=SimulationStatus)
+async def stop_simulation(world: World = Depends(get_world)) -> Dict[str, Any]:
+    """Stop the simulation."""
+    return await _control(world, "stop")
+
+@router.post("/speed", response_model=SimulationStatus)
+async def set_simulation_speed(speed: int, world: World = Depends(get_world)) -> Dict[str, Any]:
+    """Set the simulation speed (in milliseconds per update)."""
+    # Validate input
+    if speed < 100 or speed > 5000:
+        raise HTTPException(status_code=400, detail="Speed must be between 100 and 5000 milliseconds")
+    
+    return await _control(world, "set_speed", speed=speed)
+
+@router.get("/conversations", response_model=List[str])
+async def get_conversations(world: World = Depends(get_world)) -> List[str]:
+    """Get all conversations between agents."""
+    conversation_service = world.conversation_service
+    return conversation_service.get_conversations()
+
+# Agent ids are reused by every restart and reset, each of which starts a new epoch
+_EPOCH = "Only conversations of this epoch (agent_id filters default to the latest one)"
+
+def _archive(world: World):
+    archive = world.conversation_archive
+    if archive is None:
+        raise HTTPException(status_code=404, detail="Conversation archive is disabled (CONVERSATION_ARCHIVE_PATH)")
+    return archive
+
+def _archive_page(response: Response, page: Tuple[List[Dict[str, Any]], Optional[int]]) -> List[Dict[str, Any]]:
+    conversations, next_cursor = page
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return conversations
+
+@router.get("/conversations/archive", response_model=List[ArchivedConversation])
+async def get_archived_conversations(
+    response: Response,
+    world: World = Depends(get_world),
+    agent_id: Optional[int] = Query(None, description="Only conversations this agent took part in"),
+    since: Optional[float] = Query(None, description="Unix time, inclusive"),
+    until: Optional[float] = Query(None, description="Unix time, exclusive"),
+    epoch: Optional[int] = Query(None, description=_EPOCH),
+    limit: int = Query(50, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor of the previous page")
+) -> List[Dict[str, Any]]:
+    """Get archived conversations, newest first."""
+    # Queries read the database on a thread of their own, never touching the simulation
+    page = await asyncio.to_thread(_archive(world).query, agent_id, since, until, cursor, limit, epoch)
+    return _archive_page(response, page)
+
+@router.get("/conversations/archive/search", response_model=List[ArchivedConversation])
+async def search_archived_conversations(
+    response: Response,
+    world: World = Depends(get_world),
+    q: str = Query(..., min_length=1, description="Full-text query, e.g. `explore AND garden` or `\"work together\"`"),
+    agent_id: Optional[int] = Query(None, description="Only conversations this agent took part in"),
+    epoch: Optional[int] = Query(None, description=_EPOCH),
+    limit: int = Query(50, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor of the previous page")
+) -> List[Dict[str, Any]]:
+    """Search archived conversations, newest first, with the matching part in `snippet`."""
+    try:
+        page = await asyncio.to_thread(_archive(world).search, q, agent_id, cursor, limit, epoch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _archive_page(response, page)
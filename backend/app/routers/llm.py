@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Dict, Any
+import logging
+
+from app.services.state_bus import SimulationUnavailable
+
+router = APIRouter(prefix="/llm", tags=["llm"])
+logger = logging.getLogger(__name__)
+
+@router.get("/ready")
+async def get_llm_readiness(request: Request, response: Response) -> Dict[str, Any]:
+    """Report whether every LLM replica has its model loaded (503 until they do)."""
+    try:
+        readiness = await request.app.state.simulation_control.llm_readiness()
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not readiness['ready']:
+        response.status_code = 503
+    return readiness
+
+@router.get("/usage")
+async def get_llm_usage(request: Request) -> Dict[str, Any]:
+    """Get LLM requests, tokens and latency per agent and per replica, plus the remaining budget."""
+    try:
+        return await request.app.state.simulation_control.llm_usage()
+    except SimulationUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Dict, Any
+import logging
+
+from app.core.config import settings
+from app.models.pydantic_models import WorldCreate
+from app.services.world_manager import World
+
+router = APIRouter(prefix="/worlds", tags=["worlds"])
+logger = logging.getLogger(__name__)
+
+def get_world(request: Request, world_id: str = settings.DEFAULT_WORLD) -> World:
+    """Resolve the world a request is about: the `{world_id}` path segment, or the default world."""
+    try:
+        return request.app.state.world_manager.get(world_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+@router.get("/")
+async def list_worlds(request: Request) -> List[Dict[str, Any]]:
+    """Get every world with its weight, state and use of the shared LLM replicas."""
+    return request.app.state.world_manager.describe()
+
+@router.post("/", status_code=201)
+async def create_world(world: WorldCreate, request: Request) -> Dict[str, Any]:
+    """Create a world; it is served at /api/worlds/{id}/agents and /ws/{id} and starts stopped."""
+    if world.num_agents is not None and (world.num_agents < 1 or world.num_agents > 100):
+        raise HTTPException(status_code=400, detail="Number of agents must be between 1 and 100")
+    try:
+        created = request.app.state.world_manager.create(world.id, world.weight, world.num_agents)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return created.describe()
+
+@router.put("/{world_id}/weight")
+async def set_world_weight(world_id: str, request: Request, weight: float = Query(..., gt=0)) -> Dict[str, Any]:
+    """Change a world's share of the LLM replicas relative to the other worlds."""
+    try:
+        return request.app.state.world_manager.set_weight(world_id, weight).describe()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+@router.delete("/{world_id}")
+async def delete_world(world_id: str, request: Request) -> Dict[str, Any]:
+    """Stop a world and disconnect its viewers (the default world stays)."""
+    if world_id == settings.DEFAULT_WORLD:
+        raise HTTPException(status_code=400, detail="The default world can't be deleted")
+    try:
+        await request.app.state.world_manager.remove(world_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    return {"status": "deleted", "id": world_id}
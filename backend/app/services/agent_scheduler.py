@@ -0,0 +1,79 @@
+import heapq
+import itertools
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+
+def sample_wait_ticks(chance: float) -> int:
+    """Sample how many ticks pass until an event with a per-tick chance fires (geometric distribution)."""
+    if chance >= 1.0:
+        return 1
+    if chance <= 0.0:
+        return 2 ** 31
+    return int(math.log(1.0 - random.random()) / math.log(1.0 - chance)) + 1
+
+
+class AgentScheduler:
+    """Priority queue of agent wake-up ticks, so only agents with due events get processed."""
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, int]] = []  # (tick, sequence, agent_id)
+        self._wakeups: Dict[int, int] = {}  # agent_id -> currently scheduled tick
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._wakeups)
+
+    def clear(self) -> None:
+        """Forget all scheduled wake-ups."""
+        self._heap = []
+        self._wakeups = {}
+
+    def schedule(self, agent_id: int, tick: int) -> None:
+        """Schedule an agent for the given tick, replacing any earlier schedule."""
+        self._wakeups[agent_id] = tick
+        heapq.heappush(self._heap, (tick, next(self._sequence), agent_id))
+
+    def wake(self, agent_id: int, tick: int) -> None:
+        """Schedule an agent for the given tick unless it is already due earlier."""
+        scheduled = self._wakeups.get(agent_id)
+        if scheduled is None or tick < scheduled:
+            self.schedule(agent_id, tick)
+
+    def cancel(self, agent_id: int) -> None:
+        """Let an agent sleep until it is explicitly woken."""
+        # Stale heap entries are skipped lazily in pop_due
+        self._wakeups.pop(agent_id, None)
+
+    def next_wakeup(self, agent_id: int) -> Optional[int]:
+        """Get the tick an agent is scheduled for, if any."""
+        return self._wakeups.get(agent_id)
+
+    def upcoming(self, tick: int) -> List[Tuple[int, int]]:
+        """Get (tick, agent_id) of the agents scheduled at or before the given tick, soonest first.
+
+        Nothing is removed. Only the top of the heap down to the first later entries is visited.
+        """
+        found: Dict[int, int] = {}
+        stack = [0]
+        while stack:
+            i = stack.pop()
+            if i >= len(self._heap) or self._heap[i][0] > tick:
+                continue
+            scheduled_tick, _, agent_id = self._heap[i]
+            if self._wakeups.get(agent_id) == scheduled_tick:
+                found[agent_id] = scheduled_tick
+            stack.extend((2 * i + 1, 2 * i + 2))
+        return sorted((scheduled_tick, agent_id) for agent_id, scheduled_tick in found.items())
+
+    def pop_due(self, tick: int) -> List[int]:
+        """Remove and return the ids of all agents due at or before the given tick."""
+        due = []
+        while self._heap and self._heap[0][0] <= tick:
+            scheduled_tick, _, agent_id = heapq.heappop(self._heap)
+            # Skip entries that were replaced or cancelled since they were pushed
+            if self._wakeups.get(agent_id) == scheduled_tick:
+                del self._wakeups[agent_id]
+                due.append(agent_id)
+        return due
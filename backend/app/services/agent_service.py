@@ -1,171 +1,383 @@
-import random
-from typing import List, Dict, Any, Optional, Tuple
-import logging
-
-from app.models.agent import Agent
-from app.core.config import settings
-
-logger = logging.getLogger(__name__)
-
-class AgentService:
-    """Service for managing agents in the simulation."""
-    
-    def __init__(self):
-        """Initialize the agent service with a list of agents."""
-        self.agents: List[Agent] = []
-        self.world_size = settings.WORLD_SIZE
-        self.conversation_queue: List[Tuple[Agent, Agent]] = []
-        # Initialize agents
-        self.reset_agents(settings.NUM_AGENTS)
-        logger.info(f"Initialized AgentService with {len(self.agents)} agents")
-    
-    def reset_agents(self, num_agents: int) -> None:
-        """Reset agents with the specified number."""
-        agent_names = [
-            "Ava", "Neo", "Luna", "Orion", "Zephyr", 
-            "Nova", "Atlas", "Echo", "Iris", "Milo",
-            "Ava", "Neo", "Luna", "Orion", "Zephyr", 
-            "Nova", "Atlas", "Echo", "Iris", "Milo",
-            "Ava", "Neo", "Luna", "Orion", "Zephyr", 
-            "Nova", "Atlas", "Echo", "Iris", "Milo"
-        ]
-        
-        # Parse colors from settings
-        agent_colors = settings.AGENT_COLORS.split(",")
-        
-        # Clear existing agents
-        self.agents = []
-        self.conversation_queue = []
-        
-        # Create new agents
-        for i in range(min(num_agents, len(agent_names))):
-            agent = Agent(
-                agent_id=i,
-                name=agent_names[i],
-                x=random.randint(150, 350),  # Spawn within terrain area
-                y=random.randint(150, 300),  # Spawn within terrain area
-                color=agent_colors[i % len(agent_colors)]
-            )
-            self.agents.append(agent)
-        
-        logger.info(f"Reset to {len(self.agents)} agents")
-    
-    def get_agents(self) -> List[Agent]:
-        """Get all agents."""
-        return self.agents
-    
-    def get_agents_data(self) -> List[Dict[str, Any]]:
-        """Get all agents as serializable dictionaries."""
-        return [agent.to_dict() for agent in self.agents]
-    
-    def get_agent(self, agent_id: int) -> Optional[Agent]:
-        """Get a specific agent by ID."""
-        for agent in self.agents:
-            if agent.id == agent_id:
-                return agent
-        return None
-    
-    def update_agents(self) -> None:
-        """Update all agents (move, think, interact)."""
-        # Process agents sequentially but efficiently
-        for agent in self.agents:
-            agent.move(self.agents, self.world_size, self.conversation_queue)
-    
-    def update_agents_parallel(self) -> None:
-        """Update all agents using parallel threads for maximum performance and independence."""
-        import threading
-        import time
-        import random
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        
-        logger.debug(f"Starting parallel update for {len(self.agents)} agents")
-        
-        def update_single_agent(agent_data):
-            """Update a single agent in its own thread."""
-            agent, agent_index, stagger_delay = agent_data
-            
-            try:
-                # Add staggered delay to prevent perfect synchronization
-                if stagger_delay > 0:
-                    time.sleep(stagger_delay)
-                
-                # Add small random delay for each agent to create natural movement patterns
-                random_delay = random.uniform(0.01, 0.05)  # 10-50ms random delay
-                time.sleep(random_delay)
-                
-                # Create a thread-safe copy of agent list for collision detection
-                agents_copy = self.agents.copy()
-                
-                # Update agent position - each agent moves independently
-                agent.move(agents_copy, self.world_size, self.conversation_queue)
-                
-                logger.debug(f"Thread {agent_index}: Updated agent {agent.name} to position ({agent.x}, {agent.y})")
-                return f"Agent {agent.name} updated successfully"
-                
-            except Exception as e:
-                error_msg = f"Error updating agent {agent.name} in thread {agent_index}: {e}"
-                logger.error(error_msg)
-                return error_msg
-        
-        # Prepare agent data with staggered delays
-        agent_data_list = []
-        for i, agent in enumerate(self.agents):
-            # Stagger agent updates with increasing delays (0ms, 20ms, 40ms, etc.)
-            stagger_delay = i * 0.02  # 20ms delay between each agent start
-            agent_data_list.append((agent, i, stagger_delay))
-        
-        # Use ThreadPoolExecutor for efficient parallel processing
-        max_workers = min(len(self.agents), 10)  # Limit concurrent threads to prevent resource exhaustion
-        
-        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AgentWorker") as executor:
-            # Submit all agent update tasks
-            future_to_agent = {
-                executor.submit(update_single_agent, agent_data): agent_data[0].name 
-                for agent_data in agent_data_list
-            }
-            
-            # Collect results as they complete
-            completed_count = 0
-            error_count = 0
-            
-            for future in as_completed(future_to_agent, timeout=5.0):  # 5 second timeout
-                agent_name = future_to_agent[future]
-                try:
-                    result = future.result()
-                    if "Error" in result:
-                        error_count += 1
-                        logger.warning(f"Agent {agent_name}: {result}")
-                    else:
-                        completed_count += 1
-                        
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Thread exception for agent {agent_name}: {e}")
-        
-        # Log summary
-        total_agents = len(self.agents)
-        logger.info(f"Parallel update completed: {completed_count}/{total_agents} agents updated successfully, {error_count} errors")
-        
-        if error_count > total_agents // 2:  # If more than half failed
-            logger.warning(f"High error rate in parallel update ({error_count}/{total_agents}), consider fallback to synchronous mode")
-    
-    def get_agent_for_thinking(self) -> List[Tuple[Agent, List[Agent]]]:
-        """Get agents that need to think."""
-        thinking_agents = []
-        
-        for agent in self.agents:
-            if agent.thinking_cooldown <= 0 and random.random() < settings.THINK_CHANCE:
-                thinking_agents.append((agent, self.agents))
-                agent.thinking_cooldown = settings.THINK_COOL_DOWN
-        
-        return thinking_agents
-    
-    def get_conversation_queue(self) -> List[Tuple[Agent, Agent]]:
-        """Get the current conversation queue."""
-        queue_copy = self.conversation_queue.copy()
-        self.conversation_queue = []  # Clear the queue after getting it
-        return queue_copy
-    
-    def add_conversation(self, agent1: Agent, agent2: Agent) -> None:
-        """Add a conversation to the queue."""
-        self.conversation_queue.append((agent1, agent2))
\ No newline at end of file
+import bisect
+import json
+import random
+import time
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+from app.models.agent import Agent
+from app.models.terrain import terrain
+from app.services.agent_scheduler import AgentScheduler, sample_wait_ticks
+from app.services.conversation_scheduler import ConversationScheduler
+from app.services.lod_scheduler import LevelOfDetailScheduler, Viewport
+from app.services.spatial_index import BoundingBox, SpatialGrid
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class AgentService:
+    """Service for managing agents in the simulation."""
+    
+    def __init__(self):
+        """Initialize the agent service with a list of agents."""
+        self.agents: List[Agent] = []
+        self.world_size = settings.WORLD_SIZE
+        self.conversation_scheduler = ConversationScheduler()
+        # Simulation clock and event schedules (only agents with due events are processed)
+        self.tick = 0
+        self._agents_by_id: Dict[int, Agent] = {}
+        self._move_scheduler = AgentScheduler()
+        self._think_scheduler = AgentScheduler()
+        # Level of detail: unobserved agents are updated less often and within a tick budget
+        self.lod = LevelOfDetailScheduler(self.conversation_scheduler)
+        # Wall-clock timing of ticks, used to turn movement segments into client-side animations
+        self.tick_interval = max(50, settings.MOVE_INTERVAL // 4) / 1000
+        self.tick_started_at = time.time()
+        self._started_segments: List[Agent] = []
+        # Counts changes of the agents' serialized state (used for ETags and index rebuilds)
+        self._version = 0
+        # Spatial index for bounding-box queries, rebuilt when the world version moves on
+        self._spatial = SpatialGrid(settings.SPATIAL_CELL_SIZE)
+        self._spatial_version = -1
+        # Distinguishes world versions of different server runs
+        self._epoch = time.time_ns()
+        # Initialize agents
+        self.reset_agents(settings.NUM_AGENTS)
+        logger.info(f"Initialized AgentService with {len(self.agents)} agents")
+    
+    def reset_agents(self, num_agents: int) -> None:
+        """Reset agents with the specified number."""
+        agent_names = [
+            "Ava", "Neo", "Luna", "Orion", "Zephyr", 
+            "Nova", "Atlas", "Echo", "Iris", "Milo",
+            "Ava", "Neo", "Luna", "Orion", "Zephyr", 
+            "Nova", "Atlas", "Echo", "Iris", "Milo",
+            "Ava", "Neo", "Luna", "Orion", "Zephyr", 
+            "Nova", "Atlas", "Echo", "Iris", "Milo"
+        ]
+        
+        # Parse colors from settings
+        agent_colors = settings.AGENT_COLORS.split(",")
+        
+        # Clear existing agents
+        self.agents = []
+        self.conversation_scheduler.clear()
+        self._move_scheduler.clear()
+        self._think_scheduler.clear()
+        self._started_segments = []
+        self._version += 1
+        
+        # Create new agents
+        for i in range(min(num_agents, len(agent_names))):
+            x, y = terrain.random_walkable_position()  # Spawn on walkable terrain
+            agent = Agent(
+                agent_id=i,
+                name=agent_names[i],
+                x=x,
+                y=y,
+                color=agent_colors[i % len(agent_colors)]
+            )
+            self.agents.append(agent)
+        
+        # Every agent starts moving on the next tick and thinks after a random wait
+        self._agents_by_id = {agent.id: agent for agent in self.agents}
+        for agent in self.agents:
+            agent.last_update_tick = self.tick
+            self._move_scheduler.schedule(agent.id, self.tick + 1)
+            self._think_scheduler.schedule(agent.id, self.tick + sample_wait_ticks(settings.THINK_CHANCE))
+        
+        logger.info(f"Reset to {len(self.agents)} agents")
+    
+    def get_agents(self) -> List[Agent]:
+        """Get all agents."""
+        return self.agents
+    
+    def get_agents_data(self) -> List[Dict[str, Any]]:
+        """Get all agents as serializable dictionaries."""
+        if settings.MOVEMENT_MODE != "segments":
+            return [agent.to_dict() for agent in self.agents]
+        
+        # In segment mode positions are computed on demand and clients get the active segment to animate
+        agents_data = []
+        for agent in self.agents:
+            agent.sync_position(self.tick)
+            agent_data = agent.to_dict()
+            if agent.move_progress < 1.0:
+                agent_data['segment'] = self._segment_to_dict(agent)
+            agents_data.append(agent_data)
+        return agents_data
+    
+    def get_agents_json(self) -> str:
+        """Get all agents as a JSON array, re-encoding only the agents that changed."""
+        return "[" + ",".join(self._agent_json(agent) for agent in self.agents) + "]"
+    
+    def _agent_json(self, agent: Agent) -> str:
+        """Get one agent's cached JSON fragment, with its movement segment in segment mode."""
+        if settings.MOVEMENT_MODE != "segments":
+            return agent.to_json()
+        agent.sync_position(self.tick)
+        return agent.to_json(self._segment_to_dict)
+    
+    def get_agent_json(self, agent_id: int, fields: Optional[List[str]] = None) -> Optional[str]:
+        """Get one agent's JSON object (projected onto `fields` if given), None if there is no such agent."""
+        agent = self.get_agent(agent_id)
+        if agent is None:
+            return None
+        if fields:
+            return json.dumps({field: getattr(agent, field) for field in fields}, separators=(',', ':'))
+        return self._agent_json(agent)
+    
+    def _segment_to_dict(self, agent: Agent) -> Dict[str, Any]:
+        """Describe an agent's current movement segment for client-side interpolation."""
+        return {
+            'id': agent.id,
+            'start_x': agent.last_x,
+            'start_y': agent.last_y,
+            'target_x': agent.target_x,
+            'target_y': agent.target_y,
+            'start_time': self.tick_started_at - (self.tick - agent.segment_start_tick) * self.tick_interval,
+            'duration': settings.SEGMENT_TICKS * self.tick_interval,
+            'progress': agent.move_progress,
+            'easing': 'smootherstep'
+        }
+    
+    def get_movement_segments(self) -> List[Dict[str, Any]]:
+        """Get the movement segments started since the last call."""
+        segments = [self._segment_to_dict(agent) for agent in self._started_segments]
+        self._started_segments = []
+        return segments
+    
+    def get_agent(self, agent_id: int) -> Optional[Agent]:
+        """Get a specific agent by ID."""
+        return self._agents_by_id.get(agent_id)
+    
+    def world_version(self) -> int:
+        """Get a counter that changes whenever any agent's serialized state changes.
+        
+        Runs on the event loop, never while the agents' worker threads are moving them,
+        so all changes of a tick are counted at once.
+        """
+        if settings.MOVEMENT_MODE == "segments":
+            # Positions are only computed on demand in segment mode
+            for agent in self.agents:
+                agent.sync_position(self.tick)
+        # The list is built in full so every agent's flag is cleared, not just up to the first change
+        if any([agent.pop_changed() for agent in self.agents]):
+            self._version += 1
+        return self._version
+    
+    def etag(self) -> str:
+        """Get an ETag for the current state of all agents."""
+        return f'"{self._epoch:x}-{self.world_version()}"'
+    
+    def query_agents(self, bbox: Optional[BoundingBox] = None, cursor: Optional[int] = None,
+                     limit: Optional[int] = None) -> Tuple[List[Agent], Optional[int]]:
+        """Get agents ordered by id, optionally inside a bounding box, after `cursor` and at most `limit`.
+        
+        Returns the agents and the cursor for the next page (None on the last page).
+        """
+        version = self.world_version()
+        if bbox is None:
+            agents = self.agents
+        else:
+            # The grid is rebuilt lazily, at most once per world version
+            if self._spatial_version != version:
+                self._spatial.rebuild(self.agents)
+                self._spatial_version = version
+            agents = self._spatial.query(bbox)
+        
+        if cursor is not None:
+            agents = agents[bisect.bisect_right(agents, cursor, key=lambda agent: agent.id):]
+        
+        if limit is not None and len(agents) > limit:
+            agents = agents[:limit]
+            return agents, agents[-1].id
+        return agents, None
+    
+    def agents_json(self, agents: List[Agent], fields: Optional[List[str]] = None) -> str:
+        """Encode agents as a JSON array, projected onto `fields` if given."""
+        if not fields:
+            return "[" + ",".join(self._agent_json(agent) for agent in agents) + "]"
+        return json.dumps(
+            [{field: getattr(agent, field) for field in fields} for agent in agents],
+            separators=(',', ':')
+        )
+    
+    def _pop_due_agents(self) -> List[Agent]:
+        """Advance the clock and get the due agents that fit into this tick's budget."""
+        self.tick += 1
+        self.tick_started_at = time.time()
+        due_ids = self._move_scheduler.pop_due(self.tick)
+        due_agents = [self._agents_by_id[agent_id] for agent_id in due_ids if agent_id in self._agents_by_id]
+        
+        # Agents that do not fit into the budget are first in line on the next tick
+        selected, deferred = self.lod.plan(due_agents, settings.TICK_BUDGET_MS / 1000)
+        for agent in deferred:
+            self._move_scheduler.schedule(agent.id, self.tick + 1)
+        return selected
+    
+    def _reschedule(self, agent: Agent, next_update: Optional[int]) -> None:
+        """Schedule an agent's next update after it has been processed."""
+        if next_update is None:
+            # Sleep until woken (e.g. after a conversation or a new thought)
+            self._move_scheduler.cancel(agent.id)
+        else:
+            # Agents nobody is watching are updated at a lower rate and caught up when processed
+            next_update = max(next_update, self.lod.update_interval(agent))
+            self._move_scheduler.schedule(agent.id, self.tick + next_update)
+        
+        # Remember newly started segments so they are broadcast exactly once
+        if settings.MOVEMENT_MODE == "segments" and agent.move_progress < 1.0 and agent.segment_start_tick == self.tick:
+            self._started_segments.append(agent)
+    
+    def wake_agents(self, agents: List[Agent]) -> None:
+        """Make sure the given agents are updated on the next tick."""
+        for agent in agents:
+            self._move_scheduler.wake(agent.id, self.tick + 1)
+    
+    def set_viewport(self, viewer_id: Any, viewport: Viewport) -> None:
+        """Register a viewer's visible area and catch up the agents that came into view."""
+        self.lod.set_viewport(viewer_id, viewport)
+        self.wake_agents([agent for agent in self.agents if self.lod.is_observed(agent)])
+    
+    def remove_viewer(self, viewer_id: Any) -> None:
+        """Forget a disconnected viewer."""
+        self.lod.remove_viewer(viewer_id)
+    
+    def update_agents(self) -> None:
+        """Update agents with due events (move, think, interact)."""
+        due_agents = self._pop_due_agents()
+        start_time = time.perf_counter()
+        
+        # Process due agents sequentially but efficiently
+        for agent in due_agents:
+            self._reschedule(agent, agent.move(self.agents, self.world_size, self.conversation_scheduler, self.tick))
+        
+        self.lod.record_cost(time.perf_counter() - start_time, len(due_agents))
+    
+    def update_agents_parallel(self) -> None:
+        """Update all agents using parallel threads for maximum performance and independence."""
+        from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+        
+        due_agents = self._pop_due_agents()
+        next_updates: Dict[int, Optional[int]] = {}
+        
+        logger.debug(f"Starting parallel update for {len(due_agents)}/{len(self.agents)} due agents")
+        
+        if not due_agents:
+            return
+        
+        def update_single_agent(agent_data):
+            """Update a single agent in its own thread."""
+            agent, agent_index = agent_data
+            
+            try:
+                # Create a thread-safe copy of agent list for collision detection
+                agents_copy = self.agents.copy()
+                
+                # Update agent position - each agent moves independently
+                next_updates[agent.id] = agent.move(agents_copy, self.world_size, self.conversation_scheduler, self.tick)
+                
+                logger.debug(f"Thread {agent_index}: Updated agent {agent.name} to position ({agent.x}, {agent.y})")
+                return f"Agent {agent.name} updated successfully"
+                
+            except Exception as e:
+                # Retry on the next tick
+                next_updates[agent.id] = 1
+                error_msg = f"Error updating agent {agent.name} in thread {agent_index}: {e}"
+                logger.error(error_msg)
+                return error_msg
+        
+        # Use ThreadPoolExecutor for efficient parallel processing
+        max_workers = min(len(due_agents), 10)  # Limit concurrent threads to prevent resource exhaustion
+        completed_count = 0
+        error_count = 0
+        start_time = time.perf_counter()
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AgentWorker") as executor:
+                # Submit all agent update tasks
+                future_to_agent = {
+                    executor.submit(update_single_agent, (agent, i)): agent.name
+                    for i, agent in enumerate(due_agents)
+                }
+                
+                # Collect results as they complete
+                for future in as_completed(future_to_agent, timeout=settings.AGENT_UPDATE_TIMEOUT):
+                    agent_name = future_to_agent[future]
+                    try:
+                        result = future.result()
+                        if "Error" in result:
+                            error_count += 1
+                            logger.warning(f"Agent {agent_name}: {result}")
+                        else:
+                            completed_count += 1
+                            
+                    except Exception as e:
+                        error_count += 1
+                        logger.error(f"Thread exception for agent {agent_name}: {e}")
+        except FuturesTimeout:
+            # The executor still waits for the remaining updates on the way out
+            logger.warning(f"Agent updates took longer than {settings.AGENT_UPDATE_TIMEOUT}s")
+        finally:
+            # Schedule the next update of every processed agent (agents that did not finish retry next tick)
+            for agent in due_agents:
+                self._reschedule(agent, next_updates.get(agent.id, 1))
+        # The tick budget has to see the whole wall time the update took
+        self.lod.record_cost(time.perf_counter() - start_time, len(due_agents))
+        
+        # Log summary
+        total_agents = len(due_agents)
+        logger.debug(f"Parallel update completed: {completed_count}/{total_agents} agents updated successfully, {error_count} errors")
+        
+        if error_count > total_agents // 2:  # If more than half failed
+            logger.warning(f"High error rate in parallel update ({error_count}/{total_agents}), consider fallback to synchronous mode")
+    
+    def get_agent_for_thinking(self) -> List[Tuple[Agent, List[Agent]]]:
+        """Get agents that need to think."""
+        thinking_agents = []
+        
+        # Think events are pre-sampled from THINK_CHANCE, so only due agents are checked
+        for agent_id in self._think_scheduler.pop_due(self.tick):
+            agent = self._agents_by_id.get(agent_id)
+            if agent is None:
+                continue
+            if agent.thinking_cooldown_until <= self.tick:
+                thinking_agents.append((agent, self.agents))
+                agent.thinking_cooldown_until = self.tick + settings.THINK_COOL_DOWN
+                wait_ticks = sample_wait_ticks(settings.THINK_CHANCE)
+            else:
+                # Still cooling down, try again once the cooldown has expired
+                wait_ticks = agent.thinking_cooldown_until - self.tick + sample_wait_ticks(settings.THINK_CHANCE)
+            self._think_scheduler.schedule(agent.id, self.tick + wait_ticks)
+        
+        return thinking_agents
+    
+    def get_agents_to_prefetch(self, lookahead: int) -> List[Tuple[Agent, List[Agent]]]:
+        """Get agents likely to think within the next `lookahead` ticks, soonest first."""
+        upcoming = []
+        for _, agent_id in self._think_scheduler.upcoming(self.tick + lookahead):
+            agent = self._agents_by_id.get(agent_id)
+            # The cooldown has to be nearly over too
+            if agent is not None and agent.thinking_cooldown_until - self.tick <= lookahead:
+                upcoming.append((agent, self.agents))
+        return upcoming
+    
+    def get_conversation_queue(self, capacity: int) -> List[Tuple[Agent, Agent]]:
+        """Get the conversations to start now, at most `capacity` and no agent in two at once."""
+        # Agents of conversations that never finished sleep like busy ones, so they have to be woken
+        released = self.conversation_scheduler.expire(self.tick)
+        if released:
+            self.wake_agents([self._agents_by_id[agent_id] for agent_id in released if agent_id in self._agents_by_id])
+        # Matched agents are busy (and stop moving) until finish_conversations releases them
+        return self.conversation_scheduler.match(capacity, self.tick)
+    
+    def finish_conversations(self, conversations: List[Tuple[Agent, Agent]]) -> None:
+        """Release agents whose conversations are done so they can move and talk again."""
+        for agent1, agent2 in conversations:
+            self.conversation_scheduler.release(agent1, agent2, self.tick)
+        self.wake_agents([agent for pair in conversations for agent in pair])
+    
+    def add_conversation(self, agent1: Agent, agent2: Agent) -> None:
+        """Add a conversation to the queue."""
+        self.conversation_scheduler.request(agent1, agent2, self.tick)
\ No newline at end of file
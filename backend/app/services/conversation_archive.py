@@ -0,0 +1,261 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+
+from app.models.agent import Agent
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS epochs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY,
+    epoch INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    agent1_id INTEGER NOT NULL,
+    agent1_name TEXT NOT NULL,
+    agent2_id INTEGER NOT NULL,
+    agent2_name TEXT NOT NULL,
+    location TEXT,
+    source TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversations_created_at ON conversations (created_at);
+CREATE TABLE IF NOT EXISTS conversation_participants (
+    epoch INTEGER NOT NULL,
+    agent_id INTEGER NOT NULL,
+    conversation_id INTEGER NOT NULL,
+    PRIMARY KEY (epoch, agent_id, conversation_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5 (
+    content, content='conversations', content_rowid='id'
+);
+"""
+
+_COLUMNS = ("c.id, c.epoch, c.created_at, c.agent1_id, c.agent1_name, c.agent2_id, c.agent2_name, c.location, "
+            "c.source, c.content")
+
+# Queued conversation: epoch, created_at, agent1_id, agent1_name, agent2_id, agent2_name, location, source, content
+Record = Tuple[int, float, int, str, int, str, Optional[str], str, str]
+# Queued start of an epoch: id, started_at
+Epoch = Tuple[int, float]
+
+
+def _participant_join(epoch: Optional[int], params: List[Any]) -> str:
+    """Join to the conversations of one agent (its id is the next parameter) of `epoch`, or the latest one."""
+    if epoch is None:
+        # API workers don't know the simulation's epoch, the database does
+        return (" JOIN conversation_participants p ON p.conversation_id = c.id"
+                " AND p.epoch = (SELECT max(id) FROM epochs) AND p.agent_id = ?")
+    params.append(epoch)
+    return " JOIN conversation_participants p ON p.conversation_id = c.id AND p.epoch = ? AND p.agent_id = ?"
+
+
+class ConversationArchive:
+    """Every conversation, kept in a SQLite database with a full-text index.
+
+    The simulation loop only puts conversations on a queue; a writer thread inserts
+    them in batches of up to CONVERSATION_ARCHIVE_BATCH per transaction. The database
+    runs in WAL mode, so queries (from this process or any API worker opening the same
+    file) read a consistent snapshot without blocking the writer or each other.
+    Pages are returned newest first, keyed by conversation id.
+
+    Agent ids are only unique within one population of agents: every start of the
+    simulation and every reset begins a new epoch, recorded with each conversation.
+    Filtering by agent looks at the latest epoch unless another one is asked for.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue[Union[Record, Epoch, None]]" = queue.Queue(settings.CONVERSATION_ARCHIVE_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self.epoch = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        """Create the database if needed and start the writer thread."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        # Ids are assigned by the (only) writer so participants can be inserted in the same batch
+        self._next_id = (connection.execute("SELECT max(id) FROM conversations").fetchone()[0] or 0) + 1
+        with connection:
+            self.epoch = connection.execute("INSERT INTO epochs (started_at) VALUES (?)", (time.time(),)).lastrowid
+        self._writer = threading.Thread(target=self._run, args=(connection,), name="ConversationArchive", daemon=True)
+        self._writer.start()
+        logger.info(f"Archiving conversations to {self.path}")
+
+    def close(self) -> None:
+        """Write what is still queued and stop the writer."""
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+
+    def begin_epoch(self) -> None:
+        """Start a new epoch, for a population of agents that reuses the ids of the previous one."""
+        if self._writer is None:
+            return
+        # Ids are handed out here, the writer only records them
+        self.epoch += 1
+        try:
+            self._queue.put_nowait((self.epoch, time.time()))
+        except queue.Full:
+            # Its conversations still carry the epoch, which is recorded with the first of them
+            logger.warning(f"Conversation archive is behind, epoch {self.epoch} is recorded late")
+
+    def add(self, agent1: Agent, agent2: Agent, content: str, source: str) -> None:
+        """Queue a conversation for writing; never blocks, drops it if the writer is too far behind."""
+        if self._writer is None:
+            return
+        record = (self.epoch, time.time(), agent1.id, agent1.name, agent2.id, agent2.name, agent1.current_location(),
+                  source, content)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Conversation archive is behind, {self.dropped} conversations dropped so far")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # With WAL, a crash may lose the last transactions but never corrupts the database
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _run(self, connection: sqlite3.Connection) -> None:
+        batch_size = settings.CONVERSATION_ARCHIVE_BATCH
+        stopping = False
+        try:
+            while not stopping:
+                record = self._queue.get()
+                if record is None:
+                    break
+                batch = [record]
+                # Give the batch a moment to fill up, so bursts of conversations share a transaction
+                deadline = time.monotonic() + settings.CONVERSATION_ARCHIVE_FLUSH_INTERVAL
+                while len(batch) < batch_size:
+                    try:
+                        record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if record is None:
+                        stopping = True
+                        break
+                    batch.append(record)
+                self._write(connection, batch)
+        finally:
+            connection.close()
+
+    def _write(self, connection: sqlite3.Connection, batch: List[Union[Record, Epoch]]) -> None:
+        epochs = [item for item in batch if len(item) == 2]
+        records = [item for item in batch if len(item) != 2]
+        # An epoch whose start didn't fit into the queue is recorded with its first conversation
+        epochs += [(record[0], record[1]) for record in records]
+        first_id = self._next_id
+        rows = [(first_id + i, *record) for i, record in enumerate(records)]
+        try:
+            with connection:
+                connection.executemany("INSERT OR IGNORE INTO epochs VALUES (?, ?)", epochs)
+                connection.executemany("INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                connection.executemany(
+                    "INSERT OR IGNORE INTO conversation_participants VALUES (?, ?, ?)",
+                    [(row[1], row[agent], row[0]) for row in rows for agent in (3, 5)]
+                )
+                connection.executemany(
+                    "INSERT INTO conversations_fts (rowid, content) VALUES (?, ?)",
+                    [(row[0], row[-1]) for row in rows]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to archive {len(records)} conversations: {e}")
+            return
+        self._next_id += len(records)
+
+    def _read(self) -> Optional[sqlite3.Connection]:
+        """A read-only connection, or None if nothing was archived yet."""
+        if not os.path.exists(self.path):
+            return None
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _page(self, sql: str, params: List[Any], limit: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        connection = self._read()
+        if connection is None:
+            return [], None
+        try:
+            rows = [dict(row) for row in connection.execute(sql, params)]
+        finally:
+            connection.close()
+        next_cursor = rows[-1]['id'] if len(rows) == limit else None
+        return rows, next_cursor
+
+    def query(self, agent_id: Optional[int] = None, since: Optional[float] = None, until: Optional[float] = None,
+              cursor: Optional[int] = None, limit: int = 50,
+              epoch: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """A page of conversations, newest first, optionally of one agent and within a time range or epoch.
+
+        Blocking, run it off the event loop. Returns the page and the cursor of the next one.
+        """
+        # Ordered by the id of the table scanned first, so pages are read off the index without sorting
+        joins, order, clauses, params = "", "c.id", [], []
+        if agent_id is not None:
+            joins, order = _participant_join(epoch, params), "p.conversation_id"
+            params.append(agent_id)
+        elif epoch is not None:
+            clauses.append("c.epoch = ?")
+            params.append(epoch)
+        if cursor is not None:
+            clauses.append(f"{order} < ?")
+            params.append(cursor)
+        if since is not None:
+            clauses.append("c.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("c.created_at < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        return self._page(f"SELECT {_COLUMNS} FROM conversations c{joins}{where} ORDER BY {order} DESC LIMIT ?",
+                          params, limit)
+
+    def search(self, text: str, agent_id: Optional[int] = None, cursor: Optional[int] = None,
+               limit: int = 50, epoch: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Conversations matching a full-text query (FTS5 syntax), newest first, with a highlighted snippet.
+
+        Blocking, run it off the event loop. Raises ValueError for malformed queries.
+        """
+        joins, params = "", []
+        if agent_id is not None:
+            joins = _participant_join(epoch, params)
+            params.append(agent_id)
+        params.append(text)
+        where = ""
+        if agent_id is None and epoch is not None:
+            where = " AND c.epoch = ?"
+            params.append(epoch)
+        if cursor is not None:
+            where += " AND conversations_fts.rowid < ?"
+            params.append(cursor)
+        params.append(limit)
+        sql = (
+            f"SELECT {_COLUMNS}, snippet(conversations_fts, 0, '[', ']', '...', 12) AS snippet"
+            f" FROM conversations_fts JOIN conversations c ON c.id = conversations_fts.rowid{joins}"
+            f" WHERE conversations_fts MATCH ?{where} ORDER BY conversations_fts.rowid DESC LIMIT ?"
+        )
+        try:
+            return self._page(sql, params, limit)
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query: {e}") from e
@@ -0,0 +1,109 @@
+from typing import Dict, List, Tuple
+import logging
+
+from app.models.agent import Agent
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def pair_key(agent1: Agent, agent2: Agent) -> Tuple[int, int]:
+    """Order-independent key for a pair of agents."""
+    return (agent1.id, agent2.id) if agent1.id < agent2.id else (agent2.id, agent1.id)
+
+
+class ConversationScheduler:
+    """Deduplicated conversation requests, busy agents and per-pair cooldowns."""
+
+    def __init__(self):
+        self._requests: Dict[Tuple[int, int], Tuple[Agent, Agent, int]] = {}  # pair -> (agent1, agent2, requested tick)
+        self._busy: Dict[int, int] = {}  # agent_id -> tick its conversation started
+        self._pair_cooldowns: Dict[Tuple[int, int], int] = {}  # pair -> tick the pair may talk again
+        self._last_talked: Dict[int, int] = {}  # agent_id -> tick of its last conversation
+        self.rejected_requests = 0
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def clear(self) -> None:
+        """Forget all requests, busy agents and cooldowns."""
+        self._requests = {}
+        self._busy = {}
+        self._pair_cooldowns = {}
+        self._last_talked = {}
+
+    def is_busy(self, agent_id: int) -> bool:
+        """Check whether an agent is currently in a conversation."""
+        return agent_id in self._busy
+
+    def request(self, agent1: Agent, agent2: Agent, tick: int) -> bool:
+        """Ask for a conversation between two agents; duplicates and cooling-down pairs are dropped."""
+        key = pair_key(agent1, agent2)
+        if (key in self._requests or agent1.id in self._busy or agent2.id in self._busy
+                or self._pair_cooldowns.get(key, 0) > tick):
+            self.rejected_requests += 1
+            return False
+
+        self._requests[key] = (agent1, agent2, tick)
+        return True
+
+    def match(self, capacity: int, tick: int) -> List[Tuple[Agent, Agent]]:
+        """Choose up to `capacity` pending pairs with no agent in more than one conversation.
+
+        Pairs whose agents have waited longest since their last conversation go first,
+        so scarce LLM capacity is spread across the population. Call `expire` first.
+        """
+        if capacity <= 0 or not self._requests:
+            return []
+
+        candidates = sorted(
+            self._requests.items(),
+            key=lambda item: (
+                max(self._last_talked.get(item[0][0], -1), self._last_talked.get(item[0][1], -1)),
+                item[1][2]
+            )
+        )
+
+        matched = []
+        for key, (agent1, agent2, _) in candidates:
+            if len(matched) >= capacity:
+                break
+            if agent1.id in self._busy or agent2.id in self._busy:
+                continue
+            del self._requests[key]
+            self._busy[agent1.id] = tick
+            self._busy[agent2.id] = tick
+            matched.append((agent1, agent2))
+
+        # Requests involving agents that just became busy are no longer useful
+        for key in [key for key in self._requests if key[0] in self._busy or key[1] in self._busy]:
+            del self._requests[key]
+
+        return matched
+
+    def release(self, agent1: Agent, agent2: Agent, tick: int) -> None:
+        """Free two agents after their conversation and start the pair's cooldown."""
+        self._busy.pop(agent1.id, None)
+        self._busy.pop(agent2.id, None)
+        self._pair_cooldowns[pair_key(agent1, agent2)] = tick + settings.PAIR_COOLDOWN_TICKS
+        self._last_talked[agent1.id] = tick
+        self._last_talked[agent2.id] = tick
+
+    def expire(self, tick: int) -> List[int]:
+        """Drop stale requests, expired cooldowns and conversations that never finished.
+
+        Returns the ids of the agents released from conversations that never finished.
+        """
+        for key in [key for key, (_, _, requested) in self._requests.items()
+                    if tick - requested > settings.CONVERSATION_REQUEST_TTL]:
+            del self._requests[key]
+
+        for key in [key for key, until in self._pair_cooldowns.items() if until <= tick]:
+            del self._pair_cooldowns[key]
+
+        released = [agent_id for agent_id, started in self._busy.items()
+                    if tick - started > settings.CONVERSATION_BUSY_TIMEOUT]
+        for agent_id in released:
+            logger.warning(f"Conversation of agent {agent_id} never finished, releasing it")
+            del self._busy[agent_id]
+        return released
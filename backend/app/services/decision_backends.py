@@ -0,0 +1,126 @@
+import random
+import time
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+from app.models.agent import Agent
+from app.models.pydantic_models import ThinkingDecision
+from app.models.terrain import terrain
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Utility weights contributed by keywords in an agent's personality and goal
+TRAIT_WEIGHTS = {
+    'curious': {'explore': 1.0},
+    'explor': {'explore': 1.0},
+    'independent': {'explore': 0.5},
+    'creative': {'explore': 0.3, 'landmark': 0.3},
+    'social': {'social': 1.0},
+    'interact': {'social': 1.0},
+    'alliance': {'social': 0.8},
+    'knowledge': {'landmark': 1.0},
+    'analytical': {'landmark': 0.5, 'rest': 0.3},
+    'cautious': {'rest': 0.5},
+    'settle': {'rest': 1.0, 'landmark': 0.3}
+}
+
+COMPASS_STEPS = {'north': (0, -1), 'south': (0, 1), 'east': (1, 0), 'west': (-1, 0)}
+
+# Situations novel enough to be worth an LLM call
+ESCALATION_RULES = ('always', 'first_meeting', 'goal_changed', 'long_idle')
+
+
+class UtilityPlanner:
+    """Zero-latency planner scoring each option from goal, personality, terrain and nearby agents."""
+
+    def __init__(self):
+        self._weights: Dict[Tuple[str, str], Dict[str, float]] = {}  # (personality, goal) -> utility weights
+
+    def weights(self, agent: Agent) -> Dict[str, float]:
+        """Get the agent's utility weights, derived once per personality and goal."""
+        key = (agent.personality, agent.goal)
+        if key not in self._weights:
+            traits = f"{agent.personality} {agent.goal}".lower()
+            weights = {'explore': 0.2, 'social': 0.0, 'landmark': 0.0, 'rest': 0.1}
+            for keyword, contribution in TRAIT_WEIGHTS.items():
+                if keyword in traits:
+                    for utility, weight in contribution.items():
+                        weights[utility] += weight
+            self._weights[key] = weights
+        return self._weights[key]
+
+    def decide(self, agent: Agent, all_agents: List[Agent], nearby: Tuple[str, ...]) -> ThinkingDecision:
+        """Pick the option with the highest utility (plus a little noise for variety)."""
+        weights = self.weights(agent)
+        step = settings.PLANNER_LOOKAHEAD
+        options: List[Tuple[float, ThinkingDecision]] = []
+
+        # Wander: walkable compass directions, cheaper terrain preferred
+        for direction, (dx, dy) in COMPASS_STEPS.items():
+            x, y = agent.x + dx * step, agent.y + dy * step
+            if terrain.is_walkable(x, y):
+                utility = weights['explore'] / terrain.cost_at(x, y)
+                options.append((utility, ThinkingDecision(direction=direction, say=f"Exploring {direction}.")))
+
+        # Head for a landmark, further ones are more worth the trip
+        for name, (x, y) in terrain.points_of_interest.items():
+            distance = ((agent.x - x) ** 2 + (agent.y - y) ** 2) ** 0.5
+            if distance > settings.INTERACTION_RADIUS:
+                utility = weights['landmark'] * min(1.0, distance / (settings.WORLD_SIZE / 2))
+                options.append((utility, ThinkingDecision(direction=name, say=f"Heading to the {name}.")))
+
+        # Walk up to the closest agent nearby
+        closest = min(
+            (other for other in all_agents if other.name in nearby and other.id != agent.id),
+            key=lambda other: (other.x - agent.x) ** 2 + (other.y - agent.y) ** 2,
+            default=None
+        )
+        if closest is not None:
+            options.append((weights['social'], ThinkingDecision(
+                direction='stay', target=closest.name, say=f"Going to say hi to {closest.name}."
+            )))
+
+        options.append((weights['rest'], ThinkingDecision(direction='stay', say="Resting here for a bit.")))
+
+        return max(options, key=lambda option: option[0] + random.uniform(0, settings.PLANNER_NOISE))[1]
+
+
+class EscalationPolicy:
+    """Decide which thinking requests are novel enough to go to the LLM, counting why."""
+
+    def __init__(self, rules: Optional[List[str]] = None):
+        self.rules = list(settings.THINK_ESCALATION_RULES if rules is None else rules)
+        unknown = set(self.rules) - set(ESCALATION_RULES)
+        if unknown:
+            raise ValueError(f"Unknown escalation rules: {sorted(unknown)}")
+        self._met: Dict[int, Set[str]] = {}  # agent_id -> names of agents it has thought about meeting
+        self._goals: Dict[int, str] = {}  # agent_id -> goal at its last escalation
+        self._last_escalated: Dict[int, float] = {}  # agent_id -> time of its last escalation
+        self.counters: Dict[str, int] = {'local': 0, **{rule: 0 for rule in ESCALATION_RULES}}
+
+    def reason(self, agent: Agent, nearby: Tuple[str, ...]) -> Optional[str]:
+        """Get the first configured rule that calls for the LLM, without recording anything."""
+        for rule in self.rules:
+            if rule == 'always':
+                return rule
+            if rule == 'first_meeting' and set(nearby) - self._met.get(agent.id, set()):
+                return rule
+            if rule == 'goal_changed' and self._goals.get(agent.id) != agent.goal:
+                return rule
+            if rule == 'long_idle' and time.monotonic() - self._last_escalated.get(agent.id, 0.0) > settings.THINK_ESCALATION_IDLE:
+                return rule
+        return None
+
+    def escalate(self, agent: Agent, nearby: Tuple[str, ...]) -> Optional[str]:
+        """Decide whether this thinking request goes to the LLM and remember the agent's situation."""
+        reason = self.reason(agent, nearby)
+        self._met.setdefault(agent.id, set()).update(nearby)
+        if reason is None:
+            self.counters['local'] += 1
+            return None
+
+        self.counters[reason] += 1
+        self._goals[agent.id] = agent.goal
+        self._last_escalated[agent.id] = time.monotonic()
+        return reason
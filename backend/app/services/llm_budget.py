@@ -0,0 +1,137 @@
+import time
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough token count of a prompt (about four characters per token)."""
+    return sum(len(message.get("content", "")) for message in messages) // 4 + 4 * len(messages)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second, up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def has(self, amount: float, now: float) -> bool:
+        """Check whether `amount` tokens could be taken right now."""
+        self._refill(now)
+        return self.tokens >= amount
+
+    def take(self, amount: float) -> None:
+        """Take tokens; the bucket may go into debt when actual usage exceeds the estimate."""
+        self.tokens -= amount
+
+
+class UsageStats:
+    """Accumulated requests, tokens and latency for one agent or replica."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.denied = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, prompt_tokens: int, completion_tokens: int, latency: Optional[float]) -> None:
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        if latency is None:
+            self.errors += 1
+        else:
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        answered = self.requests - self.errors
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'denied': self.denied,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'avg_latency': round(self.total_latency / answered, 3) if answered else None,
+            'max_latency': round(self.max_latency, 3)
+        }
+
+
+class BudgetGovernor:
+    """Global and per-agent request and token budgets, plus usage accounting per agent and replica."""
+
+    def __init__(self):
+        self.global_requests = TokenBucket(settings.LLM_GLOBAL_RPS, settings.LLM_GLOBAL_RPS * 2)
+        self.global_tokens = TokenBucket(settings.LLM_GLOBAL_TPM / 60.0, settings.LLM_GLOBAL_TPM)
+        self._agent_requests: Dict[int, TokenBucket] = {}
+        self._agent_tokens: Dict[int, TokenBucket] = {}
+        self.total = UsageStats()
+        self.agents: Dict[int, UsageStats] = {}
+        self.replicas: Dict[str, UsageStats] = {}
+
+    def _agent_buckets(self, agent_id: int):
+        if agent_id not in self._agent_requests:
+            self._agent_requests[agent_id] = TokenBucket(settings.LLM_AGENT_RPS, max(1.0, settings.LLM_AGENT_RPS * 2))
+            self._agent_tokens[agent_id] = TokenBucket(settings.LLM_AGENT_TPM / 60.0, settings.LLM_AGENT_TPM)
+        return self._agent_requests[agent_id], self._agent_tokens[agent_id]
+
+    def try_acquire(self, agent_id: Optional[int], estimated_tokens: int) -> bool:
+        """Reserve budget for one request; False means the caller should use a fallback."""
+        now = time.monotonic()
+        buckets = [(self.global_requests, 1), (self.global_tokens, estimated_tokens)]
+        if agent_id is not None:
+            agent_requests, agent_tokens = self._agent_buckets(agent_id)
+            buckets += [(agent_requests, 1), (agent_tokens, estimated_tokens)]
+
+        # Only take from the buckets if every one of them has room
+        if not all(bucket.has(amount, now) for bucket, amount in buckets):
+            self.total.denied += 1
+            if agent_id is not None:
+                self.agents.setdefault(agent_id, UsageStats()).denied += 1
+            return False
+
+        for bucket, amount in buckets:
+            bucket.take(amount)
+        return True
+
+    def record(self, agent_id: Optional[int], replica_key: str, estimated_tokens: int,
+               prompt_tokens: int, completion_tokens: int, latency: Optional[float]) -> None:
+        """Account a finished request and settle the difference between estimated and actual tokens."""
+        correction = prompt_tokens + completion_tokens - estimated_tokens
+        self.global_tokens.take(correction)
+        if agent_id is not None:
+            self._agent_buckets(agent_id)[1].take(correction)
+
+        self.total.record(prompt_tokens, completion_tokens, latency)
+        self.replicas.setdefault(replica_key, UsageStats()).record(prompt_tokens, completion_tokens, latency)
+        if agent_id is not None:
+            self.agents.setdefault(agent_id, UsageStats()).record(prompt_tokens, completion_tokens, latency)
+
+    def usage(self) -> Dict[str, Any]:
+        """Get accumulated usage and the remaining global budget."""
+        now = time.monotonic()
+        self.global_requests._refill(now)
+        self.global_tokens._refill(now)
+        return {
+            'total': self.total.to_dict(),
+            'budget': {
+                'requests_available': round(self.global_requests.tokens, 2),
+                'tokens_available': int(self.global_tokens.tokens)
+            },
+            'agents': {agent_id: stats.to_dict() for agent_id, stats in self.agents.items()},
+            'replicas': {replica_key: stats.to_dict() for replica_key, stats in self.replicas.items()}
+        }
@@ -0,0 +1,490 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+
+import httpx
+
+from app.core.config import settings
+from app.services.llm_budget import BudgetGovernor, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an LLM job cannot finish before its deadline."""
+
+
+class BudgetExhausted(Exception):
+    """Raised when the global or per-agent LLM budget has no room for a request."""
+
+
+class AdaptiveConcurrencyLimiter:
+    """In-flight request limit for one replica, adjusted AIMD-style from observed latency and errors.
+
+    When requests have to wait, free slots are shared between tenants (worlds) by
+    weight: a tenant's virtual time advances by 1/weight for every slot it is handed,
+    and the waiting tenant with the lowest virtual time goes next (FIFO within a
+    tenant). A tenant that starts waiting is lifted to the lowest virtual time of
+    those already waiting, so idle periods earn no credit for later bursts.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.limit = float(settings.LLM_INITIAL_CONCURRENCY)
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}  # tenant -> waiting requests
+        self._weights: Dict[str, float] = {}
+        self._virtual: Dict[str, float] = {}  # tenant -> slots handed over while others waited, / weight
+        self.tenant_in_flight: Dict[str, int] = {}
+        self.tenant_granted: Dict[str, int] = {}
+
+    @property
+    def available(self) -> int:
+        """Number of requests that can start right now."""
+        return max(0, int(self.limit) - self.in_flight)
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def acquire(self, tenant: str = settings.DEFAULT_WORLD, weight: float = 1.0) -> None:
+        """Wait until there is room for another in-flight request of `tenant`."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._grant(tenant)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        if tenant not in self._waiters:
+            lowest = min((self._virtual[other] for other in self._waiters), default=0.0)
+            self._virtual[tenant] = max(self._virtual.get(tenant, 0.0), lowest)
+            self._waiters[tenant] = deque()
+        self._waiters[tenant].append(waiter)
+        self._weights[tenant] = weight
+        try:
+            # The releasing request hands its slot over by resolving the future
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just before cancellation, pass it on
+                self._finish(tenant)
+            else:
+                # _wake_waiters may already have dropped it (and its tenant's queue) as cancelled
+                waiters = self._waiters.get(tenant)
+                if waiters is not None and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiters[tenant]
+            raise
+
+    def release(self, latency: Optional[float], error: bool = False, tenant: str = settings.DEFAULT_WORLD) -> None:
+        """Finish a request and adapt the limit from how it went."""
+        if error or latency is None or latency > settings.LLM_TARGET_LATENCY:
+            # Multiplicative decrease on errors, timeouts and slow responses
+            self.failures += 1
+            self.limit = max(float(settings.LLM_MIN_CONCURRENCY), self.limit * settings.LLM_BACKOFF_FACTOR)
+        else:
+            # Additive increase: roughly one extra slot per limit's worth of fast responses
+            self.successes += 1
+            self.limit = min(float(settings.LLM_MAX_CONCURRENCY), self.limit + 1.0 / self.limit)
+
+        self._finish(tenant)
+
+    def abandon(self, tenant: str = settings.DEFAULT_WORLD) -> None:
+        """Free a slot without adapting the limit (e.g. a hedged request that lost the race)."""
+        self._finish(tenant)
+
+    def _grant(self, tenant: str) -> None:
+        self.in_flight += 1
+        self.tenant_in_flight[tenant] = self.tenant_in_flight.get(tenant, 0) + 1
+        self.tenant_granted[tenant] = self.tenant_granted.get(tenant, 0) + 1
+
+    def _finish(self, tenant: str) -> None:
+        self.in_flight -= 1
+        self.tenant_in_flight[tenant] -= 1
+        if not self.tenant_in_flight[tenant]:
+            del self.tenant_in_flight[tenant]
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to the waiting tenants with the lowest virtual time."""
+        while self._waiters and self.in_flight < int(self.limit):
+            tenant = min(self._waiters, key=self._virtual.__getitem__)
+            waiters = self._waiters[tenant]
+            waiter = waiters.popleft()
+            if not waiters:
+                del self._waiters[tenant]
+            if not waiter.done():
+                self._grant(tenant)
+                self._virtual[tenant] += 1.0 / self._weights[tenant]
+                waiter.set_result(None)
+        if not self._waiters:
+            # Nobody is waiting, so there is no share to catch up on
+            self._virtual.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'limit': round(self.limit, 2),
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'successes': self.successes,
+            'failures': self.failures
+        }
+
+
+class LLMPool:
+    """LLM replicas shared by thinking and conversations, with adaptive per-replica concurrency."""
+
+    def __init__(self):
+        """Initialize one async client and concurrency limiter per configured replica."""
+        self.replicas: Dict[str, Dict[str, Any]] = {}
+        # World id -> weight of its share of the replicas when they are contended
+        self.tenants: Dict[str, float] = {}
+        self.budget = BudgetGovernor()
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+        if not settings.OPENAI_API_KEY:
+            logger.warning("No OpenAI API key provided, LLM requests will use fallbacks")
+            return
+
+        try:
+            from openai import AsyncOpenAI
+        except Exception as e:
+            logger.error(f"Failed to import OpenAI client: {e}")
+            return
+
+        for replica_key, service_config in settings.OLLAMA_SERVICES.items():
+            try:
+                client = AsyncOpenAI(
+                    base_url=service_config["base_url"],
+                    api_key=settings.OPENAI_API_KEY,
+                    timeout=settings.LLM_REQUEST_TIMEOUT,
+                    max_retries=0  # retries would hide overload from the limiter
+                )
+                self.replicas[replica_key] = {
+                    "client": client,
+                    "model": service_config["model"],
+                    "base_url": service_config["base_url"],
+                    "limiter": AdaptiveConcurrencyLimiter(replica_key),
+                    "latencies": deque(maxlen=settings.LLM_LATENCY_WINDOW),
+                    "warm": False,  # model known to be loaded on the replica
+                    "warmed_at": None,
+                    "last_used": 0.0,
+                    "warm_error": None
+                }
+                logger.info(f"Initialized LLM replica {replica_key} with {service_config['model']}")
+            except Exception as e:
+                logger.warning(f"Failed to initialize LLM replica {replica_key}: {e}")
+
+    def replica_for_agent(self, agent_id: int) -> Optional[str]:
+        """Get the replica an agent's requests are routed to."""
+        if not self.replicas:
+            return None
+        replica_key = f"agent_{agent_id % len(settings.OLLAMA_SERVICES)}"
+        if replica_key in self.replicas:
+            return replica_key
+        return next(iter(self.replicas))
+
+    def set_tenant(self, tenant: str, weight: float) -> None:
+        """Register a world, or change its weight."""
+        self.tenants[tenant] = weight
+
+    def remove_tenant(self, tenant: str) -> None:
+        self.tenants.pop(tenant, None)
+
+    def for_tenant(self, tenant: str) -> 'TenantPool':
+        """The pool as seen by one world's services."""
+        return TenantPool(self, tenant)
+
+    def available_capacity(self, tenant: Optional[str] = None) -> int:
+        """Number of requests that could start right now across all replicas.
+
+        For a tenant, that is its weighted share among the tenants with requests in
+        flight, or all of it while nobody else is using the replicas.
+        """
+        if not self.replicas:
+            # Without replicas everything falls back to templates, which are instant
+            return settings.LLM_MAX_CONCURRENCY
+        available = sum(replica["limiter"].available for replica in self.replicas.values())
+        if tenant is None:
+            return available
+        active = {tenant}
+        for replica in self.replicas.values():
+            active.update(replica["limiter"].tenant_in_flight)
+        total_weight = sum(self.tenants.get(name, 1.0) for name in active)
+        return math.ceil(available * self.tenants.get(tenant, 1.0) / total_weight)
+
+    def tenant_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Weight, requests in flight and waiting, and slots granted per world across replicas."""
+        stats = {
+            tenant: {'weight': weight, 'in_flight': 0, 'waiting': 0, 'granted': 0}
+            for tenant, weight in self.tenants.items()
+        }
+        for replica in self.replicas.values():
+            limiter = replica["limiter"]
+            for tenant, entry in stats.items():
+                entry['in_flight'] += limiter.tenant_in_flight.get(tenant, 0)
+                entry['waiting'] += len(limiter._waiters.get(tenant, ()))
+                entry['granted'] += limiter.tenant_granted.get(tenant, 0)
+        return stats
+
+    async def warm_up(self, replica_key: str) -> bool:
+        """Load the replica's model and ask the server to keep it resident for LLM_KEEP_ALIVE."""
+        replica = self.replicas[replica_key]
+        # Ollama's native API lives next to the OpenAI-compatible /v1 one
+        native_url = replica["base_url"].rstrip("/")
+        if native_url.endswith("/v1"):
+            native_url = native_url[:-3]
+        
+        try:
+            async with httpx.AsyncClient(timeout=settings.LLM_WARMUP_TIMEOUT) as client:
+                # A generate request without a prompt only loads the model
+                response = await client.post(
+                    f"{native_url}/api/generate",
+                    json={"model": replica["model"], "keep_alive": settings.LLM_KEEP_ALIVE}
+                )
+                if response.status_code == 404:
+                    # Not Ollama: a one-token completion loads the model just as well
+                    await replica["client"].chat.completions.create(
+                        model=replica["model"],
+                        messages=[{"role": "user", "content": "hi"}],
+                        max_tokens=1,
+                        timeout=settings.LLM_WARMUP_TIMEOUT
+                    )
+                else:
+                    response.raise_for_status()
+        except Exception as e:
+            replica["warm"] = False
+            replica["warm_error"] = str(e) or type(e).__name__
+            logger.warning(f"Failed to warm up LLM replica {replica_key}: {replica['warm_error']}")
+            return False
+        
+        replica["warm"] = True
+        replica["warmed_at"] = time.time()
+        replica["last_used"] = time.monotonic()
+        replica["warm_error"] = None
+        logger.info(f"LLM replica {replica_key} is warm ({replica['model']})")
+        return True
+    
+    async def warm_up_all(self) -> Dict[str, bool]:
+        """Warm up every replica concurrently."""
+        keys = list(self.replicas)
+        results = await asyncio.gather(*[self.warm_up(key) for key in keys])
+        return dict(zip(keys, results))
+    
+    async def run_keep_alive(self) -> None:
+        """Warm up all replicas, then ping the ones that sit idle so their models stay loaded."""
+        await self.warm_up_all()
+        while True:
+            await asyncio.sleep(settings.LLM_KEEP_ALIVE_INTERVAL)
+            # Replicas that served requests recently (and warmed up fine) don't need a ping
+            idle_since = time.monotonic() - settings.LLM_KEEP_ALIVE_INTERVAL
+            idle = [key for key, replica in self.replicas.items()
+                    if not replica["warm"] or replica["last_used"] < idle_since]
+            if idle:
+                logger.debug(f"Keep-alive for idle LLM replicas: {idle}")
+                await asyncio.gather(*[self.warm_up(key) for key in idle])
+    
+    def readiness(self) -> Dict[str, Any]:
+        """Get the warm state of every replica."""
+        replicas = {
+            key: {
+                'model': replica["model"],
+                'warm': replica["warm"],
+                'warmed_at': replica["warmed_at"],
+                'error': replica["warm_error"]
+            }
+            for key, replica in self.replicas.items()
+        }
+        return {
+            'ready': bool(replicas) and all(replica['warm'] for replica in replicas.values()),
+            'replicas': replicas
+        }
+    
+    def utilization(self) -> float:
+        """Fraction of the replicas' combined concurrency limit currently in use."""
+        limit = sum(int(replica["limiter"].limit) for replica in self.replicas.values())
+        in_flight = sum(replica["limiter"].in_flight for replica in self.replicas.values())
+        return in_flight / limit if limit else 1.0
+    
+    def latency_p95(self, replica_key: str) -> Optional[float]:
+        """95th percentile of a replica's recent latencies, once there are enough samples."""
+        latencies = self.replicas[replica_key]["latencies"]
+        if len(latencies) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _hedge_replica(self, primary_key: str) -> Optional[str]:
+        """Pick the least loaded other replica that has a free slot."""
+        candidates = [
+            (replica["limiter"].in_flight / replica["limiter"].limit, key)
+            for key, replica in self.replicas.items()
+            if key != primary_key and replica["limiter"].available > 0
+        ]
+        return min(candidates)[1] if candidates else None
+
+    async def complete(self, replica_key: str, messages: List[Dict[str, str]], max_tokens: int,
+                       temperature: float = 0.7, deadline: Optional[float] = None,
+                       agent_id: Any = None, json_mode: bool = False,
+                       low_priority: bool = False, tenant: str = settings.DEFAULT_WORLD) -> str:
+        """Run a chat completion that must finish before `deadline` (time.monotonic()).
+
+        The request is charged to the global budget and to `agent_id`'s budget, and
+        waits for replica slots as part of `tenant`'s share.
+        With `json_mode` the replica is asked to constrain its output to a JSON object.
+        Low-priority requests (background work) are never hedged and give up instead
+        of queueing when the replica has no free slot.
+        If the primary replica takes longer than its p95 latency, a hedged duplicate
+        is sent to another replica and the first answer wins.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + settings.LLM_REQUEST_TIMEOUT
+        if time.monotonic() >= deadline:
+            raise DeadlineExceeded("Deadline passed before the request was sent")
+        if low_priority and self.replicas[replica_key]["limiter"].available <= 0:
+            raise DeadlineExceeded(f"No free slot on replica {replica_key} for a low-priority request")
+
+        estimated = estimate_tokens(messages) + max_tokens
+        extra = {"response_format": {"type": "json_object"}} if json_mode and settings.LLM_JSON_MODE else {}
+        if not self.budget.try_acquire(agent_id, estimated):
+            raise BudgetExhausted(f"LLM budget exhausted for agent {agent_id}")
+
+        primary = asyncio.ensure_future(
+            self._complete_on(replica_key, messages, max_tokens, temperature, deadline, agent_id, estimated, extra,
+                              tenant)
+        )
+        tasks = {primary}
+        try:
+            hedge_after = self.latency_p95(replica_key) if settings.LLM_HEDGING_ENABLED and not low_priority else None
+            if hedge_after is not None and hedge_after < deadline - time.monotonic():
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                hedge_key = None if done else self._hedge_replica(replica_key)
+                # Hedges only spend global budget, the agent already paid for this request
+                if hedge_key and self.budget.try_acquire(None, estimated):
+                    self.hedged_requests += 1
+                    logger.debug(f"Replica {replica_key} slower than p95 ({hedge_after:.2f}s), hedging on {hedge_key}")
+                    tasks.add(asyncio.ensure_future(
+                        self._complete_on(hedge_key, messages, max_tokens, temperature, deadline, None, estimated, extra,
+                                          tenant)
+                    ))
+
+            # First successful answer wins
+            errors = []
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _complete_on(self, replica_key: str, messages: List[Dict[str, str]], max_tokens: int,
+                           temperature: float, deadline: float, agent_id: Any, estimated: int,
+                           extra: Dict[str, Any], tenant: str) -> str:
+        """Run a chat completion on one replica within its concurrency limit and the deadline."""
+        replica = self.replicas[replica_key]
+        limiter = replica["limiter"]
+
+        # Waiting for a slot counts against the deadline too
+        try:
+            await asyncio.wait_for(limiter.acquire(tenant, self.tenants.get(tenant, 1.0)), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"No free slot on replica {replica_key} before the deadline")
+
+        start_time = time.perf_counter()
+        remaining = max(0.01, deadline - time.monotonic())
+        try:
+            response = await asyncio.wait_for(
+                replica["client"].chat.completions.create(
+                    model=replica["model"],
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=remaining,
+                    **extra
+                ),
+                timeout=remaining
+            )
+        except asyncio.CancelledError:
+            # A hedge that lost the race says nothing about the replica's health
+            limiter.abandon(tenant)
+            raise
+        except asyncio.TimeoutError:
+            limiter.release(None, error=True, tenant=tenant)
+            self.budget.record(agent_id, replica_key, estimated, 0, 0, None)
+            raise DeadlineExceeded(f"Replica {replica_key} did not answer before the deadline")
+        except BaseException as e:
+            limiter.release(None, error=True, tenant=tenant)
+            self.budget.record(agent_id, replica_key, estimated, 0, 0, None)
+            # Most likely unreachable, the keep-alive loop warms it up again
+            replica["warm"] = False
+            replica["warm_error"] = str(e) or type(e).__name__
+            raise
+
+        latency = time.perf_counter() - start_time
+        limiter.release(latency, tenant=tenant)
+        replica["latencies"].append(latency)
+        # A successful answer means the model is loaded and its keep-alive was refreshed
+        replica["warm"] = True
+        replica["last_used"] = time.monotonic()
+
+        # Servers that don't report usage are charged the estimate
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or estimate_tokens(messages)
+        completion_tokens = getattr(usage, "completion_tokens", None) or max_tokens
+        self.budget.record(agent_id, replica_key, estimated, prompt_tokens, completion_tokens, latency)
+        return response.choices[0].message.content.strip()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the current limit, counters and p95 latency of every replica."""
+        return {
+            key: {**replica["limiter"].stats(), 'latency_p95': self.latency_p95(key)}
+            for key, replica in self.replicas.items()
+        }
+
+
+class TenantPool:
+    """An LLMPool as seen by one world: the same replicas and global budget, with the
+    world's requests queued against its share and its agents budgeted apart from
+    other worlds' agents with the same ids.
+    """
+
+    def __init__(self, pool: LLMPool, tenant: str):
+        self.pool = pool
+        self.tenant = tenant
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
+
+    def available_capacity(self) -> int:
+        return self.pool.available_capacity(self.tenant)
+
+    def budget_key(self, agent_id: Optional[int]) -> Any:
+        """Key of an agent's budget; the default world keeps plain agent ids."""
+        if agent_id is None or self.tenant == settings.DEFAULT_WORLD:
+            return agent_id
+        return f"{self.tenant}/{agent_id}"
+
+    async def complete(self, replica_key: str, messages: List[Dict[str, str]], max_tokens: int,
+                       temperature: float = 0.7, deadline: Optional[float] = None,
+                       agent_id: Optional[int] = None, json_mode: bool = False,
+                       low_priority: bool = False) -> str:
+        return await self.pool.complete(
+            replica_key, messages, max_tokens, temperature, deadline, self.budget_key(agent_id),
+            json_mode, low_priority, self.tenant
+        )
+
+
+# Create shared pool instance
+llm_pool = LLMPool()
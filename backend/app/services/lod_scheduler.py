@@ -0,0 +1,80 @@
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from app.models.agent import Agent
+from app.core.config import settings
+from app.services.conversation_scheduler import ConversationScheduler
+
+logger = logging.getLogger(__name__)
+
+# Viewport as (min_x, min_y, max_x, max_y), None means the viewer sees the whole world
+Viewport = Optional[Tuple[float, float, float, float]]
+
+
+class LevelOfDetailScheduler:
+    """Decide which due agents are simulated this tick and how often, within a per-tick time budget."""
+
+    def __init__(self, conversation_scheduler: ConversationScheduler):
+        self.conversation_scheduler = conversation_scheduler
+        self._viewports: Dict[Any, Viewport] = {}
+        # Moving average of the time it takes to update one agent (seconds)
+        self.cost_per_agent = 0.0005
+        self.deferred_total = 0
+
+    @property
+    def viewer_count(self) -> int:
+        return len(self._viewports)
+
+    def set_viewport(self, viewer_id: Any, viewport: Viewport) -> None:
+        """Register (or move) a viewer's visible area."""
+        self._viewports[viewer_id] = viewport
+
+    def remove_viewer(self, viewer_id: Any) -> None:
+        """Forget a disconnected viewer."""
+        self._viewports.pop(viewer_id, None)
+
+    def is_observed(self, agent: Agent) -> bool:
+        """Check whether any active viewer can see the agent."""
+        margin = settings.LOD_VIEW_MARGIN
+        for viewport in self._viewports.values():
+            if viewport is None:
+                return True
+            min_x, min_y, max_x, max_y = viewport
+            if min_x - margin <= agent.x <= max_x + margin and min_y - margin <= agent.y <= max_y + margin:
+                return True
+        return False
+
+    def is_full_detail(self, agent: Agent) -> bool:
+        """Agents near viewers or involved in conversations are simulated every tick."""
+        return self.conversation_scheduler.is_busy(agent.id) or self.is_observed(agent)
+
+    def update_interval(self, agent: Agent) -> int:
+        """Number of ticks between updates for an agent that wants to be updated every tick."""
+        return 1 if self.is_full_detail(agent) else settings.LOD_REDUCED_INTERVAL
+
+    def plan(self, due_agents: List[Agent], budget: float) -> Tuple[List[Agent], List[Agent]]:
+        """Split due agents into those processed this tick and those deferred to the next one.
+
+        Full-detail agents are always processed. The remaining budget is spent on
+        reduced-detail agents in round-robin order (least recently updated first).
+        """
+        full_detail, reduced_detail = [], []
+        for agent in due_agents:
+            (full_detail if self.is_full_detail(agent) else reduced_detail).append(agent)
+
+        remaining_budget = budget - len(full_detail) * self.cost_per_agent
+        capacity = max(0, int(remaining_budget / self.cost_per_agent)) if self.cost_per_agent > 0 else len(reduced_detail)
+        if capacity >= len(reduced_detail):
+            return full_detail + reduced_detail, []
+
+        reduced_detail.sort(key=lambda agent: agent.last_update_tick)
+        deferred = reduced_detail[capacity:]
+        self.deferred_total += len(deferred)
+        logger.debug(f"Tick budget exceeded, deferring {len(deferred)} reduced-detail agents")
+        return full_detail + reduced_detail[:capacity], deferred
+
+    def record_cost(self, elapsed: float, agent_count: int) -> None:
+        """Update the per-agent cost estimate from a measured update."""
+        if agent_count <= 0:
+            return
+        self.cost_per_agent = 0.8 * self.cost_per_agent + 0.2 * (elapsed / agent_count)
@@ -0,0 +1,214 @@
+import asyncio
+import gc
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+import weakref
+from collections import OrderedDict, deque
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared by everything and not owned by any structure
+_SKIPPED_TYPES = (type, ModuleType, FunctionType)
+# Only our own objects are walked into; others (WebSockets, locks, tasks) reference the
+# app, the event loop or the server and would pull all of them into the structure's size
+_OWN_MODULES = 'app.'
+
+
+def deep_size(obj: Any, sample: int) -> int:
+    """Approximate bytes reachable from `obj`.
+
+    Containers with more than `sample` items are measured on an evenly spread
+    sample of them and extrapolated, which keeps a report of large structures
+    (like long-term memories) cheap enough to run on the live server. Objects of
+    classes from outside the app only count their own size.
+    """
+    seen: Set[int] = set()
+
+    def size(item: Any) -> int:
+        if id(item) in seen or isinstance(item, _SKIPPED_TYPES):
+            return 0
+        seen.add(id(item))
+        total = sys.getsizeof(item)
+        measure = size
+
+        if isinstance(item, dict):
+            # Sampled as whole entries, so keys and values are measured alike
+            children = list(item.items())
+            measure = entry_size
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            children = list(item)
+        elif type(item).__module__.startswith(_OWN_MODULES):
+            children = []
+            if hasattr(item, '__dict__'):
+                children.append(vars(item))
+            for slot in getattr(type(item), '__slots__', ()):
+                if hasattr(item, slot):
+                    children.append(getattr(item, slot))
+        else:
+            children = []
+
+        if len(children) > sample:
+            measured = children[::len(children) // sample][:sample]
+            return total + int(sum(measure(child) for child in measured) * len(children) / len(measured))
+        return total + sum(measure(child) for child in children)
+
+    def entry_size(entry: Tuple[Any, Any]) -> int:
+        return size(entry[0]) + size(entry[1])
+
+    return size(obj)
+
+
+def _process_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (Linux), None elsewhere."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryAccountant:
+    """Approximate footprint of the backend's long-lived structures, with budgets and tracemalloc diffs.
+
+    Structures are registered by name with a function returning their current value.
+    Budgets (MEMORY_BUDGETS, in bytes) are checked every MEMORY_ACCOUNTING_INTERVAL
+    seconds and a warning is logged when one is exceeded.
+    """
+
+    def __init__(self):
+        self._structures: Dict[str, Callable[[], Any]] = {}
+        self._over_budget: Set[str] = set()
+        self.alarms: Deque[Dict[str, Any]] = deque(maxlen=50)
+        self._snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._snapshot_ids = itertools.count(1)
+        # WebSocket objects still alive, whether or not their client is connected
+        self._websockets: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+    def register(self, name: str, getter: Callable[[], Any]) -> None:
+        self._structures[name] = getter
+
+    def track_websocket(self, websocket: Any) -> None:
+        self._websockets.add(websocket)
+
+    def live_websockets(self) -> int:
+        """WebSocket objects not yet garbage collected (disconnected ones still referenced leak)."""
+        return len(self._websockets)
+
+    def measure(self) -> Dict[str, Dict[str, Any]]:
+        """Approximate bytes and item count of every registered structure."""
+        budgets = settings.MEMORY_BUDGETS
+        structures = {}
+        for name, getter in self._structures.items():
+            value = getter()
+            entry = {'bytes': deep_size(value, settings.MEMORY_ACCOUNTING_SAMPLE)}
+            try:
+                entry['items'] = len(value)
+            except TypeError:
+                pass
+            if name in budgets:
+                entry['budget'] = budgets[name]
+                entry['over_budget'] = entry['bytes'] > budgets[name]
+            structures[name] = entry
+        return structures
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'rss_bytes': _process_rss(),
+            'structures': self.measure(),
+            'live_websockets': self.live_websockets(),
+            'gc': {'objects': len(gc.get_objects()), 'counts': gc.get_count()},
+            'tracing': tracemalloc.is_tracing(),
+            'snapshots': [
+                {'id': snapshot_id, 'label': snapshot['label'], 'taken_at': snapshot['taken_at']}
+                for snapshot_id, snapshot in self._snapshots.items()
+            ],
+            'alarms': list(self.alarms)
+        }
+
+    def check_budgets(self) -> List[str]:
+        """Log a warning for structures that went over budget since the last check."""
+        exceeded = []
+        for name, entry in self.measure().items():
+            if not entry.get('over_budget'):
+                self._over_budget.discard(name)
+                continue
+            exceeded.append(name)
+            if name not in self._over_budget:
+                self._over_budget.add(name)
+                alarm = {'structure': name, 'bytes': entry['bytes'], 'budget': entry['budget'], 'time': time.time()}
+                self.alarms.append(alarm)
+                logger.warning(f"Memory budget exceeded: {name} uses ~{entry['bytes']} bytes (budget {entry['budget']})")
+        return exceeded
+
+    async def run(self) -> None:
+        """Check the budgets every MEMORY_ACCOUNTING_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(settings.MEMORY_ACCOUNTING_INTERVAL)
+            if not settings.MEMORY_BUDGETS:
+                continue
+            try:
+                self.check_budgets()
+            except Exception as e:
+                logger.error(f"Error checking memory budgets: {e}")
+
+    def take_snapshot(self, label: str = "") -> Dict[str, Any]:
+        """Record the current allocations; starts tracemalloc first if needed (it slows allocation down)."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACE_FRAMES)
+            logger.info("Started tracing allocations")
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__)
+        ])
+        snapshot_id = next(self._snapshot_ids)
+        self._snapshots[snapshot_id] = {'snapshot': snapshot, 'label': label, 'taken_at': time.time()}
+        while len(self._snapshots) > settings.MEMORY_MAX_SNAPSHOTS:
+            self._snapshots.popitem(last=False)
+        traced, peak = tracemalloc.get_traced_memory()
+        return {'id': snapshot_id, 'label': label, 'traced_bytes': traced, 'peak_bytes': peak}
+
+    def diff(self, from_id: int, to_id: Optional[int] = None, group_by: str = 'lineno',
+             limit: int = 20) -> Dict[str, Any]:
+        """Top allocation changes between two snapshots (or a snapshot and a new one)."""
+        if from_id not in self._snapshots:
+            raise KeyError(f"No snapshot {from_id}")
+        before = self._snapshots[from_id]['snapshot']
+        if to_id is None:
+            to_id = self.take_snapshot("diff")['id']
+        elif to_id not in self._snapshots:
+            raise KeyError(f"No snapshot {to_id}")
+
+        stats = self._snapshots[to_id]['snapshot'].compare_to(before, group_by)
+        return {
+            'from': from_id,
+            'to': to_id,
+            'size_diff': sum(stat.size_diff for stat in stats),
+            'top': [
+                {
+                    'location': str(stat.traceback) if group_by != 'traceback' else stat.traceback.format(),
+                    'size_diff': stat.size_diff,
+                    'count_diff': stat.count_diff,
+                    'size': stat.size,
+                    'count': stat.count
+                }
+                for stat in stats[:limit]
+            ]
+        }
+
+    def stop_tracing(self) -> None:
+        """Stop tracemalloc and drop the snapshots."""
+        self._snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("Stopped tracing allocations")
+
+
+# Create shared accountant instance
+memory_accountant = MemoryAccountant()
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+import logging
+
+from app.models.agent import Agent
+from app.models.memory import MemoryEvent
+from app.core.config import settings
+from app.services.llm_pool import LLMPool, llm_pool
+from app.services.prompt_builder import PromptBuilder, prompt_builder
+
+if TYPE_CHECKING:
+    from app.services.agent_service import AgentService
+
+logger = logging.getLogger(__name__)
+
+REFLECTION_KIND = 'reflection'
+
+
+class MemoryCompactor:
+    """Background job that folds old memory events into short reflections while the LLM is idle."""
+
+    def __init__(self, pool: Optional[LLMPool] = None, builder: Optional[PromptBuilder] = None):
+        self.llm_pool = pool or llm_pool
+        self.prompt_builder = builder or prompt_builder
+        self.compactions = 0
+        self.llm_summaries = 0
+        self.local_summaries = 0
+        self.events_compacted = 0
+        self.chars_before = 0
+        self.chars_after = 0
+        self.skipped_busy = 0
+
+    def candidates(self, agents: List[Agent]) -> List[Agent]:
+        """Agents with enough raw events beyond the recent ones to be worth compacting, fullest first."""
+        threshold = settings.MEMORY_COMPACTION_KEEP_RECENT + settings.MEMORY_COMPACTION_BATCH
+        ready = [
+            agent for agent in agents
+            if len(agent.long_term_memory) - agent.long_term_memory.count(REFLECTION_KIND) >= threshold
+        ]
+        ready.sort(key=lambda agent: len(agent.long_term_memory), reverse=True)
+        return ready
+
+    async def run(self, agent_service: 'AgentService') -> None:
+        """Compact memories every MEMORY_COMPACTION_INTERVAL seconds while replicas have spare capacity."""
+        while True:
+            await asyncio.sleep(settings.MEMORY_COMPACTION_INTERVAL)
+            try:
+                await self.compact_round(agent_service.agents)
+            except Exception as e:
+                logger.error(f"Error in memory compaction: {e}")
+
+    async def compact_round(self, agents: List[Agent]) -> int:
+        """Compact up to MEMORY_COMPACTION_AGENTS_PER_ROUND agents, stopping once the replicas get busy."""
+        compacted = 0
+        for agent in self.candidates(agents)[:settings.MEMORY_COMPACTION_AGENTS_PER_ROUND]:
+            if self.llm_pool.replicas and self.llm_pool.utilization() >= settings.MEMORY_COMPACTION_MAX_UTILIZATION:
+                # Interactive work comes first, try again next round
+                self.skipped_busy += 1
+                break
+            await self.compact(agent)
+            compacted += 1
+        return compacted
+
+    async def compact(self, agent: Agent) -> MemoryEvent:
+        """Replace the agent's oldest raw events with one reflection."""
+        store = agent.long_term_memory
+        batch = store.oldest(settings.MEMORY_COMPACTION_BATCH, exclude_kind=REFLECTION_KIND)
+
+        summary = await self._summarize_with_llm(agent, batch)
+        if summary:
+            self.llm_summaries += 1
+        else:
+            summary = self._summarize_locally(agent, batch)
+            self.local_summaries += 1
+
+        # The reflection is indexed under the agents and place the batch was mostly about
+        entities = Counter(entity for event in batch for entity in event.entities)
+        locations = Counter(event.location for event in batch if event.location)
+        reflection = store.add(
+            summary,
+            kind=REFLECTION_KIND,
+            entities=[entity for entity, _ in entities.most_common(settings.MEMORY_REFLECTION_ENTITIES)],
+            location=locations.most_common(1)[0][0] if locations else None,
+            importance=max(event.importance for event in batch),
+            created_at=max(event.created_at for event in batch)
+        )
+        store.remove(event.id for event in batch)
+
+        self.compactions += 1
+        self.events_compacted += len(batch)
+        self.chars_before += sum(len(event.text) for event in batch)
+        self.chars_after += len(summary)
+        logger.debug(f"Compacted {len(batch)} memories of {agent.name} into: {summary}")
+        return reflection
+
+    async def _summarize_with_llm(self, agent: Agent, batch: List[MemoryEvent]) -> Optional[str]:
+        """Ask the agent's replica for a reflection as a low-priority request, None if it can't."""
+        replica_key = self.llm_pool.replica_for_agent(agent.id)
+        if not replica_key:
+            return None
+
+        # Plain moves add little to a reflection, leave them out of the prompt
+        events = [event.text for event in batch if event.kind != 'moved'] or [event.text for event in batch]
+        messages = self.prompt_builder.build(agent, 'reflect', "Events: " + "; ".join(events[:settings.MEMORY_COMPACTION_PROMPT_EVENTS]))
+        try:
+            summary = await self.llm_pool.complete(
+                replica_key,
+                messages=messages,
+                max_tokens=settings.MEMORY_REFLECTION_MAX_TOKENS,
+                temperature=0.3,
+                deadline=time.monotonic() + settings.MEMORY_COMPACTION_DEADLINE,
+                agent_id=agent.id,
+                low_priority=True
+            )
+        except Exception as e:
+            logger.debug(f"LLM reflection for {agent.name} failed, summarizing locally: {e}")
+            return None
+        return summary or None
+
+    def _summarize_locally(self, agent: Agent, batch: List[MemoryEvent]) -> str:
+        """Summarize events by counting who the agent met and talked to and where it went."""
+        met = Counter(entity for event in batch if event.kind == 'met' for entity in event.entities)
+        talked = Counter(entity for event in batch if event.kind == 'conversation' for entity in event.entities)
+        places = Counter(event.location for event in batch if event.location)
+
+        parts = []
+        if talked:
+            parts.append("talked with " + ", ".join(f"{name} x{count}" for name, count in talked.most_common(5)))
+        if met:
+            parts.append("met " + ", ".join(f"{name} x{count}" for name, count in met.most_common(5)))
+        if places:
+            parts.append("spent time at " + ", ".join(name for name, _ in places.most_common(3)))
+        return f"{agent.name} earlier " + ("; ".join(parts) if parts else "wandered around") + "."
+
+    def stats(self) -> Dict[str, Any]:
+        """Get how many events were compacted and how much smaller they got."""
+        return {
+            'compactions': self.compactions,
+            'llm_summaries': self.llm_summaries,
+            'local_summaries': self.local_summaries,
+            'events_compacted': self.events_compacted,
+            'compaction_ratio': round(self.chars_before / self.chars_after, 2) if self.chars_after else None,
+            'skipped_busy': self.skipped_busy
+        }
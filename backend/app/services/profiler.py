@@ -0,0 +1,155 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TickPhase:
+    """The part of the tick each simulation loop is in, used to tag profiler samples.
+
+    Every world's loop is a task of its own and they interleave on the event loop, so
+    the phase is kept per task: `name` is the phase of the task that reads or sets it.
+    The sampler, which runs on another thread, reads the phase of whichever task the
+    event loop is running at that moment.
+    """
+
+    __slots__ = ('_phases',)
+
+    def __init__(self):
+        self._phases: 'weakref.WeakKeyDictionary[asyncio.Task, str]' = weakref.WeakKeyDictionary()
+
+    @property
+    def name(self) -> str:
+        return self._phases.get(asyncio.current_task(), 'idle')
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._phases[asyncio.current_task()] = name
+
+    def running(self, loop: asyncio.AbstractEventLoop) -> str:
+        """Phase of the task `loop` is running right now ('idle' between tasks); callable from any thread."""
+        task = asyncio.current_task(loop)
+        return self._phases.get(task, 'idle') if task is not None else 'idle'
+
+
+class ProfilerBusy(RuntimeError):
+    """A profile is already being recorded."""
+
+
+class SamplingProfiler:
+    """Samples the stacks of the event loop and AgentWorker threads from a background thread.
+
+    Nothing is instrumented: every `interval` seconds the sampler reads the current
+    frame of each thread (sys._current_frames) and counts the stack, tagged with the
+    tick phase. The cost is one stack walk per thread per sample, so the overhead is
+    bounded by the sampling rate and reported with each profile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[CodeType, str] = {}
+
+    def _label(self, code: CodeType) -> str:
+        """Frame name in collapsed-stack format, e.g. `move (app/models/agent.py:94)`."""
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename
+            if path.startswith(_APP_ROOT):
+                path = "app" + path[len(_APP_ROOT):]
+            elif 'site-packages' in path:
+                path = path.split('site-packages' + os.sep, 1)[1]
+            else:
+                path = os.path.basename(path)
+            label = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(';', ':')
+            self._labels[code] = label
+        return label
+
+    def _stack(self, frame: Optional[FrameType], max_depth: int) -> List[str]:
+        """Frame labels of a stack, root first."""
+        labels = []
+        while frame is not None and len(labels) < max_depth:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return labels
+
+    def record(self, seconds: float, interval: float, loop: asyncio.AbstractEventLoop, loop_thread: int,
+               phase: TickPhase, all_threads: bool = False) -> Dict[str, Any]:
+        """Sample for `seconds` (blocking, run it off the event loop) and aggregate the stacks.
+
+        Samples are taken from the event loop thread (`loop_thread`) and the AgentWorker
+        threads, or from every thread but the sampler with `all_threads`, and tagged with
+        the phase of the task `loop` is running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            own = threading.get_ident()
+            stacks: Counter = Counter()
+            phases: Counter = Counter()
+            samples = 0
+            sampling_time = 0.0
+            max_depth = settings.PROFILER_MAX_DEPTH
+
+            started = time.perf_counter()
+            deadline = started + seconds
+            next_sample = started
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now < next_sample:
+                    time.sleep(next_sample - now)
+                next_sample += interval
+
+                sample_start = time.perf_counter()
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                current_phase = phase.running(loop)
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    if ident == loop_thread:
+                        thread = 'event-loop'
+                    else:
+                        name = names.get(ident, str(ident))
+                        if name.startswith('AgentWorker'):
+                            thread = 'AgentWorker'
+                        elif all_threads:
+                            thread = name.rstrip('0123456789_-') or name
+                        else:
+                            continue
+                    stacks[';'.join([f"phase:{current_phase}", thread] + self._stack(frame, max_depth))] += 1
+                phases[current_phase] += 1
+                samples += 1
+                sampling_time += time.perf_counter() - sample_start
+
+            elapsed = time.perf_counter() - started
+        finally:
+            self._lock.release()
+
+        logger.info(f"Recorded {samples} samples in {elapsed:.1f}s ({sampling_time / elapsed:.2%} overhead)")
+        return {
+            'seconds': round(elapsed, 3),
+            'interval': interval,
+            'samples': samples,
+            'overhead': round(sampling_time / elapsed, 4) if elapsed else 0.0,
+            'phases': dict(phases),
+            'collapsed': "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        }
+
+
+# Tick phases (set by every world's simulation loop) and the shared profiler
+tick_phase = TickPhase()
+profiler = SamplingProfiler()
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Tuple
+import logging
+
+from app.models.agent import Agent
+from app.models.terrain import terrain
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Instructions for each kind of request, part of the stable prefix
+TASK_INSTRUCTIONS = {
+    'think': (
+        'When asked where next, reply with JSON only: {"direction": north, south, east, west, stay or a place name, '
+        '"target": name of a nearby agent to walk to or null, "say": a few words}'
+    ),
+    'converse': "When you meet someone, write 2-3 short exchanges between you and them.",
+    'reflect': "When given a list of your past events, summarize them in one or two short first-person sentences, keeping names and places."
+}
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """Length of the longest common prefix of two strings."""
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class PromptBuilder:
+    """Build chat prompts with a stable per-agent prefix first and volatile context last.
+
+    The system message (world, persona, goal, task) stays byte-identical between calls,
+    so servers that reuse the KV cache of a matching prefix (like Ollama) only have to
+    prefill the short volatile part. Agents are pinned to one replica, so the prefix is
+    reused on the replica that already has it cached. Agent ids are only unique within
+    a world, so every world has its own builder.
+    """
+
+    def __init__(self):
+        self.world_description = self._describe_world()
+        self._prefixes: Dict[Tuple[int, str], Tuple[Tuple[str, str, str], str]] = {}  # (agent_id, task) -> (persona, prefix)
+        self._last_prompts: Dict[Tuple[int, str], str] = {}  # (agent_id, task) -> last prompt text sent
+        self.prompt_chars = 0
+        self.reused_chars = 0
+        self.prompts_built = 0
+
+    def _describe_world(self) -> str:
+        """Describe the world once; it never changes while the server runs."""
+        places = ", ".join(
+            f"{name} at ({x},{y})" for name, (x, y) in sorted(terrain.points_of_interest.items())
+        )
+        return (
+            f"You live in a {settings.WORLD_SIZE}x{settings.WORLD_SIZE} world with other agents. "
+            f"Places: {places}. North is up (smaller y)."
+        )
+
+    def system_prefix(self, agent: Agent, task: str) -> str:
+        """Get the agent's stable system message for a task, rebuilt only if its persona changed."""
+        persona = (agent.name, agent.personality, agent.goal)
+        cached = self._prefixes.get((agent.id, task))
+        if cached and cached[0] == persona:
+            return cached[1]
+
+        prefix = (
+            f"{self.world_description}\n"
+            f"You are {agent.name}, personality: {agent.personality}. Your goal: {agent.goal}.\n"
+            f"{TASK_INSTRUCTIONS[task]}"
+        )
+        self._prefixes[(agent.id, task)] = (persona, prefix)
+        return prefix
+
+    def build(self, agent: Agent, task: str, context: str) -> List[Dict[str, str]]:
+        """Build the messages for a request, with the volatile `context` as the final user message."""
+        prefix = self.system_prefix(agent, task)
+        prompt = prefix + context
+
+        # Measure how much of this prompt matches the agent's previous one for the same task
+        reused = _common_prefix_length(self._last_prompts.get((agent.id, task), ""), prompt)
+        self._last_prompts[(agent.id, task)] = prompt
+        self.prompts_built += 1
+        self.prompt_chars += len(prompt)
+        self.reused_chars += reused
+
+        return [
+            {"role": "system", "content": prefix},
+            {"role": "user", "content": context}
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get how much of the prompts sent so far was a reused prefix."""
+        return {
+            'prompts': self.prompts_built,
+            'prompt_chars': self.prompt_chars,
+            'reused_prefix_chars': self.reused_chars,
+            'reused_ratio': round(self.reused_chars / self.prompt_chars, 3) if self.prompt_chars else 0.0
+        }
+
+
+# Create shared prompt builder instance
+prompt_builder = PromptBuilder()
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from app.core.config import settings
+from app.core.logger import logging_status, set_level
+from app.services.lod_scheduler import Viewport
+from app.services.memory_accounting import memory_accountant
+from app.services.profiler import profiler, tick_phase
+from app.services.state_bus import CommandClient
+
+logger = logging.getLogger(__name__)
+
+# Commands API workers may send to the simulation process
+COMMANDS = ('start', 'stop', 'reset', 'set_speed', 'set_viewport', 'remove_viewer', 'llm_readiness', 'llm_usage',
+            'set_log_level', 'log_status', 'profile', 'memory_report', 'memory_snapshot', 'memory_diff',
+            'memory_stop_tracing')
+# The state bus is shared memory, so API workers and the simulation always run on the same host
+COMMAND_HOST = "127.0.0.1"
+
+
+def command_channel() -> Tuple[Tuple[str, int], bytes]:
+    """Address and key of the simulation process's command channel.
+
+    There is no default key: anyone who can connect with it can run commands, so
+    external mode refuses to start until SIMULATION_COMMAND_AUTHKEY is set.
+    """
+    if not settings.SIMULATION_COMMAND_AUTHKEY:
+        raise RuntimeError("SIMULATION_COMMAND_AUTHKEY must be set in external mode, generate one with "
+                           "`python -c 'import secrets; print(secrets.token_hex(32))'`")
+    return (COMMAND_HOST, settings.SIMULATION_COMMAND_PORT), settings.SIMULATION_COMMAND_AUTHKEY.encode('utf-8')
+
+
+class LocalSimulationControl:
+    """Controls the simulation running in this process (embedded mode, or inside the simulation process)."""
+
+    def __init__(self, state: Any):
+        self.state = state
+
+    async def start(self) -> Dict[str, Any]:
+        self.state.simulation_running = True
+        return {"status": "started", "running": True}
+
+    async def stop(self) -> Dict[str, Any]:
+        self.state.simulation_running = False
+        return {"status": "stopped", "running": False}
+
+    async def reset(self, num_agents: int) -> Dict[str, Any]:
+        # Conversations of the old agents must not release the new ones, which reuse their ids
+        await self.state.conversation_service.close()
+        self.state.agent_service.reset_agents(num_agents)
+        if self.state.conversation_archive is not None:
+            # The new agents reuse the old ones' ids
+            self.state.conversation_archive.begin_epoch()
+        self.state.simulation_running = False
+        return {"status": "reset", "num_agents": num_agents, "running": False}
+
+    async def set_speed(self, speed: int) -> Dict[str, Any]:
+        self.state.simulation_speed = speed
+        return {"status": "speed_updated", "speed": speed, "running": self.state.simulation_running}
+
+    async def set_viewport(self, viewer_id: Any, viewport: Viewport) -> Dict[str, Any]:
+        self.state.agent_service.set_viewport(viewer_id, viewport)
+        return {"status": "viewport_updated"}
+
+    async def remove_viewer(self, viewer_id: Any) -> Dict[str, Any]:
+        self.state.agent_service.remove_viewer(viewer_id)
+        return {"status": "viewer_removed"}
+
+    async def llm_readiness(self) -> Dict[str, Any]:
+        return self.state.llm_pool.readiness()
+
+    async def llm_usage(self) -> Dict[str, Any]:
+        llm_pool = self.state.llm_pool
+        return {
+            **llm_pool.budget.usage(),
+            'limits': llm_pool.stats(),
+            'prompts': self.state.thinking_service.prompt_builder.stats(),
+            'prefetch': self.state.thinking_service.prefetch_stats(),
+            'decisions': self.state.thinking_service.decision_stats(),
+            'compaction': self.state.memory_compactor.stats(),
+            'worlds': llm_pool.tenant_stats()
+        }
+
+    async def set_log_level(self, name: str, level: str) -> Dict[str, Any]:
+        set_level(name, level)
+        return logging_status()
+
+    async def log_status(self) -> Dict[str, Any]:
+        return logging_status()
+
+    async def profile(self, seconds: float, interval: float, all_threads: bool = False) -> Dict[str, Any]:
+        # Called on the event loop, whose thread is one of the sampled ones
+        loop_thread = threading.get_ident()
+        return await asyncio.to_thread(profiler.record, seconds, interval, asyncio.get_running_loop(), loop_thread,
+                                       tick_phase, all_threads)
+
+    # Measured on the event loop, between ticks, so no AgentWorker mutates what is being walked
+    async def memory_report(self) -> Dict[str, Any]:
+        return memory_accountant.report()
+
+    async def memory_snapshot(self, label: str = "") -> Dict[str, Any]:
+        return memory_accountant.take_snapshot(label)
+
+    async def memory_diff(self, from_id: int, to_id: Optional[int] = None, group_by: str = 'lineno',
+                          limit: int = 20) -> Dict[str, Any]:
+        return memory_accountant.diff(from_id, to_id, group_by, limit)
+
+    async def memory_stop_tracing(self) -> Dict[str, Any]:
+        memory_accountant.stop_tracing()
+        return {"status": "tracing_stopped"}
+
+    async def dispatch(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a command received from an API worker."""
+        name = command.get('command')
+        if name not in COMMANDS:
+            raise ValueError(f"Unknown command: {name}")
+        return await getattr(self, name)(**command.get('args', {}))
+
+
+class RemoteSimulationControl:
+    """Controls the simulation process from an API worker (external mode) over the command channel."""
+
+    def __init__(self, client: Optional[CommandClient] = None):
+        self.client = client or CommandClient(*command_channel(), settings.SIMULATION_COMMAND_TIMEOUT)
+        # Viewer ids only have to be unique within one worker, qualify them with the worker's pid
+        self._worker = os.getpid()
+
+    async def _send(self, name: str, **args: Any) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.client.request, {'command': name, 'args': args})
+
+    async def start(self) -> Dict[str, Any]:
+        return await self._send('start')
+
+    async def stop(self) -> Dict[str, Any]:
+        return await self._send('stop')
+
+    async def reset(self, num_agents: int) -> Dict[str, Any]:
+        return await self._send('reset', num_agents=num_agents)
+
+    async def set_speed(self, speed: int) -> Dict[str, Any]:
+        return await self._send('set_speed', speed=speed)
+
+    async def set_viewport(self, viewer_id: Any, viewport: Viewport) -> Dict[str, Any]:
+        return await self._send('set_viewport', viewer_id=(self._worker, viewer_id), viewport=viewport)
+
+    async def remove_viewer(self, viewer_id: Any) -> Dict[str, Any]:
+        return await self._send('remove_viewer', viewer_id=(self._worker, viewer_id))
+
+    async def llm_readiness(self) -> Dict[str, Any]:
+        return await self._send('llm_readiness')
+
+    async def llm_usage(self) -> Dict[str, Any]:
+        return await self._send('llm_usage')
+
+    async def set_log_level(self, name: str, level: str) -> Dict[str, Any]:
+        # Both the worker and the simulation process log
+        set_level(name, level)
+        return await self._send('set_log_level', name=name, level=level)
+
+    async def log_status(self) -> Dict[str, Any]:
+        return await self._send('log_status')
+
+    async def profile(self, seconds: float, interval: float, all_threads: bool = False) -> Dict[str, Any]:
+        # Profiles outlast the usual command timeout and get a connection of their own
+        timeout = seconds + self.client.timeout
+        client = CommandClient(self.client.address, self.client.authkey, timeout)
+        command = {
+            'command': 'profile',
+            'args': {'seconds': seconds, 'interval': interval, 'all_threads': all_threads},
+            'timeout': timeout
+        }
+        try:
+            return await asyncio.to_thread(client.request, command)
+        finally:
+            client.close()
+
+    async def memory_report(self) -> Dict[str, Any]:
+        # Connections are held by this worker, the rest by the simulation process
+        report = await self._send('memory_report')
+        report['worker'] = {'pid': self._worker, **memory_accountant.report()}
+        return report
+
+    async def memory_snapshot(self, label: str = "") -> Dict[str, Any]:
+        return await self._send('memory_snapshot', label=label)
+
+    async def memory_diff(self, from_id: int, to_id: Optional[int] = None, group_by: str = 'lineno',
+                          limit: int = 20) -> Dict[str, Any]:
+        return await self._send('memory_diff', from_id=from_id, to_id=to_id, group_by=group_by, limit=limit)
+
+    async def memory_stop_tracing(self) -> Dict[str, Any]:
+        return await self._send('memory_stop_tracing')
@@ -0,0 +1,44 @@
+from typing import Dict, List, Tuple
+
+from app.models.agent import Agent
+
+# Bounding box as (min_x, min_y, max_x, max_y)
+BoundingBox = Tuple[float, float, float, float]
+
+
+class SpatialGrid:
+    """Uniform grid of agents by position for bounding-box queries."""
+
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[Agent]] = {}
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def rebuild(self, agents: List[Agent]) -> None:
+        """Index the agents' current positions."""
+        cells: Dict[Tuple[int, int], List[Agent]] = {}
+        for agent in agents:
+            cells.setdefault(self._cell(agent.x, agent.y), []).append(agent)
+        self._cells = cells
+
+    def query(self, bbox: BoundingBox) -> List[Agent]:
+        """Get the agents inside a bounding box, ordered by id."""
+        min_x, min_y, max_x, max_y = bbox
+        min_cx, min_cy = self._cell(min_x, min_y)
+        max_cx, max_cy = self._cell(max_x, max_y)
+
+        found = []
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self._cells):
+            # Box covers more cells than are occupied, scanning the occupied ones is cheaper
+            cells = [agents for (cx, cy), agents in self._cells.items()
+                     if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy]
+        else:
+            cells = [self._cells[(cx, cy)] for cx in range(min_cx, max_cx + 1)
+                     for cy in range(min_cy, max_cy + 1) if (cx, cy) in self._cells]
+
+        for agents in cells:
+            found.extend(agent for agent in agents if min_x <= agent.x <= max_x and min_y <= agent.y <= max_y)
+        found.sort(key=lambda agent: agent.id)
+        return found
@@ -0,0 +1,357 @@
+import json
+import struct
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import bisect
+import logging
+
+from app.services.profiler import ProfilerBusy
+from app.services.spatial_index import BoundingBox
+
+logger = logging.getLogger(__name__)
+
+# Segment header: sequence number of the last publish, index of the buffer it went to
+_HEADER = struct.Struct('<QI4x')
+# Buffer header: sequence number of the publish it holds (0 while being written), tick,
+# then the byte lengths of the agents, conversations and status sections
+_BUFFER_HEADER = struct.Struct('<QQIII')
+_BUFFER_SEQ = struct.Struct('<Q')
+# Attempts at reading a consistent tick before falling back to the previous one
+_READ_ATTEMPTS = 100
+# Command errors the API maps to a status code; they keep their type across the process boundary
+_FORWARDED_ERRORS = {error.__name__: error for error in (KeyError, ValueError, ProfilerBusy)}
+
+
+class SimulationUnavailable(RuntimeError):
+    """The simulation process can't be reached or rejected a command."""
+
+
+class StateSnapshot:
+    """One published tick, decoded once per API worker and shared by all of its clients."""
+
+    def __init__(self, seq: int, tick: int, agents_json: str, conversations_json: str, status: Dict[str, Any]):
+        self.seq = seq
+        self.tick = tick
+        self.agents_json = agents_json
+        self.conversations_json = conversations_json
+        self.status = status
+        self._agents: Optional[List[Dict[str, Any]]] = None
+        self._agents_by_id: Optional[Dict[int, Dict[str, Any]]] = None
+        self._conversations: Optional[List[str]] = None
+
+    def agents(self) -> List[Dict[str, Any]]:
+        """Agents ordered by id, parsed on first use (only REST queries need them parsed)."""
+        if self._agents is None:
+            self._agents = sorted(json.loads(self.agents_json), key=lambda agent: agent['id'])
+            self._agents_by_id = {agent['id']: agent for agent in self._agents}
+        return self._agents
+
+    def agent(self, agent_id: int) -> Optional[Dict[str, Any]]:
+        self.agents()
+        return self._agents_by_id.get(agent_id)
+
+    def conversations(self) -> List[str]:
+        if self._conversations is None:
+            self._conversations = json.loads(self.conversations_json)
+        return self._conversations
+
+
+class StateBusWriter:
+    """Publishes each tick's state into a shared-memory double buffer.
+
+    A tick is written into the buffer readers are not looking at, then the header is
+    flipped to it and the sequence number bumped. Each buffer also carries the sequence
+    number of the publish it holds: the writer clears it before overwriting the buffer
+    and sets it once done. A reader only keeps its copy if the buffer's sequence number
+    matched the header's both before and after copying (a seqlock per buffer).
+    """
+
+    def __init__(self, name: str, buffer_size: int):
+        self.buffer_size = buffer_size
+        size = _HEADER.size + 2 * buffer_size
+        try:
+            self._shm = SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a simulation process that didn't shut down cleanly
+            stale = SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self._shm = SharedMemory(name=name, create=True, size=size)
+        self._seq = 0
+        self._active = 0
+        _HEADER.pack_into(self._shm.buf, 0, self._seq, self._active)
+        self.publishes = 0
+        self.bytes_published = 0
+        logger.info(f"State bus {name} created with 2 x {buffer_size} byte buffers")
+
+    def publish(self, tick: int, agents_json: str, conversations: List[str], status: Dict[str, Any]) -> None:
+        """Publish one tick's state; raises ValueError if it doesn't fit into a buffer."""
+        sections = [
+            agents_json.encode('utf-8'),
+            json.dumps(conversations, separators=(',', ':')).encode('utf-8'),
+            json.dumps(status, separators=(',', ':')).encode('utf-8')
+        ]
+        size = _BUFFER_HEADER.size + sum(len(section) for section in sections)
+        if size > self.buffer_size:
+            raise ValueError(f"State of tick {tick} is {size} bytes, STATE_BUS_SLOT_SIZE is {self.buffer_size}")
+
+        target = 1 - self._active
+        buffer_offset = _HEADER.size + target * self.buffer_size
+        buf = self._shm.buf
+        seq = self._seq + 1
+        # Readers still copying the previous contents of this buffer will see it changed
+        _BUFFER_SEQ.pack_into(buf, buffer_offset, 0)
+        _BUFFER_HEADER.pack_into(buf, buffer_offset, 0, tick, *(len(section) for section in sections))
+        offset = buffer_offset + _BUFFER_HEADER.size
+        for section in sections:
+            buf[offset:offset + len(section)] = section
+            offset += len(section)
+        _BUFFER_SEQ.pack_into(buf, buffer_offset, seq)
+
+        self._active = target
+        self._seq = seq
+        _HEADER.pack_into(buf, 0, self._seq, self._active)
+        self.publishes += 1
+        self.bytes_published += size
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+
+class StateBusReader:
+    """Reads the latest tick from the state bus, attaching once the simulation process has created it."""
+
+    def __init__(self, name: str, buffer_size: int):
+        self.name = name
+        self.buffer_size = buffer_size
+        self._shm: Optional[SharedMemory] = None
+        self._snapshot: Optional[StateSnapshot] = None
+        self.retries = 0
+
+    def _attach(self) -> bool:
+        try:
+            self._shm = SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return False
+        # Python < 3.13 registers attached segments too and would unlink it when this worker exits
+        resource_tracker.unregister(self._shm._name, 'shared_memory')
+        logger.info(f"Attached to state bus {self.name}")
+        return True
+
+    def read(self) -> Optional[StateSnapshot]:
+        """Get the latest published tick, None until the simulation has published one."""
+        if self._shm is None and not self._attach():
+            return None
+
+        buf = self._shm.buf
+        for _ in range(_READ_ATTEMPTS):
+            seq, active = _HEADER.unpack_from(buf, 0)
+            if seq == 0:
+                return None
+            if self._snapshot is not None and self._snapshot.seq == seq:
+                return self._snapshot
+
+            offset = _HEADER.size + active * self.buffer_size
+            buffer_seq, tick, *lengths = _BUFFER_HEADER.unpack_from(buf, offset)
+            if buffer_seq == seq:
+                start = offset + _BUFFER_HEADER.size
+                data = bytes(buf[start:start + sum(lengths)])
+                # The writer clears the buffer's sequence number before it starts overwriting it
+                if _BUFFER_SEQ.unpack_from(buf, offset)[0] == seq:
+                    try:
+                        self._snapshot = self._decode(seq, tick, lengths, data)
+                        return self._snapshot
+                    except ValueError as e:
+                        # UnicodeDecodeError and JSONDecodeError; read the buffer again
+                        logger.debug(f"Undecodable state bus buffer: {e}")
+            self.retries += 1
+
+        logger.warning(f"State bus {self.name} changed during {_READ_ATTEMPTS} reads in a row, serving the previous tick")
+        return self._snapshot
+
+    def _decode(self, seq: int, tick: int, lengths: List[int], data: bytes) -> StateSnapshot:
+        agents_end = lengths[0]
+        conversations_end = agents_end + lengths[1]
+        return StateSnapshot(
+            seq,
+            tick,
+            data[:agents_end].decode('utf-8'),
+            data[agents_end:conversations_end].decode('utf-8'),
+            json.loads(data[conversations_end:])
+        )
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+
+class CommandServer:
+    """Accepts commands (start, stop, reset, ...) from API workers on a local socket.
+
+    Each connection is served by its own thread; `handler` runs the command and
+    returns the reply, errors are sent back as {'error': message}.
+    """
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes, handler: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        self.handler = handler
+        self._listener = Listener(address, authkey=authkey)
+        self._thread = threading.Thread(target=self._accept, name="command-server", daemon=True)
+        self.commands = 0
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info(f"Command channel listening on {self._listener.address}")
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                # Listener closed
+                return
+            except Exception as e:
+                logger.warning(f"Rejected command connection: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    command = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = self.handler(command)
+                except Exception as e:
+                    logger.error(f"Error running command {command.get('command')}: {e}")
+                    reply = {'error': str(e.args[0]) if len(e.args) == 1 else str(e), 'type': type(e).__name__}
+                self.commands += 1
+                connection.send(reply)
+
+    def close(self) -> None:
+        self._listener.close()
+
+
+class CommandClient:
+    """Sends commands to the simulation process, reconnecting if the connection was lost."""
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes, timeout: float):
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+        self._connection: Optional[Connection] = None
+        self._lock = threading.Lock()
+
+    def request(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a command and wait for its reply (blocking, run it in a thread from async code)."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._connection is None:
+                        self._connection = Client(self.address, authkey=self.authkey)
+                    self._connection.send(command)
+                    if not self._connection.poll(self.timeout):
+                        raise TimeoutError(f"No reply within {self.timeout}s")
+                    reply = self._connection.recv()
+                    break
+                except (OSError, EOFError, TimeoutError) as e:
+                    self.close()
+                    if attempt:
+                        raise SimulationUnavailable(f"Simulation process unreachable: {e}") from e
+        if 'error' in reply:
+            raise _FORWARDED_ERRORS.get(reply.get('type'), SimulationUnavailable)(reply['error'])
+        return reply
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class SnapshotAgentView:
+    """Read side of AgentService for API workers, answering from the latest published tick."""
+
+    def __init__(self, reader: StateBusReader):
+        self.reader = reader
+
+    def _snapshot(self) -> Optional[StateSnapshot]:
+        return self.reader.read()
+
+    @property
+    def tick(self) -> int:
+        snapshot = self._snapshot()
+        return snapshot.tick if snapshot else 0
+
+    @property
+    def tick_started_at(self) -> float:
+        snapshot = self._snapshot()
+        return snapshot.status['tick_started_at'] if snapshot else 0.0
+
+    @property
+    def agents(self) -> List[Dict[str, Any]]:
+        snapshot = self._snapshot()
+        return snapshot.agents() if snapshot else []
+
+    def get_agents_json(self) -> str:
+        snapshot = self._snapshot()
+        return snapshot.agents_json if snapshot else "[]"
+
+    def get_agent(self, agent_id: int) -> Optional[Dict[str, Any]]:
+        snapshot = self._snapshot()
+        return snapshot.agent(agent_id) if snapshot else None
+
+    def get_agent_json(self, agent_id: int, fields: Optional[List[str]] = None) -> Optional[str]:
+        agent = self.get_agent(agent_id)
+        if agent is None:
+            return None
+        if fields:
+            agent = {field: agent[field] for field in fields}
+        return json.dumps(agent, separators=(',', ':'))
+
+    def world_version(self) -> int:
+        snapshot = self._snapshot()
+        return snapshot.status['world_version'] if snapshot else 0
+
+    def etag(self) -> str:
+        snapshot = self._snapshot()
+        return snapshot.status['etag'] if snapshot else '"0-0"'
+
+    def query_agents(self, bbox: Optional[BoundingBox] = None, cursor: Optional[int] = None,
+                     limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Same contract as AgentService.query_agents, over the parsed snapshot."""
+        snapshot = self._snapshot()
+        agents = snapshot.agents() if snapshot else []
+        if bbox is not None:
+            min_x, min_y, max_x, max_y = bbox
+            agents = [agent for agent in agents if min_x <= agent['x'] <= max_x and min_y <= agent['y'] <= max_y]
+
+        if cursor is not None:
+            agents = agents[bisect.bisect_right(agents, cursor, key=lambda agent: agent['id']):]
+
+        if limit is not None and len(agents) > limit:
+            agents = agents[:limit]
+            return agents, agents[-1]['id']
+        return agents, None
+
+    def agents_json(self, agents: List[Dict[str, Any]], fields: Optional[List[str]] = None) -> str:
+        if fields:
+            agents = [{field: agent[field] for field in fields} for agent in agents]
+        return json.dumps(agents, separators=(',', ':'))
+
+
+class SnapshotConversationView:
+    """Read side of ConversationService for API workers."""
+
+    def __init__(self, reader: StateBusReader):
+        self.reader = reader
+
+    def get_conversations(self) -> List[str]:
+        snapshot = self.reader.read()
+        return snapshot.conversations() if snapshot else []
+
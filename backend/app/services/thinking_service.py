@@ -1,62 +1,241 @@
 import asyncio
-import hashlib
-import random
-from typing import List, Dict, Any, Tuple
+import time
+from typing import List, Dict, Any, Optional, Set, Tuple
 from app.models.agent import Agent
+from app.models.pydantic_models import ThinkingDecision
+from app.models.terrain import terrain
 from app.core.config import settings
+from app.services.llm_pool import BudgetExhausted, LLMPool, llm_pool
+from app.services.prompt_builder import PromptBuilder, prompt_builder
+from app.services.decision_backends import EscalationPolicy, UtilityPlanner
 import logging
 logger = logging.getLogger(__name__)
-import openai
+
+DIRECTIONS = ("north", "south", "east", "west", "stay")
 
 
 class ThinkingService:
-    def __init__(self):
-        # Initialize multiple LLM clients for different agents
-        self.llm_clients = {}
-        for service_id, service_config in settings.OLLAMA_SERVICES.items():
-            try:
-                base_url = service_config["base_url"] if isinstance(service_config, dict) else service_config
-                client = openai.OpenAI(
-                    base_url=base_url,
-                    api_key="dummy"  # Ollama doesn't need real API key
-                )
-                self.llm_clients[service_id] = client
-                logger.info(f"Initialized LLM client for service {service_id}: {base_url}")
-            except Exception as e:
-                logger.error(f"Failed to initialize LLM client for {service_id}: {e}")
+    def __init__(self, pool: Optional[LLMPool] = None, builder: Optional[PromptBuilder] = None,
+                 planner: Optional[UtilityPlanner] = None, escalation: Optional[EscalationPolicy] = None):
+        # LLM replicas and their adaptive concurrency limits are shared with the conversation service
+        self.llm_pool = pool or llm_pool
+        self.prompt_builder = builder or prompt_builder
+        # Routine decisions come from the local planner, novel situations escalate to the LLM
+        self.planner = planner or UtilityPlanner()
+        self.escalation = escalation or EscalationPolicy()
+        self._pending_agents = []
+        # Decisions are made in background tasks so the tick never waits for the LLM
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._thinking: Set[int] = set()  # agents with a decision on its way
+        self._decided: List[Agent] = []  # agents given a new decision since the last pop_decided_agents
+        
+        # Decisions requested ahead of time with idle capacity
+        self._prefetched: Dict[int, Tuple[ThinkingDecision, float, Tuple]] = {}  # agent_id -> (decision, expires at, situation)
+        self._prefetch_tasks: Dict[int, asyncio.Task] = {}
+        self.prefetch_started = 0
+        self.prefetch_hits = 0
+        self.prefetch_discarded = 0
+    
+    def add_agents_to_thinking_queue(self, agents: List[Tuple[Agent, List[Agent]]]) -> None:
+        """Add agents to the thinking queue for batch processing."""
+        self.add_pending_agents(agents)
         
-        self.openai_client = self.llm_clients.get("service_1")
-        self._thought_cache = {}
+    def start_thinking_batch(self) -> None:
+        """Process the pending thinking requests in a background task.
+
+        Each agent gets its `next_decision` as soon as it is made and is handed back by
+        pop_decided_agents, so the simulation can wake it.
+        """
+        if not self._pending_agents:
+            return
+        task = asyncio.create_task(self.process_thinking_batch_async())
+        # The event loop only keeps weak references to tasks
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+    
+    def pop_decided_agents(self) -> List[Agent]:
+        """Get the agents given a new decision since the last call."""
+        decided = self._decided
+        self._decided = []
+        return decided
+    
+    async def close(self) -> None:
+        """Cancel the decisions still being made in the background."""
+        tasks = [*self._batch_tasks, *self._prefetch_tasks.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def process_thinking_batch_async(self) -> None:
+        """Process all pending thinking requests through the shared LLM pool."""
+        current_batch = self._pending_agents
         self._pending_agents = []
-        self._agent_positions_history = {}
         
-    def _get_llm_client_for_agent(self, agent: Agent) -> openai.OpenAI:
-        """Get the appropriate LLM client for the given agent."""
-        service_keys = list(self.llm_clients.keys())
-        if not service_keys:
-            return self.openai_client
+        if not current_batch:
+            return
         
-        service_index = hash(agent.id) % len(service_keys)
-        service_key = service_keys[service_index]
+        logger.info(f"Processing thinking batch for {len(current_batch)} agents (limits: {self.llm_pool.stats()})")
         
-        client = self.llm_clients.get(service_key, self.openai_client)
-        logger.debug(f"Agent {agent.name} using LLM service: {service_key}")
-        return client
+        # Each replica's limiter decides how many of these run at once
+        await asyncio.gather(*[
+            self._think_async(agent, all_agents, deadline)
+            for agent, all_agents, deadline in current_batch
+        ], return_exceptions=True)
     
-    def add_agents_to_thinking_queue(self, agents: List[Tuple[Agent, List[Agent]]]) -> None:
-        """Add agents to the thinking queue for batch processing."""
-        self._pending_agents.extend(agents)
+    async def _think_async(self, agent: Agent, all_agents: List[Agent], deadline: float) -> None:
+        """Give one agent its next decision and hand it back through pop_decided_agents."""
+        try:
+            agent.next_decision = await self._decide(agent, all_agents, deadline)
+        except Exception as e:
+            logger.error(f"Error thinking for {agent.name}, using the planner: {e}")
+            agent.next_decision = self.planner.decide(agent, all_agents, self._nearby_names(agent, all_agents))
+        finally:
+            self._thinking.discard(agent.id)
+            self._decided.append(agent)
+    
+    async def _decide(self, agent: Agent, all_agents: List[Agent], deadline: float) -> ThinkingDecision:
+        """Get a movement decision for one agent from the planner, or the LLM if the situation is novel."""
+        nearby = self._nearby_names(agent, all_agents)
+        if self.escalation.escalate(agent, nearby) is None:
+            # A decision prefetched when the situation looked novel is not needed any more
+            if self._prefetched.pop(agent.id, None) is not None:
+                self.prefetch_discarded += 1
+            return self.planner.decide(agent, all_agents, nearby)
+        
+        decision = await self._take_prefetched(agent, nearby, deadline)
+        if decision is None:
+            decision = await self._request_decision(agent, nearby, deadline)
+        # The planner also stands in whenever the LLM can't answer in time
+        return decision or self.planner.decide(agent, all_agents, nearby)
+    
+    def _nearby_names(self, agent: Agent, all_agents: List[Agent]) -> Tuple[str, ...]:
+        """Names of the agents close enough to mention in the prompt."""
+        return tuple(
+            other.name for other in all_agents
+            if other.id != agent.id and (other.x - agent.x) ** 2 + (other.y - agent.y) ** 2 < (2 * settings.INTERACTION_RADIUS) ** 2
+        )
+    
+    async def _request_decision(self, agent: Agent, nearby: Tuple[str, ...], deadline: float) -> Optional[ThinkingDecision]:
+        """Ask the agent's replica for a decision, None if it could not be had in time."""
+        replica_key = self.llm_pool.replica_for_agent(agent.id)
+        if not replica_key or time.monotonic() >= deadline:
+            # No replica, or the request expired in the queue: don't spend model time on it
+            return None
         
-    def _generate_cache_key(self, agent: Agent, nearby_agents: List[Dict]) -> str:
-        """Generate a cache key based on agent state and nearby agents."""
-        key_parts = [
-            agent.name,
-            agent.personality,
-            str(len(agent.memory)),
-            str(len(nearby_agents))
-        ]
-        key_string = "|".join(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()[:16]
+        # Only position, neighbours and relevant memories change between calls, so they go last
+        memories = agent.long_term_memory.relevant_text(nearby, agent.current_location())
+        messages = self.prompt_builder.build(
+            agent, 'think',
+            f"You are at ({agent.x},{agent.y}). Nearby: {', '.join(nearby) if nearby else 'nobody'}. "
+            + (f"You remember: {'; '.join(memories)}. " if memories else "")
+            + "Where next?"
+        )
+        
+        try:
+            response = await self.llm_pool.complete(
+                replica_key,
+                messages=messages,
+                max_tokens=settings.THINKING_MAX_TOKENS,
+                temperature=0.8,
+                deadline=deadline,
+                agent_id=agent.id,
+                json_mode=True
+            )
+            return self._parse_decision(response, agent, nearby)
+        except BudgetExhausted:
+            logger.debug(f"LLM budget exhausted for {agent.name}, using fallback")
+        except Exception as e:
+            logger.warning(f"LLM thinking failed for {agent.name}, using fallback: {e}")
+        return None
+    
+    def prefetch(self, agents: List[Tuple[Agent, List[Agent]]]) -> None:
+        """Start decisions in the background for agents about to think, while replicas have idle slots."""
+        # Expired decisions would be discarded when taken, and would block prefetching until then
+        now = time.monotonic()
+        for agent_id in [agent_id for agent_id, (_, expires_at, _) in self._prefetched.items() if now > expires_at]:
+            del self._prefetched[agent_id]
+            self.prefetch_discarded += 1
+        
+        for agent, all_agents in agents:
+            if agent.id in self._prefetched or agent.id in self._prefetch_tasks:
+                continue
+            # Only agents that will escalate need an LLM decision
+            if self.escalation.reason(agent, self._nearby_names(agent, all_agents)) is None:
+                continue
+            # Keep some capacity free for agents that have to think right now
+            if self.llm_pool.available_capacity() <= settings.THINK_PREFETCH_RESERVE:
+                break
+            self.prefetch_started += 1
+            self._prefetch_tasks[agent.id] = asyncio.create_task(self._prefetch_async(agent, all_agents))
+    
+    async def _prefetch_async(self, agent: Agent, all_agents: List[Agent]) -> None:
+        """Request a decision ahead of time and remember the situation it was made in."""
+        try:
+            nearby = self._nearby_names(agent, all_agents)
+            situation = (agent.x, agent.y, nearby)
+            decision = await self._request_decision(agent, nearby, time.monotonic() + settings.THINKING_DEADLINE)
+            if decision is not None:
+                self._prefetched[agent.id] = (decision, time.monotonic() + settings.THINK_PREFETCH_TTL, situation)
+        finally:
+            self._prefetch_tasks.pop(agent.id, None)
+    
+    async def _take_prefetched(self, agent: Agent, nearby: Tuple[str, ...], deadline: float) -> Optional[ThinkingDecision]:
+        """Use a prefetched decision if it is fresh and the agent's situation has not changed much."""
+        task = self._prefetch_tasks.get(agent.id)
+        if task is not None:
+            # Already on its way, wait for it instead of asking twice
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                return None
+        
+        entry = self._prefetched.pop(agent.id, None)
+        if entry is None:
+            return None
+        
+        decision, expires_at, (x, y, prefetch_nearby) = entry
+        drift = settings.THINK_PREFETCH_MAX_DRIFT
+        # Agents walking away don't matter, newcomers or a departed target do
+        neighbours_changed = bool(set(nearby) - set(prefetch_nearby)) or (decision.target and decision.target not in nearby)
+        if time.monotonic() > expires_at or (agent.x - x) ** 2 + (agent.y - y) ** 2 > drift ** 2 or neighbours_changed:
+            self.prefetch_discarded += 1
+            return None
+        
+        self.prefetch_hits += 1
+        return decision
+    
+    def decision_stats(self) -> Dict[str, int]:
+        """Get how many decisions were made locally and how many escalated, per rule."""
+        return dict(self.escalation.counters)
+    
+    def prefetch_stats(self) -> Dict[str, int]:
+        """Get how many prefetched decisions were started, used and thrown away."""
+        return {
+            'started': self.prefetch_started,
+            'in_flight': len(self._prefetch_tasks),
+            'ready': len(self._prefetched),
+            'hits': self.prefetch_hits,
+            'discarded': self.prefetch_discarded
+        }
+    
+    def _parse_decision(self, response: str, agent: Agent, nearby: Tuple[str, ...]) -> ThinkingDecision:
+        """Validate the model's JSON decision, salvaging a direction from anything else."""
+        # Small models sometimes wrap the object in prose or code fences
+        start, end = response.find('{'), response.rfind('}')
+        try:
+            decision = ThinkingDecision.model_validate_json(response[start:end + 1] if start >= 0 else response)
+        except ValueError:
+            logger.debug(f"Invalid decision from {agent.name}, scanning text instead: {response!r}")
+            # Broken JSON is not worth displaying
+            return ThinkingDecision(direction=agent._extract_direction_from_thought(response),
+                                    say=response if start < 0 else "")
+        
+        if decision.direction not in DIRECTIONS and decision.direction not in terrain.points_of_interest:
+            decision.direction = agent._extract_direction_from_thought(decision.direction)
+        # Only agents the model was told about can be targets
+        if decision.target not in nearby:
+            decision.target = None
+        return decision
     
     def process_thinking_batch(self) -> None:
         """Process all pending thinking requests synchronously."""
@@ -69,22 +248,21 @@ class ThinkingService:
                 
             logger.info(f"Processing thinking batch for {len(current_batch)} agents")
             
-            for agent, all_agents in current_batch:
-                # Generate simple directional thought
-                directions = ["north", "south", "east", "west"]
-                direction = random.choice(directions)
-                
-                thoughts = [
-                    f"I think I'll explore {direction} for a while.",
-                    f"Let me try going {direction} to see what happens.",
-                    f"Moving {direction} feels right for my goals."
-                ]
-                
-                agent.next_thought = random.choice(thoughts)
+            for agent, all_agents, _ in current_batch:
+                # Decide locally without the LLM
+                agent.next_decision = self.planner.decide(agent, all_agents, self._nearby_names(agent, all_agents))
+                self._thinking.discard(agent.id)
+                self._decided.append(agent)
                 
         except Exception as e:
             logger.error(f"Error in thinking batch process: {e}")
     
     def add_pending_agents(self, agents: List[Tuple[Agent, List[Agent]]]) -> None:
         """Add pending agents from external sources."""
-        self._pending_agents.extend(agents)
+        # Every thought has to be ready within THINKING_DEADLINE of being queued
+        deadline = time.monotonic() + settings.THINKING_DEADLINE
+        for agent, all_agents in agents:
+            # An agent still waiting for its last decision does not ask for another one
+            if agent.id not in self._thinking:
+                self._thinking.add(agent.id)
+                self._pending_agents.append((agent, all_agents, deadline))
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+from app.core.config import settings
+from app.services.agent_service import AgentService
+from app.services.conversation_archive import ConversationArchive
+from app.services.conversation_service import ConversationService
+from app.services.llm_pool import LLMPool
+from app.services.memory_compactor import MemoryCompactor
+from app.services.prompt_builder import PromptBuilder
+from app.services.simulation_control import LocalSimulationControl
+from app.services.thinking_service import ThinkingService
+
+logger = logging.getLogger(__name__)
+
+WORLD_ID = re.compile(r'^[a-z0-9][a-z0-9_-]{0,31}$')
+
+
+class World:
+    """One independent simulation: its agents, services, viewers and background tasks.
+
+    It has the attributes the simulation loop, the routers and LocalSimulationControl
+    read (agent_service, simulation_running, ...), so they work on any world.
+    """
+
+    def __init__(self, world_id: str, agent_service: Any, conversation_service: Any, weight: float = 1.0,
+                 thinking_service: Optional[ThinkingService] = None, llm_pool: Any = None,
+                 memory_compactor: Optional[MemoryCompactor] = None,
+                 conversation_archive: Optional[ConversationArchive] = None,
+                 simulation_control: Any = None):
+        self.id = world_id
+        self.weight = weight
+        self.agent_service = agent_service
+        self.conversation_service = conversation_service
+        self.thinking_service = thinking_service
+        self.llm_pool = llm_pool
+        self.memory_compactor = memory_compactor
+        self.conversation_archive = conversation_archive
+        self.simulation_control = simulation_control or LocalSimulationControl(self)
+        self.simulation_running = False
+        self.simulation_speed = settings.MOVE_INTERVAL
+        self.clients: List[Any] = []  # WebSockets viewing this world
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.state_bus = None  # set in the simulation process
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'weight': self.weight,
+            'agents': len(self.agent_service.agents),
+            'tick': self.agent_service.tick,
+            'running': self.simulation_running,
+            'speed': self.simulation_speed,
+            'clients': len(self.clients)
+        }
+
+
+def archive_path(world_id: str) -> str:
+    """The default world archives to CONVERSATION_ARCHIVE_PATH, others to a file named after them next to it."""
+    path = settings.CONVERSATION_ARCHIVE_PATH
+    if not path or world_id == settings.DEFAULT_WORLD:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}-{world_id}{extension}"
+
+
+class WorldManager:
+    """The worlds hosted by this server, all sharing one LLM pool.
+
+    Each world gets its own services on a view of the pool that schedules its requests
+    against its weighted share of the replicas. `start_tasks` starts a world's
+    background tasks (its simulation loop); without it (external mode) worlds can
+    only be added as built, not created.
+    """
+
+    def __init__(self, pool: LLMPool,
+                 start_tasks: Optional[Callable[[World], Dict[str, asyncio.Task]]] = None,
+                 stop_tasks: Optional[Callable[[Dict[str, asyncio.Task]], Awaitable[None]]] = None):
+        self.pool = pool
+        self.worlds: Dict[str, World] = {}
+        self._start_tasks = start_tasks
+        self._stop_tasks = stop_tasks
+
+    def get(self, world_id: str) -> World:
+        """Get a world by id, raising KeyError if there is none."""
+        world = self.worlds.get(world_id)
+        if world is None:
+            raise KeyError(f"World {world_id} not found")
+        return world
+
+    def add(self, world: World) -> World:
+        self.worlds[world.id] = world
+        self.pool.set_tenant(world.id, world.weight)
+        return world
+
+    def create(self, world_id: str, weight: float = settings.WORLD_WEIGHT,
+               num_agents: Optional[int] = None) -> World:
+        """Create a world with its own services and start its simulation loop (stopped until started)."""
+        if self._start_tasks is None:
+            raise ValueError("Worlds can only be created where the simulation runs (SIMULATION_MODE=embedded)")
+        if not WORLD_ID.match(world_id):
+            raise ValueError("World ids are 1-32 lowercase letters, digits, '-' or '_'")
+        if world_id in self.worlds:
+            raise ValueError(f"World {world_id} already exists")
+        if len(self.worlds) >= settings.MAX_WORLDS:
+            raise ValueError(f"At most {settings.MAX_WORLDS} worlds can run at once")
+        if weight <= 0:
+            raise ValueError("Weight must be positive")
+
+        pool = self.pool.for_tenant(world_id)
+        builder = PromptBuilder()
+        archive = None
+        if archive_path(world_id):
+            archive = ConversationArchive(archive_path(world_id))
+            archive.start()
+        agent_service = AgentService()
+        if num_agents is not None:
+            agent_service.reset_agents(num_agents)
+        world = World(
+            world_id,
+            agent_service,
+            ConversationService(pool=pool, builder=builder, archive=archive),
+            weight,
+            thinking_service=ThinkingService(pool=pool, builder=builder),
+            llm_pool=pool,
+            memory_compactor=MemoryCompactor(pool=pool, builder=builder),
+            conversation_archive=archive
+        )
+        self.add(world)
+        world.tasks = self._start_tasks(world)
+        logger.info(f"Created world {world_id} with {len(agent_service.agents)} agents (weight {weight})")
+        return world
+
+    def set_weight(self, world_id: str, weight: float) -> World:
+        if weight <= 0:
+            raise ValueError("Weight must be positive")
+        world = self.get(world_id)
+        world.weight = weight
+        self.pool.set_tenant(world_id, weight)
+        return world
+
+    async def remove(self, world_id: str) -> None:
+        """Stop a world's tasks, disconnect its viewers and close its archive."""
+        world = self.get(world_id)
+        del self.worlds[world_id]
+        self.pool.remove_tenant(world_id)
+        if self._stop_tasks is not None:
+            await self._stop_tasks(world.tasks)
+        if world.thinking_service is not None:
+            await world.thinking_service.close()
+        # Workers in external mode only have a view of the simulation process's conversations
+        if isinstance(world.conversation_service, ConversationService):
+            await world.conversation_service.close()
+        for client in list(world.clients):
+            try:
+                await client.close(code=1001)
+            except Exception as e:
+                logger.debug(f"Error closing WebSocket client: {e}")
+        if world.conversation_archive is not None:
+            world.conversation_archive.close()
+        logger.info(f"Removed world {world_id}")
+
+    async def close(self) -> None:
+        """Remove every world."""
+        for world_id in list(self.worlds):
+            await self.remove(world_id)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Every world with its weight, size and state, plus its use of the LLM replicas."""
+        tenants = self.pool.tenant_stats()
+        return [{**world.describe(), 'llm': tenants.get(world.id)} for world in self.worlds.values()]
@@ -0,0 +1,59 @@
+"""Run the simulation in its own process, publishing every tick to the state bus.
+
+Start it with `python -m app.simulation_process`, then run any number of API workers
+with SIMULATION_MODE=external, e.g. `uvicorn app.main:app --workers 4`. Both sides
+need the same SIMULATION_COMMAND_AUTHKEY, e.g. from `secrets.token_hex(32)`.
+"""
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.main import app, init_services, start_background_tasks, stop_background_tasks
+from app.services.simulation_control import command_channel
+from app.services.state_bus import CommandServer, StateBusWriter
+
+logger = logging.getLogger(__name__)
+
+
+async def serve() -> None:
+    """Run the simulation and serve commands from the API workers until cancelled."""
+    # Fail before building the world if the command channel has no key
+    address, authkey = command_channel()
+    init_services(app)
+    # API workers serve the default world from the state bus
+    world = app.state.world_manager.get(settings.DEFAULT_WORLD)
+    world.state_bus = StateBusWriter(settings.STATE_BUS_NAME, settings.STATE_BUS_SLOT_SIZE)
+
+    # Commands arrive on the server's threads and run on the simulation's event loop
+    loop = asyncio.get_running_loop()
+    control = app.state.simulation_control
+
+    def handle(command):
+        future = asyncio.run_coroutine_threadsafe(control.dispatch(command), loop)
+        # Long-running commands (profiles) say how long they may take
+        return future.result(command.get('timeout', settings.SIMULATION_COMMAND_TIMEOUT))
+
+    server = CommandServer(address, authkey, handle)
+    server.start()
+
+    tasks = start_background_tasks(app)
+    # Shut down cleanly on SIGTERM too, so the shared memory segment is released
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        await asyncio.gather(*tasks.values())
+    except asyncio.CancelledError:
+        pass
+    finally:
+        logger.info("Shutting down simulation process...")
+        server.close()
+        await stop_background_tasks(tasks)
+        await app.state.world_manager.close()
+        world.state_bus.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1 @@
+"""Offline benchmarks for the simulation and the broadcast path (no LLM needed)."""
@@ -0,0 +1,192 @@
+"""Microbenchmarks of the simulation hot paths over populations of 10 to 100k agents.
+
+Runs offline (no LLM calls) from the backend directory:
+
+    python -m benchmarks.hot_paths --output benchmarks/baseline.json
+    python -m benchmarks.hot_paths --baseline benchmarks/baseline.json --threshold 0.3
+
+Each benchmark reports the median and the fastest time per call over repeated
+rounds. With a baseline, the run exits with status 1 if any fastest time got slower
+than the baseline's by more than the threshold (the fastest round is the one least
+disturbed by other load on the machine). Record the baseline on the machine that runs
+the comparison (timings don't transfer between machines) and refresh it after
+intended changes.
+"""
+import argparse
+import gc
+import logging
+import math
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.agent import Agent
+from app.models.terrain import terrain
+from app.services.agent_service import AgentService
+
+from benchmarks.report import compare, load_report, print_comparison, write_report
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+# Agents per 100x100 pixels around the world center (clamped to the walkable area)
+DEFAULT_DENSITIES = [1.0, 20.0]
+DIRECTIONS = ['north', 'south', 'east', 'west', 'stay']
+COMPARED_METRIC = 'min_us'
+
+
+def build_population(num_agents: int, density: float, seed: int) -> AgentService:
+    """An AgentService holding `num_agents` agents spread at `density` around the center."""
+    random.seed(seed)
+    service = AgentService()
+    center_x, center_y = terrain.points_of_interest['center']
+    bounds = settings.WALKABLE_BOUNDS
+    half = 50 * math.sqrt(num_agents / density)
+    min_x, max_x = max(bounds['min_x'], center_x - half), min(bounds['max_x'], center_x + half)
+    min_y, max_y = max(bounds['min_y'], center_y - half), min(bounds['max_y'], center_y + half)
+
+    colors = settings.AGENT_COLORS.split(",")
+    agents = []
+    for i in range(num_agents):
+        x, y = terrain.snap(random.uniform(min_x, max_x), random.uniform(min_y, max_y))
+        agents.append(Agent(agent_id=i, name=f"Agent{i}", x=x, y=y, color=colors[i % len(colors)]))
+    service.agents = agents
+    service._agents_by_id = {agent.id: agent for agent in agents}
+    return service
+
+
+def measure(func: Callable[[], Any], budget: float, min_rounds: int = 3) -> Dict[str, float]:
+    """Time `func`, calling it in rounds of at least ~1ms until `budget` seconds are used."""
+    func()  # warm up caches and lazily built state
+    start = time.perf_counter()
+    func()
+    single = max(time.perf_counter() - start, 1e-7)
+    number = max(1, int(0.001 / single))
+
+    samples: List[float] = []
+    # Like timeit, keep collector pauses (triggered by whatever allocated before) out of the timings
+    gc.collect()
+    gc.disable()
+    try:
+        deadline = time.perf_counter() + budget
+        while len(samples) < min_rounds or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        gc.enable()
+    return {
+        'median_us': statistics.median(samples) * 1e6,
+        'min_us': min(samples) * 1e6,
+        'rounds': len(samples),
+        'calls_per_round': number
+    }
+
+
+def benchmarks(service: AgentService) -> Dict[str, Callable[[], Any]]:
+    """The hot paths, each as a zero-argument callable over the given population."""
+    from app.main import agent_update_message
+
+    agents = service.agents
+    scheduler = service.conversation_scheduler
+    sample = [agents[i] for i in random.sample(range(len(agents)), min(len(agents), 64))]
+    cursor = {'i': 0}
+    world = SimpleNamespace(agent_service=service)
+
+    def next_agent() -> Agent:
+        cursor['i'] = (cursor['i'] + 1) % len(sample)
+        return sample[cursor['i']]
+
+    def move():
+        # An agent that just finished a segment: picks its next target and looks for company
+        agent = next_agent()
+        agent.move_progress = 1.0
+        agent.movement_queue.clear()
+        service.tick += 1
+        agent.move(agents, service.world_size, scheduler, service.tick)
+
+    def check_for_interactions():
+        agent = next_agent()
+        agent.move_progress = 1.0
+        agent.conversation_cooldown_until = service.tick + 1
+        agent._check_for_interactions(agents, scheduler, service.tick)
+
+    def calculate_target_position():
+        next_agent()._calculate_target_position(random.choice(DIRECTIONS), service.world_size)
+
+    def to_dict():
+        next_agent().to_dict()
+
+    def broadcast_all_changed():
+        # Worst case for the fragment cache: every agent changed since the last broadcast
+        for agent in agents:
+            agent._dirty = True
+        agent_update_message(world)
+
+    return {
+        'agent.move': move,
+        'agent.check_for_interactions': check_for_interactions,
+        'agent.calculate_target_position': calculate_target_position,
+        'agent.to_dict': to_dict,
+        'agent_service.get_agents_data': service.get_agents_data,
+        'broadcast.agent_update_message': lambda: agent_update_message(world),
+        'broadcast.agent_update_all_changed': broadcast_all_changed
+    }
+
+
+def run(sizes: List[int], densities: List[float], budget: float, seed: int,
+        selected: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    results = []
+    for num_agents in sizes:
+        for density in densities:
+            service = build_population(num_agents, density, seed)
+            for name, func in benchmarks(service).items():
+                if selected and not any(name.startswith(prefix) for prefix in selected):
+                    continue
+                random.seed(seed)
+                timing = measure(func, budget)
+                results.append({'name': name, 'agents': num_agents, 'density': density, **timing})
+                print(f"{name:<36}{num_agents:>8}{density:>9}{timing['median_us']:>14.2f} us", file=sys.stderr)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated population sizes")
+    parser.add_argument('--densities', default=",".join(map(str, DEFAULT_DENSITIES)),
+                        help="comma-separated agents per 100x100 pixels")
+    parser.add_argument('--only', default="", help="comma-separated benchmark name prefixes to run")
+    parser.add_argument('--budget', type=float, default=0.3, help="seconds of measurement per benchmark")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='-', help="where to write the JSON results ('-' for stdout)")
+    parser.add_argument('--baseline', help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.3, help="allowed slowdown vs. the baseline (0.3 = 30%%)")
+    args = parser.parse_args(argv)
+
+    # The benchmarks exercise code that logs per agent
+    logging.disable(logging.WARNING)
+
+    results = run(
+        [int(size) for size in args.sizes.split(",")],
+        [float(density) for density in args.densities.split(",")],
+        args.budget,
+        args.seed,
+        [prefix for prefix in args.only.split(",") if prefix]
+    )
+    write_report(args.output, results, metric=COMPARED_METRIC)
+
+    if args.baseline:
+        rows = compare(results, load_report(args.baseline), COMPARED_METRIC, args.threshold)
+        print_comparison(rows, COMPARED_METRIC)
+        regressions = [row for row in rows if row['regression']]
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Results are matched to the baseline by these keys
+RESULT_KEYS = ('name', 'agents', 'density')
+
+
+def environment() -> Dict[str, Any]:
+    """Describe where the results were measured, so baselines from other machines are recognizable."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    }
+
+
+def write_report(path: str, results: List[Dict[str, Any]], **extra: Any) -> None:
+    """Write results as JSON ('-' for stdout)."""
+    report = {'environment': environment(), **extra, 'results': results}
+    text = json.dumps(report, indent=2)
+    if path == '-':
+        print(text)
+    else:
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _key(result: Dict[str, Any]) -> Tuple:
+    return tuple(result.get(key) for key in RESULT_KEYS)
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], metric: str,
+            threshold: float) -> List[Dict[str, Any]]:
+    """Compare a metric (lower is better) with the baseline's, flagging increases beyond `threshold`."""
+    previous = {_key(result): result for result in baseline.get('results', [])}
+    rows = []
+    for result in results:
+        before: Optional[Dict[str, Any]] = previous.get(_key(result))
+        if before is None or not before.get(metric):
+            continue
+        change = result[metric] / before[metric] - 1
+        rows.append({
+            **{key: result.get(key) for key in RESULT_KEYS},
+            'baseline': before[metric],
+            'current': result[metric],
+            'change': round(change, 3),
+            'regression': change > threshold
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], metric: str, out=sys.stderr) -> None:
+    """Print a comparison table, regressions marked."""
+    print(f"{'benchmark':<36}{'agents':>8}{'density':>9}{'baseline':>12}{'current':>12}{'change':>9}", file=out)
+    for row in rows:
+        marker = '  REGRESSION' if row['regression'] else ''
+        print(
+            f"{row['name']:<36}{row['agents'] or '':>8}{row['density'] or '':>9}"
+            f"{row['baseline']:>12.2f}{row['current']:>12.2f}{row['change']:>+9.1%}{marker}",
+            file=out
+        )
+    print(f"({metric}, lower is better)", file=out)
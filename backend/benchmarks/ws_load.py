@@ -0,0 +1,207 @@
+"""WebSocket load generator for sizing the broadcast path.
+
+Opens many concurrent /ws connections against a running server, has each client send
+the real commands (get_agents, get_conversations, update_speed, ping) at random
+intervals, and reports percentiles of:
+
+- connect time and ping round trip,
+- update latency: receive time minus the `tick_time` of agent_update messages
+  (the clocks of server and load generator must agree, e.g. run both on one host),
+- messages received per second per client,
+- and how many clients were disconnected before the end.
+
+    python -m benchmarks.ws_load --url ws://localhost:8000/ws --clients 2000 --duration 60
+
+Start the simulation first (POST /api/agents/start) so there are updates to measure.
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import websockets
+
+from benchmarks.report import write_report
+
+COMMANDS = ['get_agents', 'get_conversations', 'update_speed', 'ping']
+PERCENTILES = (50, 90, 99)
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """Nearest-rank percentiles plus max and count."""
+    if not values:
+        return {**{f'p{p}': None for p in PERCENTILES}, 'max': None, 'count': 0}
+    ordered = sorted(values)
+    summary = {
+        f'p{p}': round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 3)
+        for p in PERCENTILES
+    }
+    summary['max'] = round(ordered[-1], 3)
+    summary['count'] = len(ordered)
+    return summary
+
+
+class ClientStats:
+    """What one simulated viewer saw."""
+
+    def __init__(self):
+        self.connected_at: Optional[float] = None
+        self.connect_ms: Optional[float] = None
+        self.messages = 0
+        self.update_latencies_ms: List[float] = []
+        self.ping_ms: List[float] = []
+        self.commands_sent = 0
+        self.errors = 0
+        self.disconnected = False
+        self.failed = False
+        self.ended_at: Optional[float] = None
+
+    def message_rate(self) -> Optional[float]:
+        if self.connected_at is None or self.ended_at is None or self.ended_at <= self.connected_at:
+            return None
+        return self.messages / (self.ended_at - self.connected_at)
+
+
+async def _send_commands(websocket, stats: ClientStats, interval: float, speed: int, weights: List[float]) -> None:
+    """Send a random command every ~`interval` seconds."""
+    while True:
+        await asyncio.sleep(random.expovariate(1 / interval))
+        command = random.choices(COMMANDS, weights=weights)[0]
+        message: Dict[str, Any] = {'command': command}
+        if command == 'ping':
+            message['time'] = time.time()
+        elif command == 'update_speed':
+            message['speed'] = speed
+        await websocket.send(json.dumps(message))
+        stats.commands_sent += 1
+
+
+async def run_client(url: str, stats: ClientStats, stop_at: float, interval: float, speed: int,
+                     weights: List[float]) -> None:
+    start = time.perf_counter()
+    try:
+        websocket = await websockets.connect(url, open_timeout=30, max_size=None)
+    except Exception:
+        stats.failed = True
+        return
+    stats.connect_ms = (time.perf_counter() - start) * 1000
+    stats.connected_at = time.monotonic()
+
+    sender = asyncio.create_task(_send_commands(websocket, stats, interval, speed, weights))
+    try:
+        while True:
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                raw = await asyncio.wait_for(websocket.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            received = time.time()
+            stats.messages += 1
+            # Only the header is needed; agent updates can be large, so avoid parsing `data`
+            head = raw[:160] if isinstance(raw, str) else raw[:160].decode('utf-8', 'replace')
+            if head.startswith('{"type":"agent_update"'):
+                tick_time = _field(head, '"tick_time":')
+                if tick_time:
+                    stats.update_latencies_ms.append((received - tick_time) * 1000)
+            elif '"pong"' in head:
+                sent = json.loads(raw).get('time')
+                if sent:
+                    stats.ping_ms.append((received - sent) * 1000)
+            elif '"error"' in head:
+                stats.errors += 1
+    except websockets.ConnectionClosed:
+        stats.disconnected = True
+    finally:
+        stats.ended_at = time.monotonic()
+        sender.cancel()
+        await websocket.close()
+
+
+def _field(head: str, name: str) -> Optional[float]:
+    """Read a numeric field from the start of a message."""
+    start = head.find(name)
+    if start < 0:
+        return None
+    start += len(name)
+    end = start
+    while end < len(head) and head[end] in '0123456789.eE+-':
+        end += 1
+    try:
+        return float(head[start:end])
+    except ValueError:
+        return None
+
+
+def _raise_file_limit(needed: int) -> None:
+    """Each connection is a file descriptor; raise the soft limit as far as allowed."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        if target < needed:
+            print(f"Open file limit is {target}, fewer than {needed} connections may succeed", file=sys.stderr)
+
+
+async def run(url: str, clients: int, duration: float, ramp: float, interval: float, speed: int,
+              weights: List[float]) -> List[ClientStats]:
+    """Connect `clients` viewers at `ramp` connections/s and keep them busy for `duration` seconds."""
+    _raise_file_limit(clients + 64)
+    stop_at = time.monotonic() + clients / ramp + duration
+    stats = [ClientStats() for _ in range(clients)]
+    tasks = []
+    for client_stats in stats:
+        tasks.append(asyncio.create_task(run_client(url, client_stats, stop_at, interval, speed, weights)))
+        await asyncio.sleep(1 / ramp)
+    await asyncio.gather(*tasks)
+    return stats
+
+
+def summarize(stats: List[ClientStats]) -> Dict[str, Any]:
+    connected = [client for client in stats if not client.failed]
+    rates = [rate for rate in (client.message_rate() for client in connected) if rate is not None]
+    return {
+        'clients': len(stats),
+        'connected': len(connected),
+        'connect_failures': len(stats) - len(connected),
+        'disconnected': sum(client.disconnected for client in connected),
+        'disconnect_rate': round(sum(client.disconnected for client in connected) / len(connected), 4) if connected else None,
+        'commands_sent': sum(client.commands_sent for client in connected),
+        'error_replies': sum(client.errors for client in connected),
+        'connect_ms': percentiles([client.connect_ms for client in connected]),
+        'update_latency_ms': percentiles([value for client in connected for value in client.update_latencies_ms]),
+        'ping_rtt_ms': percentiles([value for client in connected for value in client.ping_ms]),
+        'messages_per_client_per_s': percentiles(rates)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='ws://localhost:8000/ws')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds to run once all clients are connected")
+    parser.add_argument('--ramp', type=float, default=200.0, help="new connections per second")
+    parser.add_argument('--interval', type=float, default=5.0, help="mean seconds between commands per client")
+    parser.add_argument('--speed', type=int, default=1000, help="speed sent with update_speed")
+    parser.add_argument('--weights', default="1,1,0.1,2",
+                        help="relative frequency of get_agents,get_conversations,update_speed,ping")
+    parser.add_argument('--output', default='-', help="where to write the JSON report ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    weights = [float(weight) for weight in args.weights.split(",")]
+    if len(weights) != len(COMMANDS):
+        parser.error(f"--weights needs {len(COMMANDS)} values")
+
+    stats = asyncio.run(run(args.url, args.clients, args.duration, args.ramp, args.interval, args.speed, weights))
+    summary = summarize(stats)
+    write_report(args.output, [summary], config=vars(args))
+    return 0 if summary['connected'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import pytest
+
+from app.core.config import settings
+from app.models.agent import Agent
+from app.services.conversation_scheduler import ConversationScheduler
+
+
+@pytest.fixture
+def segment_mode(monkeypatch):
+    monkeypatch.setattr(settings, 'MOVEMENT_MODE', 'segments')
+
+
+def moving_agent(agent_id: int, name: str, start, target, tick: int = 0) -> Agent:
+    agent = Agent(agent_id, name, *start, "#000000")
+    agent.target_x, agent.target_y = target
+    agent.move_progress = 0.0
+    agent.segment_start_tick = tick
+    return agent
+
+
+def test_position_at_matches_sync_position_without_changing_the_agent(segment_mode):
+    agent = moving_agent(0, "Ann", (200, 200), (240, 200))
+    tick = settings.SEGMENT_TICKS // 2
+
+    position = agent.position_at(tick)
+    assert (agent.x, agent.y, agent.move_progress) == (200, 200, 0.0)
+    agent.sync_position(tick)
+    assert position == (agent.x, agent.y)
+    assert 200 < agent.x < 240
+
+
+def test_interaction_checks_only_read_other_agents(segment_mode):
+    ann = Agent(0, "Ann", 240, 200, "#000000")
+    # Bob is on his way to Ann, his worker hasn't synced him yet
+    bob = moving_agent(1, "Bob", (240 - 3 * settings.INTERACTION_RADIUS, 200), (240, 200))
+
+    ann._check_for_interactions([ann, bob], ConversationScheduler(), tick=settings.SEGMENT_TICKS)
+
+    assert (bob.x, bob.move_progress) == (240 - 3 * settings.INTERACTION_RADIUS, 0.0)
+    assert any("met Bob" in memory for memory in ann.memory)
@@ -0,0 +1,55 @@
+import random
+
+from app.services.agent_scheduler import AgentScheduler, sample_wait_ticks
+
+
+def test_pop_due_returns_agents_due_by_tick_once():
+    scheduler = AgentScheduler()
+    scheduler.schedule(1, 5)
+    scheduler.schedule(2, 3)
+    scheduler.schedule(3, 9)
+
+    assert sorted(scheduler.pop_due(5)) == [1, 2]
+    assert scheduler.pop_due(5) == []
+    assert scheduler.next_wakeup(3) == 9
+    assert len(scheduler) == 1
+
+
+def test_reschedule_wake_and_cancel():
+    scheduler = AgentScheduler()
+    scheduler.schedule(1, 5)
+    scheduler.schedule(1, 8)  # replaces the earlier schedule
+    scheduler.wake(1, 10)  # later than the schedule, ignored
+    scheduler.schedule(2, 8)
+    scheduler.wake(2, 2)
+    scheduler.schedule(3, 1)
+    scheduler.cancel(3)
+
+    assert scheduler.pop_due(7) == [2]
+    assert scheduler.pop_due(100) == [1]
+    assert len(scheduler) == 0
+
+
+def test_upcoming_matches_live_schedules_without_removing_them():
+    rng = random.Random(7)
+    scheduler = AgentScheduler()
+    for _ in range(500):
+        agent_id, tick = rng.randrange(50), rng.randrange(100)
+        action = rng.random()
+        if action < 0.6:
+            scheduler.schedule(agent_id, tick)
+        elif action < 0.8:
+            scheduler.wake(agent_id, tick)
+        else:
+            scheduler.cancel(agent_id)
+
+    live = {agent_id: scheduler.next_wakeup(agent_id) for agent_id in range(50)}
+    expected = sorted((tick, agent_id) for agent_id, tick in live.items() if tick is not None and tick <= 40)
+    assert scheduler.upcoming(40) == expected
+    assert sorted(scheduler.pop_due(40)) == sorted(agent_id for _, agent_id in expected)
+
+
+def test_sample_wait_ticks_bounds():
+    assert sample_wait_ticks(1.0) == 1
+    assert sample_wait_ticks(0.0) == 2 ** 31
+    assert all(sample_wait_ticks(0.3) >= 1 for _ in range(100))
@@ -0,0 +1,23 @@
+import time
+
+from app.core.config import settings
+from app.models.agent import Agent
+from app.services.agent_service import AgentService
+
+
+def test_agents_are_rescheduled_when_their_updates_time_out(monkeypatch):
+    service = AgentService()
+    service.reset_agents(4)
+    slow = service.agents[0].id
+
+    def move(agent, *args):
+        if agent.id == slow:
+            time.sleep(0.3)
+        return 2
+
+    monkeypatch.setattr(Agent, 'move', move)
+    monkeypatch.setattr(settings, 'AGENT_UPDATE_TIMEOUT', 0.05)
+    service.update_agents_parallel()
+
+    # Nobody drops out of the move scheduler, whether or not its update finished in time
+    assert all(service._move_scheduler.next_wakeup(agent.id) is not None for agent in service.agents)
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import agents
+from app.services.agent_service import AgentService
+
+POSITIONS = [(10, 10), (50, 50), (90, 90), (20, 80), (60, 20)]
+
+
+class Worlds:
+    """World manager stand-in serving a single world."""
+
+    def __init__(self, world):
+        self.world = world
+
+    def get(self, world_id):
+        return self.world
+
+
+@pytest.fixture
+def service():
+    service = AgentService()
+    service.reset_agents(len(POSITIONS))
+    for agent, (x, y) in zip(service.agents, POSITIONS):
+        agent.x, agent.y = x, y
+    return service
+
+
+@pytest.fixture
+def client(service):
+    app = FastAPI()
+    app.include_router(agents.router, prefix="/api")
+    app.state.world_manager = Worlds(SimpleNamespace(agent_service=service))
+    return TestClient(app)
+
+
+def ids(response):
+    return [agent['id'] for agent in response.json()]
+
+
+def test_unchanged_agents_are_not_modified(client, service):
+    first = client.get("/api/agents/")
+    assert first.status_code == 200
+    etag = first.headers['etag']
+
+    again = client.get("/api/agents/", headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    service.agents[0].x += 1
+    changed = client.get("/api/agents/", headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['etag'] != etag
+
+
+def test_bbox_only_returns_agents_inside_it(client):
+    response = client.get("/api/agents/", params={'bbox': "0,0,55,55"})
+    assert response.status_code == 200
+    assert ids(response) == [0, 1]
+
+
+@pytest.mark.parametrize("bbox", ["1,2,3", "a,b,c,d", "nan,0,10,10", "0,0,inf,10", "10,0,0,10"])
+def test_invalid_bbox_is_unprocessable(client, bbox):
+    assert client.get("/api/agents/", params={'bbox': bbox}).status_code == 422
+
+
+def test_cursor_pages_through_every_agent(client):
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 2}
+        if cursor is not None:
+            params['cursor'] = cursor
+        response = client.get("/api/agents/", params=params)
+        assert response.status_code == 200
+        page = ids(response)
+        assert len(page) <= 2
+        seen += page
+        cursor = response.headers.get('x-next-cursor')
+        if cursor is None:
+            break
+
+    assert seen == list(range(len(POSITIONS)))
+
+
+def test_cursor_pages_within_a_bbox(client):
+    first = client.get("/api/agents/", params={'bbox': "0,0,70,70", 'limit': 2})
+    assert ids(first) == [0, 1]
+
+    rest = client.get("/api/agents/", params={'bbox': "0,0,70,70", 'limit': 2,
+                                              'cursor': first.headers['x-next-cursor']})
+    assert ids(rest) == [4]
+    assert 'x-next-cursor' not in rest.headers
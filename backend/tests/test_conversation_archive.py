@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.conversation_archive import ConversationArchive
+
+
+def agent(agent_id: int, name: str):
+    return SimpleNamespace(id=agent_id, name=name, current_location=lambda: "lake")
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = ConversationArchive(str(tmp_path / "conversations.db"))
+    archive.start()
+    yield archive
+    archive.close()
+
+
+def flush(archive: ConversationArchive) -> ConversationArchive:
+    """Wait for the writer, then reopen the archive like a restarted simulation would."""
+    archive.close()
+    archive.start()
+    return archive
+
+
+def test_nothing_archived_yet(tmp_path):
+    archive = ConversationArchive(str(tmp_path / "missing.db"))
+    assert archive.query() == ([], None)
+
+
+def test_pages_newest_first_with_a_cursor(archive):
+    ann, bob = agent(0, "Ann"), agent(1, "Bob")
+    for i in range(5):
+        archive.add(ann, bob, f"conversation {i}", source="llm")
+    flush(archive)
+
+    first, cursor = archive.query(limit=2)
+    assert [row['content'] for row in first] == ["conversation 4", "conversation 3"]
+    second, cursor = archive.query(limit=2, cursor=cursor)
+    assert [row['content'] for row in second] == ["conversation 2", "conversation 1"]
+    last, cursor = archive.query(limit=2, cursor=cursor)
+    assert [row['content'] for row in last] == ["conversation 0"]
+    assert cursor is None
+
+
+def test_agent_filter_only_sees_the_agents_of_the_latest_epoch(archive):
+    old_epoch = archive.epoch
+    archive.add(agent(0, "Ann"), agent(1, "Bob"), "Ann and Bob talk about the garden", source="llm")
+    # A reset brings new agents with the same ids
+    archive.begin_epoch()
+    archive.add(agent(0, "Cid"), agent(2, "Dee"), "Cid and Dee talk about the garden", source="llm")
+    flush(archive)
+
+    # Restarting began yet another epoch, without conversations so far
+    assert archive.epoch > old_epoch + 1
+    assert archive.query(agent_id=0) == ([], None)
+    rows, _ = archive.query(agent_id=0, epoch=old_epoch + 1)
+    assert [row['agent1_name'] for row in rows] == ["Cid"]
+    rows, _ = archive.query(agent_id=0, epoch=old_epoch)
+    assert [row['agent1_name'] for row in rows] == ["Ann"]
+    rows, _ = archive.query(epoch=old_epoch)
+    assert [row['epoch'] for row in rows] == [old_epoch]
+    assert len(archive.query()[0]) == 2
+
+    archive.add(agent(0, "Eve"), agent(1, "Fay"), "Eve and Fay talk about the garden", source="llm")
+    flush(archive)
+    rows, _ = archive.search("garden", agent_id=0, epoch=old_epoch + 2)
+    assert [row['agent1_name'] for row in rows] == ["Eve"]
+
+
+def test_full_text_search(archive):
+    ann, bob = agent(0, "Ann"), agent(1, "Bob")
+    archive.add(ann, bob, "Let's explore the garden together", source="llm")
+    archive.add(ann, bob, "The weather is nice today", source="fallback")
+    flush(archive)
+
+    rows, cursor = archive.search("garden")
+    assert [row['content'] for row in rows] == ["Let's explore the garden together"]
+    assert "[garden]" in rows[0]['snippet']
+    assert cursor is None
+    with pytest.raises(ValueError):
+        archive.search('"unbalanced')
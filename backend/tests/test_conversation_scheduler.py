@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.services.conversation_scheduler import ConversationScheduler
+
+
+def agents(count: int):
+    return [SimpleNamespace(id=i) for i in range(count)]
+
+
+def test_duplicate_and_busy_requests_are_rejected():
+    scheduler = ConversationScheduler()
+    a, b, c = agents(3)
+
+    assert scheduler.request(a, b, tick=0)
+    assert not scheduler.request(b, a, tick=0)
+    assert scheduler.match(capacity=1, tick=0) == [(a, b)]
+    assert scheduler.is_busy(a.id) and scheduler.is_busy(b.id)
+    assert not scheduler.request(a, c, tick=1)
+    assert scheduler.rejected_requests == 2
+
+
+def test_an_agent_is_matched_into_one_conversation_at_a_time():
+    scheduler = ConversationScheduler()
+    a, b, c, d = agents(4)
+    scheduler.request(a, b, tick=0)
+    scheduler.request(a, c, tick=0)
+    scheduler.request(c, d, tick=0)
+
+    assert scheduler.match(capacity=5, tick=0) == [(a, b), (c, d)]
+    # The request of the now busy agents was dropped
+    assert len(scheduler) == 0
+
+
+def test_released_pair_cools_down():
+    scheduler = ConversationScheduler()
+    a, b = agents(2)
+    scheduler.request(a, b, tick=0)
+    scheduler.match(capacity=1, tick=0)
+    scheduler.release(a, b, tick=10)
+
+    assert not scheduler.is_busy(a.id)
+    assert not scheduler.request(a, b, tick=10 + settings.PAIR_COOLDOWN_TICKS - 1)
+    assert scheduler.request(a, b, tick=10 + settings.PAIR_COOLDOWN_TICKS)
+
+
+def test_expire_drops_stale_requests_and_returns_agents_of_unfinished_conversations():
+    scheduler = ConversationScheduler()
+    a, b, c, d = agents(4)
+    scheduler.request(a, b, tick=0)
+    scheduler.match(capacity=1, tick=0)
+    scheduler.request(c, d, tick=settings.CONVERSATION_BUSY_TIMEOUT - settings.CONVERSATION_REQUEST_TTL)
+
+    assert scheduler.expire(settings.CONVERSATION_BUSY_TIMEOUT) == []
+    assert len(scheduler) == 1
+    assert sorted(scheduler.expire(settings.CONVERSATION_BUSY_TIMEOUT + 1)) == [a.id, b.id]
+    assert not scheduler.is_busy(a.id) and not scheduler.is_busy(b.id)
+    assert len(scheduler) == 0
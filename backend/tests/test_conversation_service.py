@@ -0,0 +1,69 @@
+import asyncio
+
+from app.models.agent import Agent
+from app.services.conversation_service import ConversationService
+
+
+class GatedPool:
+    """LLM pool stand-in whose completions wait until the gate opens."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started = 0
+
+    def replica_for_agent(self, agent_id):
+        return 'replica'
+
+    def available_capacity(self):
+        return 4
+
+    def stats(self):
+        return {}
+
+    async def complete(self, replica_key, messages, **kwargs):
+        self.started += 1
+        await self.gate.wait()
+        return "Hello!"
+
+
+def pair():
+    return Agent(1, "Ava", 10, 10, "#fff"), Agent(2, "Neo", 12, 10, "#000")
+
+
+def test_conversations_are_generated_in_the_background():
+    async def scenario():
+        pool = GatedPool()
+        service = ConversationService(pool=pool)
+        agent1, agent2 = pair()
+        service.add_pending_conversations([(agent1, agent2)])
+
+        # Starting the batch returns at once, while the LLM is still answering
+        service.start_conversation_batch()
+        while not pool.started:
+            await asyncio.sleep(0)
+        assert service.pop_completed_conversations() == []
+
+        pool.gate.set()
+        while not service.conversation_history:
+            await asyncio.sleep(0)
+        assert service.pop_completed_conversations() == [(agent1, agent2)]
+        assert service.conversation_history[-1].endswith("Hello!")
+
+    asyncio.run(scenario())
+
+
+def test_close_cancels_conversations_in_flight():
+    async def scenario():
+        pool = GatedPool()
+        service = ConversationService(pool=pool)
+        service.add_pending_conversations([pair()])
+        service.start_conversation_batch()
+        while not pool.started:
+            await asyncio.sleep(0)
+
+        await service.close()
+        assert not service._batch_tasks
+        assert service.pop_completed_conversations() == []
+        assert service.conversation_history == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+import pytest
+
+from app.core.config import settings
+from app.models.agent import Agent
+from app.models.pydantic_models import ThinkingDecision
+from app.models.terrain import terrain
+from app.services.decision_backends import EscalationPolicy, UtilityPlanner
+
+
+def agent_at(agent_id: int, name: str, position, personality: str = "", goal: str = "") -> Agent:
+    agent = Agent(agent_id, name, *position, "#000000")
+    agent.personality, agent.goal = personality, goal
+    return agent
+
+
+@pytest.fixture
+def center():
+    return terrain.points_of_interest['center']
+
+
+@pytest.fixture
+def no_noise(monkeypatch):
+    monkeypatch.setattr(settings, 'PLANNER_NOISE', 0.0)
+
+
+def test_planner_rests_agents_that_like_to_settle(center, no_noise):
+    agent = agent_at(0, "Ann", center, personality="cautious", goal="settle down")
+
+    decision = UtilityPlanner().decide(agent, [agent], ())
+
+    assert decision.direction == 'stay' and decision.target is None
+    assert agent._calculate_target_position(decision.direction, settings.WORLD_SIZE) == center
+
+
+def test_planner_greets_the_closest_nearby_agent(center, no_noise):
+    ann = agent_at(0, "Ann", center, personality="social", goal="interact with everyone")
+    far = agent_at(1, "Bob", (center[0] + 25, center[1]))
+    close = agent_at(2, "Cid", (center[0], center[1] + 5))
+
+    decision = UtilityPlanner().decide(ann, [ann, far, close], ("Bob", "Cid"))
+
+    assert (decision.direction, decision.target) == ('stay', "Cid")
+
+
+def test_greeter_walks_up_to_its_target_then_stays(center):
+    ann = agent_at(0, "Ann", center)
+    bob = agent_at(1, "Bob", (center[0] + 2 * settings.INTERACTION_RADIUS, center[1]))
+    greeting = ThinkingDecision(direction='stay', target="Bob")
+
+    assert ann._direction_from_decision(greeting, [ann, bob]) == 'east'
+    bob.x = center[0] + settings.INTERACTION_RADIUS // 2
+    direction = ann._direction_from_decision(greeting, [ann, bob])
+    assert direction == 'stay'
+    assert ann._calculate_target_position(direction, settings.WORLD_SIZE) == center
+
+
+def test_escalation_on_first_meeting_and_goal_change(center):
+    policy = EscalationPolicy(['first_meeting', 'goal_changed'])
+    agent = agent_at(0, "Ann", center, goal="explore")
+
+    assert policy.escalate(agent, ("Bob",)) == 'first_meeting'
+    assert policy.escalate(agent, ("Bob",)) is None
+    agent.goal = "settle down"
+    assert policy.escalate(agent, ("Bob",)) == 'goal_changed'
+    assert policy.escalate(agent, ("Bob", "Cid")) == 'first_meeting'
+    assert policy.counters['local'] == 1
+    assert (policy.counters['first_meeting'], policy.counters['goal_changed']) == (2, 1)
+
+
+def test_escalation_after_a_long_idle_time(center, monkeypatch):
+    policy = EscalationPolicy(['long_idle'])
+    agent = agent_at(0, "Ann", center)
+
+    assert policy.escalate(agent, ()) == 'long_idle'
+    assert policy.escalate(agent, ()) is None
+    monkeypatch.setattr(settings, 'THINK_ESCALATION_IDLE', -1.0)
+    assert policy.reason(agent, ()) == 'long_idle'
+
+
+def test_escalation_rules_are_checked():
+    assert EscalationPolicy([]).reason(agent_at(0, "Ann", (0, 0)), ("Bob",)) is None
+    assert EscalationPolicy(['always']).escalate(agent_at(0, "Ann", (0, 0)), ()) == 'always'
+    with pytest.raises(ValueError):
+        EscalationPolicy(['sometimes'])
@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm_budget
+from app.services.llm_budget import BudgetGovernor, TokenBucket
+from app.services.llm_pool import BudgetExhausted, LLMPool
+
+MESSAGES = [{'role': 'user', 'content': 'Where to next?'}]
+
+
+class Clock:
+    """Stand-in for the budget's time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_budget, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def budget(monkeypatch, clock):
+    monkeypatch.setattr(settings, 'LLM_GLOBAL_RPS', 1.0)
+    monkeypatch.setattr(settings, 'LLM_GLOBAL_TPM', 600)
+    monkeypatch.setattr(settings, 'LLM_AGENT_RPS', 0.5)
+    monkeypatch.setattr(settings, 'LLM_AGENT_TPM', 300)
+    return BudgetGovernor()
+
+
+def test_bucket_refills_at_its_rate_up_to_capacity(clock):
+    bucket = TokenBucket(rate=10.0, capacity=20.0)
+    bucket.take(20)
+    assert not bucket.has(1, clock())
+
+    clock.advance(0.5)
+    assert bucket.has(5, clock())
+    assert not bucket.has(5.1, clock())
+
+    clock.advance(60)
+    assert bucket.has(20, clock())
+    assert not bucket.has(20.1, clock())
+
+
+def test_bucket_pays_off_debt_before_refilling(clock):
+    bucket = TokenBucket(rate=10.0, capacity=20.0)
+    bucket.take(30)
+
+    clock.advance(1)
+    assert not bucket.has(1, clock())
+    clock.advance(1.1)
+    assert bucket.has(1, clock())
+
+
+def test_global_requests_run_out_and_come_back(budget, clock):
+    # Capacity is two seconds' worth of requests
+    assert budget.try_acquire(None, 10)
+    assert budget.try_acquire(None, 10)
+    assert not budget.try_acquire(None, 10)
+    assert budget.total.denied == 1
+
+    clock.advance(1)
+    assert budget.try_acquire(None, 10)
+    assert not budget.try_acquire(None, 10)
+
+
+def test_denied_requests_take_nothing(budget, clock):
+    assert budget.try_acquire(7, 10)
+    # The agent's request bucket holds a single request, the global ones still have room
+    assert not budget.try_acquire(7, 10)
+    assert budget.agents[7].denied == 1
+    assert budget.global_requests.tokens == 1
+    assert budget.global_tokens.tokens == 590
+
+    # Other agents are unaffected by agent 7's budget
+    assert budget.try_acquire(8, 10)
+
+
+def test_actual_usage_settles_the_estimate(budget, clock):
+    assert budget.try_acquire(7, 100)
+    budget.record(7, 'replica', 100, 250, 250, latency=1.0)
+
+    # 500 tokens were used, 200 more than agent 7's capacity
+    agent_tokens = budget._agent_buckets(7)[1]
+    assert agent_tokens.tokens == -200
+    assert budget.global_tokens.tokens == 100
+
+    # Paying off the debt takes 200 / (300 / 60) = 40 seconds
+    clock.advance(39)
+    assert not budget.try_acquire(7, 1)
+    clock.advance(2)
+    assert budget.try_acquire(7, 1)
+    assert budget.agents[7].to_dict()['completion_tokens'] == 250
+
+
+def test_complete_raises_budget_exhausted_before_sending(monkeypatch, budget, clock):
+    monkeypatch.setattr(settings, 'OPENAI_API_KEY', '')
+    pool = LLMPool()
+    pool.budget = budget
+    budget.global_requests.take(budget.global_requests.capacity)
+
+    async def send(*args, **kwargs):
+        raise AssertionError("request sent without budget")
+
+    monkeypatch.setattr(pool, '_complete_on', send)
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(pool.complete('replica', MESSAGES, max_tokens=10, agent_id=7))
+    assert budget.total.denied == 1
+    assert budget.agents[7].denied == 1
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_pool import AdaptiveConcurrencyLimiter
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def limiter_with_limit(limit: int) -> AdaptiveConcurrencyLimiter:
+    limiter = AdaptiveConcurrencyLimiter("test")
+    limiter.limit = float(limit)
+    return limiter
+
+
+def test_cancelled_waiter_dropped_by_release_raises_cancelled():
+    async def scenario():
+        limiter = limiter_with_limit(1)
+        await limiter.acquire('a')
+        waiting = asyncio.create_task(limiter.acquire('a'))
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+
+        # The release runs before the cancelled task gets to clean up after itself
+        waiting.cancel()
+        limiter.abandon('a')
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+
+        # The slot is still usable
+        await asyncio.wait_for(limiter.acquire('a'), timeout=1)
+        assert limiter.in_flight == 1
+
+    run(scenario())
+
+
+def test_slot_granted_to_a_cancelled_waiter_is_passed_on():
+    async def scenario():
+        limiter = limiter_with_limit(1)
+        await limiter.acquire('a')
+        cancelled = asyncio.create_task(limiter.acquire('b'))
+        next_in_line = asyncio.create_task(limiter.acquire('c'))
+        await asyncio.sleep(0)
+
+        # The slot goes to 'b', which is cancelled before it gets to run
+        limiter.abandon('a')
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        await asyncio.wait_for(next_in_line, timeout=1)
+        assert limiter.in_flight == 1
+        assert limiter.tenant_in_flight == {'c': 1}
+
+    run(scenario())
+
+
+def test_contended_slots_are_shared_by_weight():
+    async def scenario():
+        limiter = limiter_with_limit(1)
+        await limiter.acquire('x')
+        waiting = [asyncio.create_task(limiter.acquire('heavy', weight=2.0)) for _ in range(6)]
+        waiting += [asyncio.create_task(limiter.acquire('light', weight=1.0)) for _ in range(6)]
+        await asyncio.sleep(0)
+
+        order, holder = [], 'x'
+        for _ in range(6):
+            granted = dict(limiter.tenant_granted)
+            limiter.abandon(holder)
+            holder = next(tenant for tenant, count in limiter.tenant_granted.items() if count != granted.get(tenant))
+            order.append(holder)
+            await asyncio.sleep(0)
+
+        assert order.count('heavy') == 4
+        assert order.count('light') == 2
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+
+    run(scenario())
+
+
+def test_limit_grows_on_fast_responses_and_backs_off_on_errors():
+    limiter = limiter_with_limit(4)
+
+    run(limiter.acquire())
+    limiter.release(latency=0.0)
+    assert limiter.limit == pytest.approx(4.25)
+
+    run(limiter.acquire())
+    limiter.release(latency=None, error=True)
+    assert limiter.limit == pytest.approx(max(settings.LLM_MIN_CONCURRENCY, 4.25 * settings.LLM_BACKOFF_FACTOR))
+    assert (limiter.successes, limiter.failures) == (1, 1)
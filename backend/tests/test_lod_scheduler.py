@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.services.conversation_scheduler import ConversationScheduler
+from app.services.lod_scheduler import LevelOfDetailScheduler
+
+
+def agent(agent_id: int, x: float, y: float, last_update_tick: int = 0):
+    return SimpleNamespace(id=agent_id, x=x, y=y, last_update_tick=last_update_tick)
+
+
+def test_observed_and_talking_agents_get_full_detail():
+    conversations = ConversationScheduler()
+    lod = LevelOfDetailScheduler(conversations)
+    lod.set_viewport('viewer', (0, 0, 100, 100))
+    seen, talking, unseen = agent(1, 50, 50), agent(2, 400, 400), agent(3, 450, 450)
+    conversations.request(talking, unseen, tick=0)
+
+    assert lod.is_full_detail(seen)
+    assert not lod.is_full_detail(talking)
+    conversations.match(capacity=1, tick=0)
+    assert lod.is_full_detail(talking) and lod.is_full_detail(unseen)
+
+    conversations.release(talking, unseen, tick=1)
+    assert lod.update_interval(talking) == settings.LOD_REDUCED_INTERVAL
+    lod.remove_viewer('viewer')
+    assert not lod.is_observed(seen)
+
+
+def test_plan_defers_the_most_recently_updated_reduced_agents_over_budget():
+    lod = LevelOfDetailScheduler(ConversationScheduler())
+    lod.set_viewport('viewer', (0, 0, 100, 100))
+    lod.cost_per_agent = 1.0
+    seen = agent(0, 50, 50, last_update_tick=9)
+    reduced = [agent(i, 400, 400, last_update_tick=10 - i) for i in range(1, 5)]
+
+    processed, deferred = lod.plan([seen] + reduced, budget=3.0)
+
+    assert processed == [seen, reduced[3], reduced[2]]
+    assert deferred == [reduced[1], reduced[0]]
+    assert lod.deferred_total == 2
+    assert lod.plan(reduced, budget=10.0) == (reduced, [])
@@ -0,0 +1,40 @@
+import sys
+
+import pytest
+
+from app.models.memory import MemoryStore
+from app.services.memory_accounting import deep_size
+
+
+class Connection:
+    """Stand-in for a WebSocket, whose scope references the whole application."""
+
+    def __init__(self, app):
+        self.scope = {'app': app}
+
+
+Connection.__module__ = 'starlette.websockets'
+
+
+def test_foreign_objects_are_not_walked_into():
+    app = {'state': [str(i) * 100 for i in range(10000)]}
+    clients = [Connection(app), Connection(app)]
+
+    assert deep_size(clients, 100) == sys.getsizeof(clients) + 2 * sys.getsizeof(clients[0])
+
+
+def test_own_objects_are_walked_into():
+    store = MemoryStore(capacity=100)
+    empty = deep_size(store, 100)
+    for i in range(50):
+        store.add(f"met Bob at the lake {i}" * 10, kind='met', entities=('Bob',))
+
+    assert deep_size(store, 100) > empty + 50 * 200
+
+
+def test_sampled_dicts_measure_values_as_well_as_keys():
+    values = {i: str(i) * 1000 for i in range(1, 1001)}
+    exact = deep_size(values, sample=len(values))
+
+    assert deep_size(values, sample=100) == pytest.approx(exact, rel=0.1)
+    assert deep_size(values, sample=100) > sum(sys.getsizeof(value) for value in values.values())
@@ -0,0 +1,43 @@
+from app.models.memory import MemoryStore
+
+
+def posting(store: MemoryStore, term: str):
+    return store._index.get(term, ())
+
+
+def test_removed_events_behind_live_ones_are_pruned():
+    store = MemoryStore(capacity=10000)
+    # A reflection at the old end keeps the head of the posting list alive
+    store.add("Bob and I talked a lot", kind='reflection', entities=('Bob',))
+    for _ in range(50):
+        for i in range(40):
+            store.add(f"met Bob {i}", kind='met', entities=('Bob',))
+        store.remove([event.id for event in store.oldest(30, exclude_kind='reflection')])
+
+    assert len(store) == 501
+    live = [event_id for event_id in posting(store, 'entity:Bob') if event_id in store._events]
+    assert len(live) == 501
+    # At most MEMORY_POSTING_MAX_DEAD (a half) of the list may be ids of removed events
+    assert len(posting(store, 'entity:Bob')) <= 2 * 501
+
+
+def test_queries_only_return_live_events():
+    store = MemoryStore(capacity=10000)
+    kept = store.add("met Bob at the lake", kind='met', entities=('Bob',), location='lake')
+    removed = [store.add(f"met Bob {i}", kind='met', entities=('Bob',)) for i in range(20)]
+    store.remove(event.id for event in removed)
+
+    assert [event.id for event in store.query(entities=('Bob',), k=10)] == [kept.id]
+    assert store.count('met') == 1
+
+
+def test_eviction_keeps_capacity_and_empties_postings():
+    store = MemoryStore(capacity=5)
+    for i in range(20):
+        store.add(f"saw Ann {i}", kind='saw', entities=('Ann',))
+
+    assert len(store) == 5
+    assert len(posting(store, 'entity:Ann')) == 5
+    store.remove([event.id for event in store.oldest(5)])
+    assert 'entity:Ann' not in store._index
+    assert 'kind:saw' not in store._index
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+
+from app.services.profiler import SamplingProfiler, TickPhase
+
+
+def test_interleaved_loops_keep_their_own_phase():
+    phase = TickPhase()
+    seen = []
+
+    async def loop(name: str, phases):
+        for current in phases:
+            phase.name = current
+            await asyncio.sleep(0)
+            seen.append((name, phase.name))
+
+    async def scenario():
+        await asyncio.gather(loop('a', ['move', 'thinking']), loop('b', ['conversation', 'broadcast']))
+        # Tasks that never set a phase are idle
+        assert phase.name == 'idle'
+
+    asyncio.run(scenario())
+    assert seen == [('a', 'move'), ('b', 'conversation'), ('a', 'thinking'), ('b', 'broadcast')]
+
+
+def test_samples_are_tagged_with_the_running_loop_phase():
+    phase = TickPhase()
+
+    async def waiting_world(started: asyncio.Event):
+        phase.name = 'conversation'
+        started.set()
+        await asyncio.sleep(1)
+
+    async def scenario():
+        loop, loop_thread = asyncio.get_running_loop(), threading.get_ident()
+        started = asyncio.Event()
+        waiting = asyncio.create_task(waiting_world(started))
+        await started.wait()
+
+        profile = {}
+        sampler = threading.Thread(target=lambda: profile.update(
+            SamplingProfiler().record(0.1, 0.005, loop, loop_thread, phase)
+        ))
+        # This world blocks the event loop in its move phase while the other one waits
+        phase.name = 'move'
+        sampler.start()
+        time.sleep(0.2)
+        sampler.join()
+        waiting.cancel()
+        return profile
+
+    profile = asyncio.run(scenario())
+    assert set(profile['phases']) == {'move'}
+    assert profile['collapsed'].startswith('phase:move;event-loop')
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.state_bus import (
+    _BUFFER_HEADER, _BUFFER_SEQ, _HEADER, SnapshotAgentView, SnapshotConversationView, StateBusReader, StateBusWriter
+)
+
+BUFFER_SIZE = 1024 * 1024
+
+
+@pytest.fixture
+def bus_name():
+    return f"agent_world_test_{os.getpid()}_{time.monotonic_ns()}"
+
+
+def agents_json(tick: int, count: int = 3) -> str:
+    return json.dumps([{'id': i, 'tick': tick} for i in range(count)])
+
+
+def publish(writer: StateBusWriter, tick: int, count: int = 3) -> None:
+    writer.publish(tick, agents_json(tick, count), [f"conversation {tick}"], {'tick': tick})
+
+
+def assert_consistent(snapshot) -> None:
+    """Every section of a snapshot has to come from the same publish."""
+    assert all(agent['tick'] == snapshot.tick for agent in json.loads(snapshot.agents_json))
+    assert snapshot.conversations() == [f"conversation {snapshot.tick}"]
+    assert snapshot.status == {'tick': snapshot.tick}
+
+
+class InterleavedSegment(bytearray):
+    """Shared memory stand-in that runs `on_copy` once, just before the reader copies a buffer."""
+
+    def __init__(self, size: int, on_copy):
+        super().__init__(size)
+        self.on_copy = on_copy
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and self.on_copy is not None:
+            on_copy, self.on_copy = self.on_copy, None
+            on_copy()
+        return super().__getitem__(index)
+
+
+def test_reads_latest_publish(bus_name):
+    writer = StateBusWriter(bus_name, BUFFER_SIZE)
+    reader = StateBusReader(bus_name, BUFFER_SIZE)
+    try:
+        assert reader.read() is None
+        publish(writer, 1)
+        publish(writer, 2)
+
+        snapshot = reader.read()
+        assert snapshot.tick == 2
+        assert_consistent(snapshot)
+        # Decoded once per publish
+        assert reader.read() is snapshot
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_publish_too_large_for_a_buffer(bus_name):
+    writer = StateBusWriter(bus_name, 256)
+    try:
+        with pytest.raises(ValueError):
+            publish(writer, 1, count=100)
+    finally:
+        writer.close()
+
+
+def test_buffer_overwritten_while_copied_is_read_again(bus_name):
+    writer = StateBusWriter(bus_name, BUFFER_SIZE)
+    shared = writer._shm
+    segment = InterleavedSegment(len(shared.buf), None)
+    view = memoryview(segment)
+    writer._shm = SimpleNamespace(buf=view)
+    reader = StateBusReader(bus_name, BUFFER_SIZE)
+    reader._shm = SimpleNamespace(buf=segment)
+    try:
+        publish(writer, 1)
+        copied_buffer = _HEADER.unpack_from(segment, 0)[1]
+
+        def writer_catches_up():
+            # Tick 2 goes to the other buffer, then the writer starts on tick 3 in the one being copied
+            publish(writer, 2)
+            offset = _HEADER.size + copied_buffer * BUFFER_SIZE
+            _BUFFER_SEQ.pack_into(view, offset, 0)
+            start = offset + _BUFFER_HEADER.size
+            view[start:start + 8] = b'\xff' * 8
+
+        segment.on_copy = writer_catches_up
+        snapshot = reader.read()
+
+        assert snapshot.tick == 2
+        assert_consistent(snapshot)
+        assert reader.retries == 1
+    finally:
+        view.release()
+        writer._shm = shared
+        writer.close()
+
+
+def _publish_continuously(name: str, stop) -> None:
+    writer = StateBusWriter(name, BUFFER_SIZE)
+    tick = 0
+    try:
+        while not stop.is_set():
+            tick += 1
+            # Sizes vary so a torn copy mixes sections of different lengths
+            publish(writer, tick, count=1000 + tick % 500)
+    finally:
+        writer.close()
+
+
+def test_reads_are_consistent_while_another_process_publishes(bus_name):
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+    process = context.Process(target=_publish_continuously, args=(bus_name, stop))
+    process.start()
+    reader = StateBusReader(bus_name, BUFFER_SIZE)
+    try:
+        started = time.monotonic()
+        while reader.read() is None:
+            assert time.monotonic() - started < 30, "writer process never published"
+            time.sleep(0.01)
+
+        ticks, deadline = set(), time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            snapshot = reader.read()
+            assert_consistent(snapshot)
+            ticks.add(snapshot.tick)
+        assert len(ticks) > 1
+    finally:
+        stop.set()
+        process.join(timeout=10)
+        reader.close()
+
+
+class RecordingClient:
+    """WebSocket stand-in keeping the type and tick of every message sent to it."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_text(self, text: str) -> None:
+        await self.send_json(json.loads(text))
+
+    async def send_json(self, message) -> None:
+        self.messages.append((message['type'], message.get('tick')))
+
+
+def test_relay_forwards_segments_and_resyncs_after_missed_ticks(bus_name, monkeypatch):
+    from app.main import relay_state_bus
+    from app.services.world_manager import World
+
+    monkeypatch.setattr(settings, 'MOVEMENT_MODE', 'segments')
+    monkeypatch.setattr(settings, 'STATE_BUS_POLL_INTERVAL', 0.001)
+    writer = StateBusWriter(bus_name, BUFFER_SIZE)
+    reader = StateBusReader(bus_name, BUFFER_SIZE)
+    world = World(settings.DEFAULT_WORLD, SnapshotAgentView(reader), SnapshotConversationView(reader))
+    client = RecordingClient()
+    world.clients.append(client)
+
+    async def scenario():
+        relay = asyncio.create_task(relay_state_bus(world))
+        # The worker misses tick 4
+        for tick in (1, 2, 3, 5):
+            writer.publish(tick, agents_json(tick), [], {
+                'etag': str(tick), 'tick_started_at': 0.0, 'running': True, 'speed': 100,
+                'segments': [{'id': 0, 'tick': tick}]
+            })
+            await asyncio.sleep(0.05)
+        relay.cancel()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        reader.close()
+        writer.close()
+
+    assert client.messages == [
+        ('agent_update', 1), ('movement_segments', 2), ('movement_segments', 3), ('agent_update', 5)
+    ]
@@ -0,0 +1,89 @@
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.models.terrain import Terrain
+
+BOUNDS = {'min_x': 20, 'max_x': 80, 'min_y': 20, 'max_y': 80}
+# A wall across the middle with a gap at the top, and mud in the bottom left corner
+FEATURES = {
+    'wall': {'x': [45, 55, 55, 45], 'y': [30, 30, 100, 100]},
+    'mud': {'x': [20, 40, 40, 20], 'y': [60, 60, 80, 80]}
+}
+
+
+@pytest.fixture
+def grid(monkeypatch):
+    monkeypatch.setattr(settings, 'TERRAIN_COSTS', {'mud': 4.0})
+    return Terrain(100, 5, BOUNDS, FEATURES, {})
+
+
+def test_walkable_area_and_costs(grid):
+    assert grid.is_walkable(30, 30)
+    assert not grid.is_walkable(10, 30)  # outside the bounds
+    assert not grid.is_walkable(50, 50)  # the wall
+    assert not grid.is_walkable(-1, 30) and not grid.is_walkable(30, 100)
+    assert grid.cost_at(30, 30) == 1.0
+    assert grid.cost_at(30, 70) == 4.0
+    assert grid.cost_at(50, 50) == np.inf
+    assert grid.snap(50, 50) != (50, 50) and grid.is_walkable(*grid.snap(50, 50))
+
+
+def test_step_towards_goes_around_the_wall(grid):
+    x, y = 30, 60
+    goal = (70, 60)
+    path = [(x, y)]
+    for _ in range(40):
+        x, y = grid.step_towards(x, y, goal, 5)
+        path.append((x, y))
+        assert grid.is_walkable(x, y)
+    assert grid.cell_of(x, y) == grid.cell_of(*goal)
+    # Through the gap at the top, never across the wall
+    assert min(y for _, y in path) < 30
+
+
+def test_step_towards_stays_at_the_goal(grid):
+    assert grid.step_towards(70, 60, (70, 60), 10) == (70, 60)
+
+
+def test_flow_fields_are_shared_and_evicted_least_recently_used(grid, monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_FLOW_FIELDS', 2)
+    first = grid.flow_field((30, 30))
+    assert grid.flow_field((31, 31)) is first  # same goal cell
+    grid.flow_field((70, 30))
+    grid.flow_field((30, 30))  # used again, so (70, 30) goes first
+    grid.flow_field((70, 70))
+
+    assert set(grid._flow_fields) == {grid.cell_of(30, 30), grid.cell_of(70, 70)}
+    assert grid.flow_field((30, 30)) is first
+
+
+def test_flow_field_cache_is_thread_safe(grid, monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_FLOW_FIELDS', 3)
+    goals = [(30, 30), (70, 30), (70, 70), (30, 50)]
+    errors = []
+
+    def walk(offset):
+        try:
+            for i in range(100):
+                grid.flow_field(goals[(offset + i) % len(goals)])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=walk, args=(offset,)) for offset in range(8)]
+    # Switch threads as often as possible, so hits and evictions interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(grid._flow_fields) <= 3
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.models.agent import Agent
+from app.models.pydantic_models import ThinkingDecision
+from app.services.thinking_service import ThinkingService
+
+
+@pytest.fixture
+def service():
+    return ThinkingService()
+
+
+@pytest.fixture
+def agent():
+    return Agent(0, "Ann", 250, 200, "#000000")
+
+
+@pytest.mark.parametrize("response", [
+    '{"direction": "North", "say": "Off I go."}',
+    '```json\n{"direction": "north", "say": "Off I go."}\n```',
+    'Sure! Here is my decision: {"direction": "north", "say": "Off I go."} Hope that helps.',
+])
+def test_decision_is_found_in_fences_and_prose(service, agent, response):
+    decision = service._parse_decision(response, agent, ())
+
+    assert (decision.direction, decision.say) == ('north', "Off I go.")
+
+
+def test_broken_json_falls_back_to_the_direction_in_the_text(service, agent):
+    decision = service._parse_decision('{"direction": "west", "say": "Going', agent, ())
+
+    # Half an object is not worth displaying
+    assert (decision.direction, decision.say) == ('west', "")
+
+
+def test_prose_without_json_is_kept_as_the_utterance(service, agent):
+    decision = service._parse_decision("I think I will walk east for a while.", agent, ())
+
+    assert (decision.direction, decision.say) == ('east', "I think I will walk east for a while.")
+
+
+def test_unknown_direction_is_salvaged(service, agent):
+    decision = service._parse_decision('{"direction": "further south, past the trees"}', agent, ())
+
+    assert decision.direction == 'south'
+
+
+def test_only_nearby_agents_can_be_targets(service, agent):
+    response = '{"direction": "stay", "target": "%s"}'
+
+    assert service._parse_decision(response % "Bob", agent, ("Bob",)).target == "Bob"
+    assert service._parse_decision(response % "Zed", agent, ("Bob",)).target is None
+
+
+def prefetched(service, agent, decision, nearby=(), ttl=10.0, at=None):
+    x, y = at or (agent.x, agent.y)
+    service._prefetched[agent.id] = (decision, time.monotonic() + ttl, (x, y, nearby))
+
+
+def take(service, agent, nearby=()):
+    return asyncio.run(service._take_prefetched(agent, nearby, time.monotonic() + 1.0))
+
+
+def test_fresh_prefetched_decision_is_used_once(service, agent):
+    decision = ThinkingDecision(direction='north')
+    prefetched(service, agent, decision, nearby=("Bob", "Cid"))
+
+    # Agents walking away don't make it stale
+    assert take(service, agent, nearby=("Bob",)) is decision
+    assert take(service, agent, nearby=("Bob",)) is None
+    assert (service.prefetch_hits, service.prefetch_discarded) == (1, 0)
+
+
+@pytest.mark.parametrize("stale", ['expired', 'drifted', 'newcomer', 'target_left'])
+def test_stale_prefetched_decision_is_discarded(service, agent, stale):
+    decision = ThinkingDecision(direction='stay', target="Bob" if stale == 'target_left' else None)
+    drift = settings.THINK_PREFETCH_MAX_DRIFT + 1
+    prefetched(
+        service, agent, decision, nearby=("Bob",),
+        ttl=-1.0 if stale == 'expired' else 10.0,
+        at=(agent.x - drift, agent.y) if stale == 'drifted' else None
+    )
+    nearby = {'newcomer': ("Bob", "Cid"), 'target_left': ()}.get(stale, ("Bob",))
+
+    assert take(service, agent, nearby) is None
+    assert service.prefetch_discarded == 1
+
+
+def test_prefetch_on_its_way_is_waited_for(service, agent):
+    decision = ThinkingDecision(direction='east')
+
+    async def scenario():
+        async def arriving():
+            await asyncio.sleep(0.01)
+            prefetched(service, agent, decision)
+
+        service._prefetch_tasks[agent.id] = asyncio.create_task(arriving())
+        return await service._take_prefetched(agent, (), time.monotonic() + 1.0)
+
+    assert asyncio.run(scenario()) is decision
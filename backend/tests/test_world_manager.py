@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_pool import AdaptiveConcurrencyLimiter, LLMPool
+from app.services.world_manager import World, WorldManager
+
+class GatedClient:
+    """OpenAI client stand-in that records which world each request came from and
+    holds every answer until the gate opens."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.worlds: List[str] = []
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, messages, **kwargs):
+        self.worlds.append(messages[0]['content'])
+        await self.gate.wait()
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content='ok'))])
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, 'OPENAI_API_KEY', '')
+    monkeypatch.setattr(settings, 'LLM_HEDGING_ENABLED', False)
+    # A single slot that never grows, so every request after the first has to queue
+    monkeypatch.setattr(settings, 'LLM_INITIAL_CONCURRENCY', 1)
+    monkeypatch.setattr(settings, 'LLM_MAX_CONCURRENCY', 1)
+    monkeypatch.setattr(settings, 'LLM_GLOBAL_RPS', 100.0)
+    monkeypatch.setattr(settings, 'LLM_GLOBAL_TPM', 10 ** 9)
+    pool = LLMPool()
+    pool.replicas['replica'] = {
+        "client": GatedClient(),
+        "model": "test",
+        "limiter": AdaptiveConcurrencyLimiter('replica'),
+        "latencies": [],
+        "warm": True
+    }
+    return WorldManager(pool)
+
+
+def add_world(manager: WorldManager, world_id: str, weight: float) -> World:
+    return manager.add(World(world_id, agent_service=None, conversation_service=None, weight=weight))
+
+
+def serve(manager: WorldManager, requests: List[str]) -> List[str]:
+    """Queue one request per entry of `requests` behind a request of the default world,
+    then let them all through and get the worlds in the order they were served."""
+    pool = manager.pool
+    replica = pool.replicas['replica']
+
+    async def request(world_id: str) -> None:
+        await pool.for_tenant(world_id).complete('replica', [{'role': 'user', 'content': world_id}], 10)
+
+    async def scenario():
+        holder = asyncio.create_task(request(settings.DEFAULT_WORLD))
+        while not replica["client"].worlds:
+            await asyncio.sleep(0)
+        queued = [asyncio.create_task(request(world_id)) for world_id in requests]
+        while replica["limiter"].waiting < len(requests):
+            await asyncio.sleep(0)
+
+        replica["client"].gate.set()
+        await asyncio.wait_for(asyncio.gather(holder, *queued), timeout=5)
+        return replica["client"].worlds[1:]
+
+    return asyncio.run(scenario())
+
+
+def test_contended_replica_serves_worlds_by_weight(manager):
+    add_world(manager, 'heavy', 2.0)
+    add_world(manager, 'light', 1.0)
+
+    order = serve(manager, ['heavy'] * 6 + ['light'] * 6)
+
+    # Two heavy requests for every light one while both are waiting, then the rest of light
+    assert order == ['heavy', 'light', 'heavy', 'heavy', 'light', 'heavy',
+                     'heavy', 'light', 'heavy', 'light', 'light', 'light']
+
+
+def test_set_weight_changes_the_share(manager):
+    add_world(manager, 'heavy', 2.0)
+    add_world(manager, 'light', 1.0)
+    manager.set_weight('light', 2.0)
+
+    order = serve(manager, ['heavy'] * 3 + ['light'] * 3)
+
+    assert order == ['heavy', 'light'] * 3
+
+
+def test_requests_of_a_world_are_served_in_order(manager):
+    add_world(manager, 'heavy', 2.0)
+    add_world(manager, 'light', 1.0)
+    pool = manager.pool
+    replica = pool.replicas['replica']
+
+    async def request(world_id: str, n: int) -> None:
+        await pool.for_tenant(world_id).complete('replica', [{'role': 'user', 'content': f"{world_id}{n}"}], 10)
+
+    async def scenario():
+        holder = asyncio.create_task(request('light', 0))
+        while not replica["client"].worlds:
+            await asyncio.sleep(0)
+        queued = [asyncio.create_task(request(world_id, n)) for n in range(1, 4) for world_id in ('light', 'heavy')]
+        while replica["limiter"].waiting < len(queued):
+            await asyncio.sleep(0)
+        replica["client"].gate.set()
+        await asyncio.wait_for(asyncio.gather(holder, *queued), timeout=5)
+
+    asyncio.run(scenario())
+    served = replica["client"].worlds[1:]
+    assert [name for name in served if name.startswith('light')] == ['light1', 'light2', 'light3']
+    assert [name for name in served if name.startswith('heavy')] == ['heavy1', 'heavy2', 'heavy3']
+
+
+def test_removed_worlds_no_longer_count_towards_shares(manager):
+    add_world(manager, 'heavy', 2.0)
+    add_world(manager, 'light', 1.0)
+
+    asyncio.run(manager.remove('heavy'))
+
+    assert 'heavy' not in manager.pool.tenants
+    assert list(manager.pool.tenant_stats()) == ['light']
+    assert serve(manager, ['light'] * 2) == ['light'] * 2
@@ -1,10 +1,10 @@
-// index.js - To export all components from a single file
-import { AgentMemory } from './AgentMemory';
-import { AgentThought } from './AgentThought';
-import { Conversations } from './Conversations';
-
-export {
-  AgentMemory,
-  AgentThought,
-  Conversations
+// index.js - To export all components from a single file
+import { AgentMemory } from './AgentMemory';
+import { AgentThought } from './AgentThought';
+import { Conversations } from './Conversations';
+
+export {
+  AgentMemory,
+  AgentThought,
+  Conversations
 };
\ No newline at end of file
@@ -118,6 +118,19 @@ const drawTerrain = (ctx, time, canvasWidth, canvasHeight, cameraOffset = { x: 0
   });
 };
 
+// Current position and progress of an agent following a server movement segment
+const segmentPosition = (segment) => {
+  const elapsed = (performance.now() - segment.received_at) / 1000;
+  const t = Math.min(Math.max((segment.progress || 0) + elapsed / segment.duration, 0), 1);
+  // Same smootherstep easing as the server: t³ * (t * (t * 6 - 15) + 10)
+  const smoothT = t * t * t * (t * (t * 6 - 15) + 10);
+  return {
+    x: segment.start_x + (segment.target_x - segment.start_x) * smoothT,
+    y: segment.start_y + (segment.target_y - segment.start_y) * smoothT,
+    progress: t
+  };
+};
+
 // Draw a beautiful 2.5D character
 const drawCharacter = (ctx, agent, isSelected, time, canvasWidth, canvasHeight, cameraOffset = { x: 0, y: 0 }, zoom = 1) => {
   const { x, y, color, name, move_progress = 0 } = agent;
@@ -128,15 +141,21 @@ const drawCharacter = (ctx, agent, isSelected, time, canvasWidth, canvasHeight,
   // Smooth interpolation for movement
   const targetX = agent.target_x || x;
   const targetY = agent.target_y || y;
-  const currentX = x + (targetX - x) * move_progress;
-  const currentY = y + (targetY - y) * move_progress;
+  let currentX = x + (targetX - x) * move_progress;
+  let currentY = y + (targetY - y) * move_progress;
+  let progress = move_progress;
+  
+  // Agents with a movement segment are interpolated locally
+  if (agent.segment) {
+    ({ x: currentX, y: currentY, progress } = segmentPosition(agent.segment));
+  }
   
   const projected = isoProject(currentX, currentY, 0);
   const screenX = (projected.x * zoom) + centerX;
   const screenY = (projected.y * zoom) + centerY;
   
   // Walking animation
-  const isMoving = move_progress > 0 && move_progress < 1;
+  const isMoving = progress > 0 && progress < 1;
   const walkOffset = isMoving ? time * 0.01 : 0;
   const walkBob = isMoving ? Math.sin(walkOffset) * (1.5 * zoom) : 0;
   const charY = screenY - walkBob;
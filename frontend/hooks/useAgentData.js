@@ -1,47 +1,71 @@
-import { useState, useCallback } from 'react';
-
-/**
- * Custom hook for managing agent data
- * @returns {Object} Agent data state and handlers
- */
-const useAgentData = () => {
-  const [agents, setAgents] = useState([]);
-  const [selectedAgent, setSelectedAgent] = useState(null);
-  const [conversations, setConversations] = useState([]);
-  
-  // Handle agent data updates from the server
-  const handleAgentUpdate = useCallback((agentData) => {
-    setAgents(agentData);
-    
-    // If no agent is selected yet, select the first one
-    if (!selectedAgent && agentData.length > 0) {
-      setSelectedAgent(agentData[0].id);
-    }
-    
-    // If selected agent no longer exists, select the first one
-    if (selectedAgent && !agentData.some(agent => agent.id === selectedAgent)) {
-      setSelectedAgent(agentData.length > 0 ? agentData[0].id : null);
-    }
-  }, [selectedAgent]);
-  
-  // Handle conversation updates from the server
-  const handleConversationUpdate = useCallback((conversationData) => {
-    console.log('Updating conversations:', conversationData);
-    if (Array.isArray(conversationData)) {
-      setConversations(conversationData);
-    } else {
-      console.error('Received non-array conversation data:', conversationData);
-    }
-  }, []);
-  
-  return {
-    agents,
-    selectedAgent,
-    setSelectedAgent,
-    handleAgentUpdate,
-    conversations,
-    handleConversationUpdate
-  };
-};
-
+import { useState, useCallback } from 'react';
+
+/**
+ * Custom hook for managing agent data
+ * @returns {Object} Agent data state and handlers
+ */
+const useAgentData = () => {
+  const [agents, setAgents] = useState([]);
+  const [selectedAgent, setSelectedAgent] = useState(null);
+  const [conversations, setConversations] = useState([]);
+  
+  // Handle agent data updates from the server
+  const handleAgentUpdate = useCallback((agentData) => {
+    // Snapshots may carry an in-progress segment, anchor it to the local clock
+    const receivedAt = performance.now();
+    setAgents(agentData.map(agent => agent.segment
+      ? { ...agent, segment: { ...agent.segment, received_at: receivedAt } }
+      : agent));
+    
+    // If no agent is selected yet, select the first one
+    if (!selectedAgent && agentData.length > 0) {
+      setSelectedAgent(agentData[0].id);
+    }
+    
+    // If selected agent no longer exists, select the first one
+    if (selectedAgent && !agentData.some(agent => agent.id === selectedAgent)) {
+      setSelectedAgent(agentData.length > 0 ? agentData[0].id : null);
+    }
+  }, [selectedAgent]);
+  
+  // Handle movement segments from the server (interpolated locally until the segment ends)
+  const handleMovementSegments = useCallback((segments) => {
+    const receivedAt = performance.now();
+    const segmentsById = new Map(segments.map(segment => [segment.id, segment]));
+    
+    setAgents(prevAgents => prevAgents.map(agent => {
+      const segment = segmentsById.get(agent.id);
+      if (!segment) return agent;
+      return {
+        ...agent,
+        x: segment.start_x,
+        y: segment.start_y,
+        target_x: segment.target_x,
+        target_y: segment.target_y,
+        segment: { ...segment, received_at: receivedAt }
+      };
+    }));
+  }, []);
+  
+  // Handle conversation updates from the server
+  const handleConversationUpdate = useCallback((conversationData) => {
+    console.log('Updating conversations:', conversationData);
+    if (Array.isArray(conversationData)) {
+      setConversations(conversationData);
+    } else {
+      console.error('Received non-array conversation data:', conversationData);
+    }
+  }, []);
+  
+  return {
+    agents,
+    selectedAgent,
+    setSelectedAgent,
+    handleAgentUpdate,
+    handleMovementSegments,
+    conversations,
+    handleConversationUpdate
+  };
+};
+
 export default useAgentData;
\ No newline at end of file
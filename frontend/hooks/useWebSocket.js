@@ -1,147 +1,147 @@
-import { useState, useEffect, useCallback, useRef } from 'react';
-
-/**
- * Custom hook for managing WebSocket connections
- * @param {string} url - WebSocket URL to connect to
- * @returns {Object} WebSocket connection state and methods
- */
-const useWebSocket = (url) => {
-  console.log('useWebSocket hook called with URL:', url);
-  const [socket, setSocket] = useState(null);
-  const [isConnected, setIsConnected] = useState(false);
-  const [lastMessage, setLastMessage] = useState(null);
-  const reconnectTimeoutRef = useRef(null);
-  const messageQueueRef = useRef([]);
-
-  // Create WebSocket connection
-  useEffect(() => {
-    // Clean up function to be called on component unmount or URL change
-    const cleanup = () => {
-      if (socket) {
-        socket.close();
-      }
-      
-      if (reconnectTimeoutRef.current) {
-        clearTimeout(reconnectTimeoutRef.current);
-      }
-    };
-    
-    // Don't connect if no URL is provided
-    if (!url) {
-      console.log('useWebSocket: No URL provided, skipping connection');
-      cleanup();
-      return cleanup;
-    }
-    
-    console.log('useWebSocket: Attempting to create WebSocket connection to:', url);
-    
-    try {
-      // Create a new WebSocket connection
-      const newSocket = new WebSocket(url);
-      
-      // Set up event handlers
-      newSocket.onopen = () => {
-        console.log('WebSocket connected to:', url);
-        setIsConnected(true);
-        
-        // Send any queued messages
-        while (messageQueueRef.current.length > 0) {
-          const message = messageQueueRef.current.shift();
-          newSocket.send(message);
-        }
-      };
-      
-      newSocket.onclose = (event) => {
-        console.log('WebSocket disconnected from:', url, 'Code:', event.code, 'Reason:', event.reason, 'WasClean:', event.wasClean);
-        setIsConnected(false);
-        
-        // Set up reconnection
-        reconnectTimeoutRef.current = setTimeout(() => {
-          console.log('Attempting to reconnect to:', url);
-          cleanup();
-          // This will trigger the effect again
-          setSocket(null);
-        }, 3000);
-      };
-      
-      newSocket.onerror = (error) => {
-        console.error('WebSocket error for:', url, error);
-        console.error('Error details:', JSON.stringify(error, null, 2));
-      };
-      
-      newSocket.onmessage = (event) => {
-        setLastMessage(event.data);
-      };
-      
-      // Store the socket in state
-      setSocket(newSocket);
-      
-    } catch (error) {
-      console.error('Failed to create WebSocket:', error);
-      setIsConnected(false);
-    }
-    
-    // Clean up on unmount
-    return cleanup;
-  }, [url]);
-  
-  // Function to send messages safely
-  const sendMessage = useCallback((message) => {
-    if (socket?.readyState === WebSocket.OPEN) {
-      socket.send(message);
-    } else {
-      // Queue the message to send when connection is established
-      messageQueueRef.current.push(message);
-    }
-  }, [socket]);
-  
-  // Set up a ping to keep the connection alive
-  useEffect(() => {
-    if (!isConnected) return;
-    
-    const pingInterval = setInterval(() => {
-      sendMessage(JSON.stringify({
-        command: 'ping',
-        time: Date.now()
-      }));
-    }, 30000); // Send ping every 30 seconds
-    
-    return () => clearInterval(pingInterval);
-  }, [isConnected, sendMessage]);
-  
-  return { socket, isConnected, lastMessage, sendMessage };
-};
-
-
-const connectWebSocket = () => {
-  console.log("Attempting to connect to WebSocket...");
-  const ws = new WebSocket(`${WS_BASE_URL}/ws`);
-  
-  ws.onopen = () => {
-    console.log("WebSocket connection established successfully");
-    setSocket(ws);
-  };
-  
-  ws.onerror = (error) => {
-    console.error("WebSocket connection error:", error);
-  };
-  
-  ws.onclose = (event) => {
-    console.log("WebSocket connection closed:", event.code, event.reason);
-    // Consider implementing reconnection logic here
-  };
-  
-  ws.onmessage = (event) => {
-    try {
-      const data = JSON.parse(event.data);
-      console.log("WebSocket message received:", data);
-      // Handle the message
-    } catch (error) {
-      console.error("Error parsing WebSocket message:", error);
-    }
-  };
-  
-  return ws;
-};
-
+import { useState, useEffect, useCallback, useRef } from 'react';
+
+/**
+ * Custom hook for managing WebSocket connections
+ * @param {string} url - WebSocket URL to connect to
+ * @returns {Object} WebSocket connection state and methods
+ */
+const useWebSocket = (url) => {
+  console.log('useWebSocket hook called with URL:', url);
+  const [socket, setSocket] = useState(null);
+  const [isConnected, setIsConnected] = useState(false);
+  const [lastMessage, setLastMessage] = useState(null);
+  const reconnectTimeoutRef = useRef(null);
+  const messageQueueRef = useRef([]);
+
+  // Create WebSocket connection
+  useEffect(() => {
+    // Clean up function to be called on component unmount or URL change
+    const cleanup = () => {
+      if (socket) {
+        socket.close();
+      }
+      
+      if (reconnectTimeoutRef.current) {
+        clearTimeout(reconnectTimeoutRef.current);
+      }
+    };
+    
+    // Don't connect if no URL is provided
+    if (!url) {
+      console.log('useWebSocket: No URL provided, skipping connection');
+      cleanup();
+      return cleanup;
+    }
+    
+    console.log('useWebSocket: Attempting to create WebSocket connection to:', url);
+    
+    try {
+      // Create a new WebSocket connection
+      const newSocket = new WebSocket(url);
+      
+      // Set up event handlers
+      newSocket.onopen = () => {
+        console.log('WebSocket connected to:', url);
+        setIsConnected(true);
+        
+        // Send any queued messages
+        while (messageQueueRef.current.length > 0) {
+          const message = messageQueueRef.current.shift();
+          newSocket.send(message);
+        }
+      };
+      
+      newSocket.onclose = (event) => {
+        console.log('WebSocket disconnected from:', url, 'Code:', event.code, 'Reason:', event.reason, 'WasClean:', event.wasClean);
+        setIsConnected(false);
+        
+        // Set up reconnection
+        reconnectTimeoutRef.current = setTimeout(() => {
+          console.log('Attempting to reconnect to:', url);
+          cleanup();
+          // This will trigger the effect again
+          setSocket(null);
+        }, 3000);
+      };
+      
+      newSocket.onerror = (error) => {
+        console.error('WebSocket error for:', url, error);
+        console.error('Error details:', JSON.stringify(error, null, 2));
+      };
+      
+      newSocket.onmessage = (event) => {
+        setLastMessage(event.data);
+      };
+      
+      // Store the socket in state
+      setSocket(newSocket);
+      
+    } catch (error) {
+      console.error('Failed to create WebSocket:', error);
+      setIsConnected(false);
+    }
+    
+    // Clean up on unmount
+    return cleanup;
+  }, [url]);
+  
+  // Function to send messages safely
+  const sendMessage = useCallback((message) => {
+    if (socket?.readyState === WebSocket.OPEN) {
+      socket.send(message);
+    } else {
+      // Queue the message to send when connection is established
+      messageQueueRef.current.push(message);
+    }
+  }, [socket]);
+  
+  // Set up a ping to keep the connection alive
+  useEffect(() => {
+    if (!isConnected) return;
+    
+    const pingInterval = setInterval(() => {
+      sendMessage(JSON.stringify({
+        command: 'ping',
+        time: Date.now()
+      }));
+    }, 30000); // Send ping every 30 seconds
+    
+    return () => clearInterval(pingInterval);
+  }, [isConnected, sendMessage]);
+  
+  return { socket, isConnected, lastMessage, sendMessage };
+};
+
+
+const connectWebSocket = () => {
+  console.log("Attempting to connect to WebSocket...");
+  const ws = new WebSocket(`${WS_BASE_URL}/ws`);
+  
+  ws.onopen = () => {
+    console.log("WebSocket connection established successfully");
+    setSocket(ws);
+  };
+  
+  ws.onerror = (error) => {
+    console.error("WebSocket connection error:", error);
+  };
+  
+  ws.onclose = (event) => {
+    console.log("WebSocket connection closed:", event.code, event.reason);
+    // Consider implementing reconnection logic here
+  };
+  
+  ws.onmessage = (event) => {
+    try {
+      const data = JSON.parse(event.data);
+      console.log("WebSocket message received:", data);
+      // Handle the message
+    } catch (error) {
+      console.error("Error parsing WebSocket message:", error);
+    }
+  };
+  
+  return ws;
+};
+
 export default useWebSocket;
\ No newline at end of file
@@ -1,9 +1,9 @@
-// pages/_app.js
-import React from 'react';
-import '../styles/globals.css';
-
-function MyApp({ Component, pageProps }) {
-  return <Component {...pageProps} />;
-}
-
+// pages/_app.js
+import React from 'react';
+import '../styles/globals.css';
+
+function MyApp({ Component, pageProps }) {
+  return <Component {...pageProps} />;
+}
+
 export default MyApp;
\ No newline at end of file